@@ -3,17 +3,38 @@ AIRG-LangGraph - AI Resume Generator using LangChain and LangGraph
 LangGraph application definition
 """
 
-import os
-from typing import Dict, Any, TypedDict, Annotated
+import operator
+from typing import Dict, List, Any, Callable, Optional, TypedDict, Annotated
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langchain_core.runnables import RunnableLambda
 
 # Import node functions
+from nodes import resume_generation_node, cover_letter_generation_node
 from nodes.input_node import process_input
-from nodes.resume_generation_node import generate_resume
-from nodes.cover_letter_generation_node import generate_cover_letter
-from nodes.document_creation_node import create_documents
+from nodes.resume_generation_node import generate_resume, agenerate_resume, replay_resume
+from nodes.cover_letter_generation_node import generate_cover_letter, agenerate_cover_letter, replay_cover_letter
+from nodes.document_creation_node import create_documents, acreate_documents
 from nodes.output_node import prepare_output
+from utils.llm_utils import (
+    RESUME_PROMPT,
+    RESUME_SECTIONS_PROMPT,
+    COVER_LETTER_PROMPT,
+    COVER_LETTER_SECTIONS_PROMPT,
+    generation_settings,
+    prompt_fingerprint,
+)
+from utils.memo_utils import MemoizedNode
+from utils.metrics_utils import TracedNode
+
+
+def merge_node_names(left: List[str], right: List[str]) -> List[str]:
+    """
+    Merge lists of node names, keeping each name once (nodes that copy the whole
+    state return the names already recorded)
+    """
+    return left + [name for name in right if name not in left]
+
 
 # Define the state schema
 class GraphState(TypedDict):
@@ -28,6 +49,11 @@ class GraphState(TypedDict):
     hirer_gender: Annotated[str, "Gender of the hiring manager"]
     relevant_experience: Annotated[str, "Additional relevant experience"]
     output_file_name: Annotated[str, "Output file name without extension"]
+    use_llm_cache: Annotated[bool, "Whether to reuse cached LLM responses for identical prompts"]
+    use_node_cache: Annotated[bool, "Whether to reuse the outputs of nodes whose inputs are unchanged"]
+    stream_llm: Annotated[bool, "Whether to stream LLM responses and report sections as they complete"]
+    generation_mode: Annotated[str, "How content is generated: document, compact or sections"]
+    ranking_top_k: Annotated[int, "Number of most relevant experience/skills lines sent to the model (0 = all)"]
     
     # Template content
     resume_template_content: Annotated[Dict[str, Any], "Processed resume template content"]
@@ -42,27 +68,73 @@ class GraphState(TypedDict):
     resume_pdf_path: Annotated[str, "Path to the generated resume PDF file"]
     cover_letter_docx_path: Annotated[str, "Path to the generated cover letter DOCX file"]
     cover_letter_pdf_path: Annotated[str, "Path to the generated cover letter PDF file"]
+    renders_avoided: Annotated[int, "DOCX and PDF renders avoided by reusing stored documents"]
+
+    # Execution metrics (merged across parallel branches)
+    node_timings: Annotated[Dict[str, float], operator.or_]
+    skipped_nodes: Annotated[List[str], merge_node_names]
+    incomplete_nodes: Annotated[List[str], merge_node_names]
 
 
-def create_graph():
+def create_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     """
     Create the LangGraph for the AIRG application
+    
+    Args:
+        checkpointer: Optional checkpointer persisting the state after every step
     """
     # Create a new graph
     builder = StateGraph(GraphState)
     
-    # Add nodes to the graph
-    builder.add_node("input", process_input)
-    builder.add_node("resume_generation", generate_resume)
-    builder.add_node("cover_letter_generation", generate_cover_letter)
-    builder.add_node("document_creation", create_documents)
-    builder.add_node("output", prepare_output)
+    # The generation nodes reuse their previous outputs when their template and
+    # the state fields they read are unchanged
+    resume_node = MemoizedNode(
+        "resume_generation",
+        generate_resume,
+        agenerate_resume,
+        source_field="resume_source_path",
+        template_field="resume_template_content",
+        input_fields=resume_generation_node.INPUT_FIELDS,
+        output_fields=["resume_content"],
+        version=[prompt_fingerprint(RESUME_PROMPT), prompt_fingerprint(RESUME_SECTIONS_PROMPT)],
+        settings=generation_settings,
+        on_hit=replay_resume,
+    )
+    cover_letter_node = MemoizedNode(
+        "cover_letter_generation",
+        generate_cover_letter,
+        agenerate_cover_letter,
+        source_field="cover_letter_source_path",
+        template_field="cover_letter_template_content",
+        input_fields=cover_letter_generation_node.INPUT_FIELDS,
+        output_fields=["cover_letter_content"],
+        version=[prompt_fingerprint(COVER_LETTER_PROMPT), prompt_fingerprint(COVER_LETTER_SECTIONS_PROMPT)],
+        settings=generation_settings,
+        on_hit=replay_cover_letter,
+    )
+
+    # Every node is timed, with the LLM, DOCX and PDF work done inside it
+    nodes = {
+        "input": TracedNode("input", process_input),
+        "resume_generation": TracedNode("resume_generation", resume_node, resume_node.acall),
+        "cover_letter_generation": TracedNode("cover_letter_generation", cover_letter_node, cover_letter_node.acall),
+        "document_creation": TracedNode("document_creation", create_documents, acreate_documents),
+        "output": TracedNode("output", prepare_output),
+    }
+
+    # Add nodes to the graph; nodes doing LLM or DOCX/PDF work also have an
+    # async implementation, used when the graph runs through ainvoke
+    for name, node in nodes.items():
+        builder.add_node(name, RunnableLambda(node, afunc=node.acall if node.afunc else None))
     
-    # Define the edges between nodes sequentially
+    # Fan out from the input node: resume and cover letter generation are
+    # independent and run as parallel branches
     builder.add_edge("input", "resume_generation")
-    builder.add_edge("resume_generation", "cover_letter_generation")
-    builder.add_edge("cover_letter_generation", "document_creation")
-    
+    builder.add_edge("input", "cover_letter_generation")
+
+    # Join both branches before creating the documents
+    builder.add_edge(["resume_generation", "cover_letter_generation"], "document_creation")
+
     builder.add_edge("document_creation", "output")
     builder.add_edge("output", END)
     
@@ -70,34 +142,60 @@ def create_graph():
     builder.set_entry_point("input")
 
     # Create the graph
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
+
 
-def run_graph(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def run_graph(
+    input_data: Dict[str, Any],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    session_id: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Run the LangGraph with the provided input data
     
     Args:
         input_data: Dictionary containing the input data for the graph
+        on_progress: Optional callback; when given, LLM responses are streamed and the
+            callback receives an event for each generated section as soon as it is complete
+        session_id: Thread ID under which the run is checkpointed (a new one by default)
         
     Returns:
         Dictionary containing the output paths for the generated documents
     """
-    # Create the graph
-    graph = create_graph()
+    # The process-wide engine compiles the graph and creates the LLM client once
+    from engine import get_engine
+    
+    return get_engine().run(input_data, on_progress=on_progress, session_id=session_id)
 
-    # Set up persistence with SQLite
-    # Create the output directory if it doesn't exist
-    os.makedirs("output", exist_ok=True)
 
-    # Create a SQLite checkpointer
-    checkpointer = SqliteSaver.from_conn_string("sqlite:///output/airg_sessions.db")
+async def arun_graph(input_data: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the LangGraph asynchronously with the provided input data
+    
+    LLM calls are awaited with ainvoke and blocking DOCX/PDF work is offloaded to
+    an executor, so many applications can be generated concurrently on a single
+    event loop.
     
-    # Run the graph with the input data and checkpointer
-    result = graph.invoke(input_data, {"checkpointer": checkpointer})
+    Args:
+        input_data: Dictionary containing the input data for the graph
+        session_id: Thread ID under which the run is checkpointed (a new one by default)
+        
+    Returns:
+        Dictionary containing the output paths for the generated documents
+    """
+    # The process-wide engine compiles the graph and creates the LLM client once
+    from engine import get_engine
     
-    # Return the result
-    return result
+    return await get_engine().arun(input_data, session_id=session_id)
 
 
-# For LangGraph Cloud deployment
-graph = create_graph()
\ No newline at end of file
+def make_graph():
+    """
+    Graph factory for LangGraph Cloud deployment (see langgraph.json); the platform
+    provides its own persistence. Nothing is compiled when the module is imported,
+    so the CLI and the engine compile the graph only once.
+    
+    Returns:
+        Compiled graph without a checkpointer
+    """
+    return create_graph()
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+AIRG-LangGraph - AI Resume Generator using LangChain and LangGraph
+Batch processing of many job postings in a single process
+"""
+
+import os
+import csv
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional
+
+from utils.docx_utils import process_template
+
+
+# Mapping from job record fields (CLI option names) to graph input fields
+RECORD_FIELDS = {
+    "resume_template": "resume_source_path",
+    "cover_letter_template": "cover_letter_source_path",
+    "job_title": "job_title",
+    "company_name": "company_name",
+    "job_description": "job_description",
+    "company_overview": "company_overview",
+    "hirer_name": "hirer_name",
+    "hirer_gender": "hirer_gender",
+    "relevant_experience": "relevant_experience",
+    "output_file_name": "output_file_name",
+    "use_llm_cache": "use_llm_cache",
+    "use_node_cache": "use_node_cache",
+    "generation_mode": "generation_mode",
+    "top_k": "ranking_top_k",
+}
+
+
+def read_job_records(records_path: str) -> List[Dict[str, str]]:
+    """
+    Read job records from a JSONL or CSV file
+
+    Args:
+        records_path: Path to a .jsonl or .csv file with one job record per line/row
+
+    Returns:
+        List of job records
+    """
+    records = []
+
+    if records_path.lower().endswith(".csv"):
+        with open(records_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                records.append({key: value for key, value in row.items() if key})
+    else:
+        with open(records_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number} of {records_path}: {e}")
+
+    return records
+
+
+def build_input_data(record: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the graph input data for a job record
+
+    Args:
+        record: Job record using the CLI option names as keys
+        defaults: Values used for fields missing from the record (e.g. shared templates)
+
+    Returns:
+        Dictionary containing the input data for the graph
+    """
+    merged = dict(defaults or {})
+    merged.update({key: value for key, value in record.items() if value not in (None, "")})
+
+    input_data = {}
+    for record_field, input_field in RECORD_FIELDS.items():
+        value = merged.get(record_field, merged.get(input_field))
+        if value is not None:
+            input_data[input_field] = value
+
+    return input_data
+
+
+def run_batch(
+    records: List[Dict[str, Any]],
+    defaults: Optional[Dict[str, Any]] = None,
+    concurrency: int = 2,
+    manifest_path: str = os.path.join("output", "batch_manifest.json"),
+) -> Dict[str, Any]:
+    """
+    Run many job records through one compiled graph
+
+    Args:
+        records: Job records to process
+        defaults: Values used for fields missing from the records
+        concurrency: Maximum number of records processed at the same time
+        manifest_path: Path of the JSON summary manifest to write
+
+    Returns:
+        Summary manifest with the status of every record
+    """
+    # Import the engine here so that reading records stays cheap; it is created
+    # once and shared by every record
+    from engine import get_engine
+
+    engine = get_engine().warm_up()
+
+    inputs = [build_input_data(record, defaults) for record in records]
+
+    # Parse each distinct template once and share it across all records; a
+    # template that can't be parsed fails the records using it
+    template_contents = {}
+    template_errors = {}
+    record_errors = {}
+    for index, input_data in enumerate(inputs):
+        for path_field, content_field in [
+            ("resume_source_path", "resume_template_content"),
+            ("cover_letter_source_path", "cover_letter_template_content"),
+        ]:
+            path = input_data.get(path_field)
+            if path and os.path.exists(path):
+                if path not in template_contents and path not in template_errors:
+                    try:
+                        template_contents[path] = process_template(path)
+                    except Exception as e:
+                        template_errors[path] = (f"{type(e).__name__}: {e}", traceback.format_exc())
+                if path in template_errors:
+                    record_errors.setdefault(index, template_errors[path])
+                else:
+                    input_data[content_field] = template_contents[path]
+
+    def run_record(index: int, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {
+            "index": index,
+            "job_title": input_data.get("job_title"),
+            "company_name": input_data.get("company_name"),
+            "output_file_name": input_data.get("output_file_name"),
+        }
+        start_time = time.perf_counter()
+        if index in record_errors:
+            entry["status"] = "failed"
+            entry["error"], entry["traceback"] = record_errors[index]
+            entry["seconds"] = 0.0
+            return entry
+        try:
+            result = engine.run(input_data)
+            entry["status"] = "success"
+            entry["output_file_name"] = result.get("output_file_name")
+            entry["outputs"] = {
+                field: result.get(field)
+                for field in [
+                    "resume_docx_path",
+                    "resume_pdf_path",
+                    "cover_letter_docx_path",
+                    "cover_letter_pdf_path",
+                ]
+            }
+            entry["skipped_nodes"] = result.get("skipped_nodes", [])
+            entry["renders_avoided"] = result.get("renders_avoided", 0)
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = f"{type(e).__name__}: {e}"
+            entry["traceback"] = traceback.format_exc()
+        entry["seconds"] = round(time.perf_counter() - start_time, 3)
+        return entry
+
+    # Process the records with a bounded number of concurrent runs
+    batch_start = time.perf_counter()
+    entries = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(run_record, index, input_data) for index, input_data in enumerate(inputs)]
+        for future in as_completed(futures):
+            entries.append(future.result())
+    elapsed = time.perf_counter() - batch_start
+
+    entries.sort(key=lambda entry: entry["index"])
+    succeeded = sum(1 for entry in entries if entry["status"] == "success")
+
+    from utils.artifact_utils import get_artifact_store
+    from utils.llm_utils import get_llm_scheduler, get_output_stats
+
+    manifest = {
+        "total": len(entries),
+        "succeeded": succeeded,
+        "failed": len(entries) - succeeded,
+        "concurrency": concurrency,
+        "templates_parsed": len(template_contents),
+        "elapsed_seconds": round(elapsed, 3),
+        "jobs_per_minute": round(len(entries) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "llm_scheduler": get_llm_scheduler().stats(),
+        "structured_output": get_output_stats().stats(),
+        "artifact_store": get_artifact_store().stats(),
+        "records": entries,
+    }
+
+    # Write the summary manifest
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
@@ -0,0 +1,3 @@
+"""
+AIRG-LangGraph - Benchmarks
+"""
@@ -0,0 +1,98 @@
+"""
+AIRG-LangGraph - Benchmark of the content-addressed artifact store
+
+Creates the documents of a batch in which many jobs end up with the same
+generated content (as with a cached LLM response, or the same posting sent
+twice), then creates the batch again. Reports the DOCX and PDF renders run and
+avoided, the time spent creating documents and the disk space of the outputs:
+apparent size (every named file counted) versus actual size (each stored file
+counted once).
+
+Usage: python -m benchmarks.bench_artifact_store [--jobs N] [--distinct N]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from typing import Dict, Any, List
+
+# PDFs are rendered in this process (set before the settings are read)
+os.environ["AIRG_PDF_WORKERS"] = "0"
+
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from nodes.document_creation_node import create_documents
+from utils.artifact_utils import get_artifact_store
+from utils.docx_utils import process_template
+
+
+def disk_usage(directory: str) -> Dict[str, int]:
+    """
+    Apparent and actual size of the files under a directory (hardlinked files
+    are counted once in the actual size)
+    """
+    apparent = 0
+    inodes = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            stat = os.lstat(os.path.join(root, name))
+            apparent += stat.st_size
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return {"apparent": apparent, "actual": sum(inodes.values())}
+
+
+def build_states(jobs: int, distinct: int, resume: Dict[str, Any], cover_letter: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Graph states of a batch in which the jobs share `distinct` variants of generated content
+    """
+    states = []
+    for index in range(jobs):
+        variant = index % distinct
+        states.append({
+            "output_file_name": f"job_{index}",
+            "resume_template_content": resume,
+            "cover_letter_template_content": cover_letter,
+            "resume_content": {"summary": [f"{line} (variant {variant})" for line in resume["sections"]["summary"]]},
+            "cover_letter_content": {
+                "body": [f"{line} (variant {variant})" for line in cover_letter["sections"].get("body", [])]
+            },
+        })
+    return states
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the content-addressed artifact store")
+    parser.add_argument("--jobs", type=int, default=40, help="Number of jobs in the batch")
+    parser.add_argument("--distinct", type=int, default=10, help="Number of distinct generated contents")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        build_resume_document(60).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+        resume = process_template("resume.docx")
+        cover_letter = process_template("cover_letter.docx")
+        states = build_states(args.jobs, args.distinct, resume, cover_letter)
+        store = get_artifact_store()
+
+        print(f"{args.jobs} jobs with {args.distinct} distinct generated contents (2 documents per job)")
+        print(f"  {'pass':<14}{'renders run':>12}{'avoided':>10}{'seconds':>10}{'apparent':>12}{'actual':>12}")
+        for label in ["first batch", "same batch"]:
+            before = store.stats()
+            start_time = time.perf_counter()
+            for state in states:
+                create_documents(state)
+            seconds = time.perf_counter() - start_time
+            after = store.stats()
+
+            usage = disk_usage("output")
+            print(
+                f"  {label:<14}{2 * (after['misses'] - before['misses']):>12}"
+                f"{after['renders_avoided'] - before['renders_avoided']:>10}{seconds:>10.2f}"
+                f"{usage['apparent'] / 1024:>9.0f} KiB{usage['actual'] / 1024:>8.0f} KiB"
+            )
+        print(f"  outputs linked: {store.stats()['links']}")
+
+
+if __name__ == "__main__":
+    main()
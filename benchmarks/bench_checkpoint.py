@@ -0,0 +1,118 @@
+"""
+AIRG-LangGraph - Benchmark of the checkpoint write overhead
+
+Runs a linear graph whose state has the size of a real application state,
+without a checkpointer, with a stock SqliteSaver committing every write, and
+with the shared SessionCheckpointer, and reports the overhead per node.
+
+Usage: python -m benchmarks.bench_checkpoint [--runs N] [--nodes N] [--threads N]
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, TypedDict
+from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.sqlite import SqliteSaver
+from benchmarks.synthetic import build_resume_document
+from utils.docx_utils import analyze_paragraph_sections, extract_text_content
+from utils.checkpoint_utils import SessionCheckpointer
+
+
+class BenchState(TypedDict):
+    template_content: Dict[str, Any]
+    content: Dict[str, Any]
+    step: int
+
+
+def build_graph(nodes: int, checkpointer=None):
+    """
+    Build a linear graph of nodes each updating the generated content
+
+    Args:
+        nodes: Number of nodes
+        checkpointer: Optional checkpointer
+
+    Returns:
+        Compiled graph
+    """
+    builder = StateGraph(BenchState)
+
+    def node(state: BenchState) -> Dict[str, Any]:
+        return {"content": dict(state["content"], step=state["step"]), "step": state["step"] + 1}
+
+    for i in range(nodes):
+        builder.add_node(f"node_{i}", node)
+        if i:
+            builder.add_edge(f"node_{i - 1}", f"node_{i}")
+    builder.add_edge(f"node_{nodes - 1}", END)
+    builder.set_entry_point("node_0")
+    return builder.compile(checkpointer=checkpointer)
+
+
+def run(graph, runs: int, threads: int, initial_state: Dict[str, Any], after_run=None) -> float:
+    """
+    Run the graph several times, possibly concurrently
+
+    Returns:
+        Total duration in seconds
+    """
+    def run_one(i: int) -> None:
+        graph.invoke(initial_state, {"configurable": {"thread_id": f"bench-{time.time_ns()}-{i}"}})
+        if after_run is not None:
+            after_run()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run_one, range(runs)))
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the checkpoint write overhead")
+    parser.add_argument("--runs", type=int, default=50, help="Number of graph runs")
+    parser.add_argument("--nodes", type=int, default=5, help="Number of nodes of the graph")
+    parser.add_argument("--threads", type=int, default=1, help="Number of concurrent runs")
+    args = parser.parse_args()
+
+    # State of the size of a real run: a parsed template and its generated content
+    doc = build_resume_document(60)
+    sections, paragraph_sections = analyze_paragraph_sections(doc)
+    initial_state = {
+        "template_content": {
+            "text_content": extract_text_content(doc),
+            "sections": sections,
+            "paragraph_sections": paragraph_sections,
+        },
+        "content": sections,
+        "step": 0,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = run(build_graph(args.nodes), args.runs, args.threads, initial_state)
+
+        conn = sqlite3.connect(os.path.join(directory, "stock.db"), check_same_thread=False)
+        stock = run(build_graph(args.nodes, SqliteSaver(conn)), args.runs, args.threads, initial_state)
+        conn.close()
+
+        checkpointer = SessionCheckpointer(os.path.join(directory, "sessions.db"))
+        session = run(
+            build_graph(args.nodes, checkpointer), args.runs, args.threads, initial_state, checkpointer.flush
+        )
+        checkpointer.close()
+
+    node_runs = args.runs * args.nodes
+    print(f"{args.runs} runs x {args.nodes} nodes, {args.threads} thread(s)")
+    print(f"  {'checkpointer':<22} {'total (s)':>10} {'per node (ms)':>14} {'overhead/node (ms)':>19}")
+    for label, total in [("none", baseline), ("SqliteSaver", stock), ("SessionCheckpointer", session)]:
+        print(
+            f"  {label:<22} {total:>10.2f} {total / node_runs * 1000:>14.3f} "
+            f"{(total - baseline) / node_runs * 1000:>19.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
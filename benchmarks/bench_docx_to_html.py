@@ -0,0 +1,104 @@
+"""
+AIRG-LangGraph - Benchmark of the DOCX to HTML conversion
+
+Compares the in-process converter with the pandoc subprocess path on synthetic
+resumes of several sizes, and the full DOCX to PDF step when WeasyPrint is available.
+
+Usage: python -m benchmarks.bench_docx_to_html [--repeat N]
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Callable, List
+from benchmarks.synthetic import write_resume_documents
+from utils.html_utils import docx_to_html_string
+
+
+def time_call(func: Callable[[], object], repeat: int) -> List[float]:
+    """
+    Time repeated calls of a function
+
+    Args:
+        func: Function to call
+        repeat: Number of calls
+
+    Returns:
+        Duration of each call in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def pandoc_docx_to_html(docx_path: str) -> str:
+    """
+    Convert a DOCX file to HTML the way the pandoc path does: subprocess, temp file, read back
+
+    Args:
+        docx_path: Path to the DOCX file
+
+    Returns:
+        HTML document
+    """
+    fd, html_path = tempfile.mkstemp(suffix=".html")
+    os.close(fd)
+    try:
+        subprocess.run(["pandoc", docx_path, "-o", html_path], check=True, capture_output=True)
+        with open(html_path, encoding="utf-8") as f:
+            return f.read()
+    finally:
+        os.remove(html_path)
+
+
+def report(label: str, durations: List[float]) -> None:
+    """
+    Print the median and the best duration of a measurement
+    """
+    print(f"  {label:<22} median {statistics.median(durations) * 1000:8.2f} ms   best {min(durations) * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the DOCX to HTML conversion")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of runs per measurement")
+    parser.add_argument("--sizes", default="30,60,120", help="Comma-separated numbers of body paragraphs")
+    args = parser.parse_args()
+
+    has_pandoc = shutil.which("pandoc") is not None
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError):
+        HTML = None
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_resume_documents(directory, [int(size) for size in args.sizes.split(",")])
+
+        for size, path in paths.items():
+            print(f"Resume with ~{size} paragraphs ({os.path.getsize(path)} bytes)")
+            report("native -> HTML", time_call(lambda: docx_to_html_string(path), args.repeat))
+            if has_pandoc:
+                report("pandoc -> HTML", time_call(lambda: pandoc_docx_to_html(path), args.repeat))
+            else:
+                print("  pandoc -> HTML         skipped (pandoc not installed)")
+
+            if HTML is not None:
+                report("native -> PDF", time_call(
+                    lambda: HTML(string=docx_to_html_string(path)).write_pdf(), args.repeat
+                ))
+                if has_pandoc:
+                    report("pandoc -> PDF", time_call(
+                        lambda: HTML(string=pandoc_docx_to_html(path)).write_pdf(), args.repeat
+                    ))
+            else:
+                print("  -> PDF                 skipped (WeasyPrint not available)")
+
+
+if __name__ == "__main__":
+    main()
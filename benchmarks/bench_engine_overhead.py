@@ -0,0 +1,119 @@
+"""
+AIRG-LangGraph - Benchmark of the per-run overhead of the engine
+
+Measures what a run used to rebuild every time (the compiled graph, the Gemini
+client, the prompt chain) and the duration of complete runs with a fake LLM,
+rebuilding everything per run versus reusing a warm AIRGEngine. The rebuilt
+runs construct (and discard) a Gemini client per LLM call as before; the TLS
+handshakes a new client also pays on its first request are not included.
+
+Usage: python -m benchmarks.bench_engine_overhead [--runs N]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import statistics
+from typing import Callable, List
+
+# Neither the quota nor the rate limit applies to the fake model (set before the
+# scheduler settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template
+
+
+def durations_ms(func: Callable[[int], object], runs: int) -> List[float]:
+    """
+    Durations of repeated calls of a function (called with the run index), in milliseconds
+    """
+    durations = []
+    for i in range(runs):
+        start_time = time.perf_counter()
+        func(i)
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return durations
+
+
+def report(label: str, durations: List[float]) -> None:
+    """
+    Print the median and the best duration of a measurement
+    """
+    print(f"  {label:<36} median {statistics.median(durations):8.2f} ms   best {min(durations):8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the per-run overhead of the engine")
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        build_resume_document(60).save("resume.docx")
+        build_resume_document(20).save("cover_letter.docx")
+        template_content = process_template("resume.docx")
+
+        print("Objects previously built for every run")
+        report("Gemini client construction", durations_ms(lambda i: llm_utils.create_gemini_llm(), args.runs))
+
+        from app import create_graph
+
+        report("graph compilation", durations_ms(lambda i: create_graph(), args.runs))
+
+        print("Resume content generation with a fake LLM")
+
+        def generate_cold(i: int) -> None:
+            llm_utils.create_gemini_llm()
+            llm_utils.set_llm(EchoChatModel())
+            llm_utils.generate_resume_content(template_content, f"Engineer {i}", "Acme", "", "", use_cache=False)
+
+        def generate_warm(i: int) -> None:
+            llm_utils.generate_resume_content(template_content, f"Engineer {i}", "Acme", "", "", use_cache=False)
+
+        report("new client and chain per call", durations_ms(generate_cold, args.runs))
+        llm_utils.set_llm(EchoChatModel())
+        report("shared client and chain", durations_ms(generate_warm, args.runs))
+
+        print("Complete runs with a fake LLM")
+        try:
+            from engine import AIRGEngine
+            from utils.checkpoint_utils import SessionCheckpointer
+        except (ImportError, OSError) as e:
+            print(f"  skipped ({e})")
+            return
+
+        def input_data(i: int):
+            return {
+                "resume_source_path": "resume.docx",
+                "cover_letter_source_path": "cover_letter.docx",
+                "job_title": f"Engineer {i}",
+                "company_name": "Acme",
+                "output_file_name": f"run_{i}",
+                "use_llm_cache": False,
+            }
+
+        def run_cold(i: int) -> None:
+            checkpointer = SessionCheckpointer(os.path.join("output", "cold_sessions.db"))
+            # One client per LLM call (resume and cover letter)
+            llm_utils.create_gemini_llm()
+            llm_utils.create_gemini_llm()
+            llm_utils.set_llm(EchoChatModel())
+            create_graph(checkpointer).invoke(input_data(i), {"configurable": {"thread_id": f"cold-{i}"}})
+            checkpointer.close()
+
+        engine = AIRGEngine(llm=EchoChatModel()).warm_up()
+        engine.run(input_data(-1))
+
+        report("rebuilt per run", durations_ms(run_cold, args.runs))
+        report("warm engine", durations_ms(lambda i: engine.run(input_data(i)), args.runs))
+
+
+if __name__ == "__main__":
+    main()
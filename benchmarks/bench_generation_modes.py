@@ -0,0 +1,93 @@
+"""
+AIRG-LangGraph - Benchmark of the generation modes
+
+Generates the content of a synthetic resume and cover letter in the document,
+compact and sections modes with a fake LLM whose latency grows with the number
+of output tokens, and reports the requests, the estimated tokens and the latency
+of each mode.
+
+Usage: python -m benchmarks.bench_generation_modes [--runs N] [--paragraphs N]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+# Neither the quota nor the rate limit applies to the fake model (set before the
+# scheduler settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+os.environ["AIRG_LLM_MAX_CONCURRENCY"] = "8"
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the generation modes")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs per mode")
+    parser.add_argument("--paragraphs", type=int, default=60, help="Approximate number of resume body paragraphs")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated fixed latency per request in seconds")
+    parser.add_argument(
+        "--output-token-seconds", type=float, default=0.005, help="Simulated latency per output token in seconds"
+    )
+    args = parser.parse_args()
+
+    llm = EchoChatModel(latency=args.latency, output_token_seconds=args.output_token_seconds)
+    llm_utils.set_llm(llm)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        build_resume_document(args.paragraphs).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+        resume_template_content = process_template("resume.docx")
+        cover_letter_template_content = process_template("cover_letter.docx")
+
+        print(
+            f"Fake LLM: {args.latency * 1000:.0f} ms per request + {args.output_token_seconds * 1000:.1f} ms "
+            "per output token (tokens estimated at 4 characters per token)"
+        )
+        print(f"  {'document':<14}{'mode':<10}{'requests':>9}{'input tokens':>14}{'output tokens':>15}{'latency':>12}")
+
+        for document in ["resume", "cover_letter"]:
+            baseline = None
+            for mode in llm_utils.GENERATION_MODES:
+                durations = []
+                llm.reset_usage()
+                for i in range(args.runs):
+                    start_time = time.perf_counter()
+                    # Every line is sent, so that only the modes are compared (see bench_ranking)
+                    if document == "resume":
+                        llm_utils.generate_resume_content(
+                            resume_template_content, f"Engineer {i}", "Acme", "Build services.", "",
+                            use_cache=False, mode=mode, top_k=0,
+                        )
+                    else:
+                        llm_utils.generate_cover_letter_content(
+                            cover_letter_template_content, f"Engineer {i}", "Acme", "Build services.", "",
+                            "Alex", "unknown", use_cache=False, mode=mode, top_k=0,
+                        )
+                    durations.append(time.perf_counter() - start_time)
+
+                usage = llm.usage()
+                latency = statistics.median(durations)
+                baseline = baseline or (usage["output_tokens"], latency)
+                print(
+                    f"  {document:<14}{mode:<10}{usage['calls'] / args.runs:>9.1f}"
+                    f"{usage['input_tokens'] // args.runs:>14}{usage['output_tokens'] // args.runs:>15}"
+                    f"{latency * 1000:>9.0f} ms"
+                    + (
+                        f"   ({usage['output_tokens'] / baseline[0]:.0%} of the output tokens, "
+                        f"{latency / baseline[1]:.0%} of the latency)"
+                        if mode != "document" else ""
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
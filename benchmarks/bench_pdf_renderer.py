@@ -0,0 +1,121 @@
+"""
+AIRG-LangGraph - Benchmark of the reusable PDF renderer
+
+Compares the cold path, where every PDF sets WeasyPrint up again (font
+configuration, base stylesheet, fetched resources) as html_to_pdf() used to,
+with one PDFRenderer rendering every document after a warm-up render. Also
+compares rendering a resume and its cover letter as two PDFs with rendering
+them together into one. The DOCX to HTML conversion is done beforehand and
+not timed. The measurements are written as JSON, with the WeasyPrint version.
+
+Usage: python -m benchmarks.bench_pdf_renderer [--repeat N] [--output results.json]
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from typing import Callable, Dict, List
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils.html_utils import docx_to_html_string
+
+
+def time_call(func: Callable[[int], object], repeat: int) -> List[float]:
+    """
+    Time repeated calls of a function (with the call index)
+    """
+    durations = []
+    for index in range(repeat):
+        start_time = time.perf_counter()
+        func(index)
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """
+    Median and slowest duration in milliseconds
+    """
+    return {"median": statistics.median(durations) * 1000, "max": max(durations) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the reusable PDF renderer")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of PDFs rendered per path")
+    parser.add_argument("--output", default="pdf_renderer_results.json", help="Path of the JSON results")
+    args = parser.parse_args()
+
+    try:
+        from weasyprint import HTML, __version__ as weasyprint_version
+        from utils.pdf_utils import PDFRenderer
+    except (ImportError, OSError) as e:
+        print(f"Skipped: WeasyPrint is not available ({str(e).splitlines()[0]})")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        resume_path = os.path.join(directory, "resume.docx")
+        cover_letter_path = os.path.join(directory, "cover_letter.docx")
+        build_resume_document(60).save(resume_path)
+        build_cover_letter_document().save(cover_letter_path)
+
+        # The cold path embeds the base stylesheet in each document; the renderer applies its parsed copy
+        documents = {
+            "cold": [docx_to_html_string(path) for path in [resume_path, cover_letter_path]],
+            "warm": [docx_to_html_string(path, include_base_css=False) for path in [resume_path, cover_letter_path]],
+        }
+
+    # First PDF of a new renderer, which creates the font configuration and parses the stylesheet
+    start_time = time.perf_counter()
+    renderer = PDFRenderer()
+    renderer.render(documents["warm"][0])
+    warm_up = (time.perf_counter() - start_time) * 1000
+
+    results = {
+        "cold path (new setup per PDF)": summarize(
+            time_call(lambda i: HTML(string=documents["cold"][i % 2]).write_pdf(), args.repeat)
+        ),
+        "renderer after warm-up": summarize(
+            time_call(lambda i: renderer.render(documents["warm"][i % 2]), args.repeat)
+        ),
+    }
+
+    # Resume and cover letter: two PDFs, or one PDF with both documents
+    pairs = max(1, args.repeat // 2)
+    pair_results = {
+        "two PDFs (render_many)": summarize(time_call(lambda i: renderer.render_many(documents["warm"]), pairs)),
+        "one PDF (render_together)": summarize(
+            time_call(lambda i: renderer.render_together(documents["warm"]), pairs)
+        ),
+    }
+
+    print(f"Per-PDF latency over {args.repeat} renders (resume and cover letter alternately)")
+    print(f"  {'path':<32}{'median ms':>11}{'max ms':>10}")
+    for label, result in results.items():
+        print(f"  {label:<32}{result['median']:>11.1f}{result['max']:>10.1f}")
+    cold, warm = (result["median"] for result in results.values())
+    speedup = cold / warm if warm else 0.0
+    print(f"  first PDF of a renderer: {warm_up:.1f} ms; warm speedup {speedup:.2f}x")
+
+    print(f"\nResume and cover letter, {pairs} pairs")
+    for label, result in pair_results.items():
+        print(f"  {label:<32}{result['median']:>11.1f}{result['max']:>10.1f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "weasyprint": weasyprint_version,
+                "repeat": args.repeat,
+                "first_pdf_ms": round(warm_up, 1),
+                "per_pdf": {label: {key: round(value, 1) for key, value in result.items()} for label, result in results.items()},
+                "warm_speedup": round(speedup, 2),
+                "pairs": {label: {key: round(value, 1) for key, value in result.items()} for label, result in pair_results.items()},
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nResults: {args.output}")
+
+if __name__ == "__main__":
+    main()
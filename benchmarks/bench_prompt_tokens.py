@@ -0,0 +1,104 @@
+"""
+AIRG-LangGraph - Benchmark of the prompt sizes
+
+Counts the tokens of the resume and cover letter prompts of a synthetic
+template with the previous serialization (indented template text and
+sections serialized with indent=2) and with the compact one, then shows how
+the token budget trims an oversized job description.
+
+Usage: python -m benchmarks.bench_prompt_tokens [--paragraphs N] [--budget N]
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template
+from utils.prompt_utils import count_message_tokens, count_tokens, render_prompt
+
+JOB_DESCRIPTION = """
+    We are looking for a Senior Platform Engineer to design, build and operate the services that power
+    our product.    You will work with   product, design and data teams.
+
+    Responsibilities:
+      - Own the reliability of our core services
+      - Improve the performance of our data pipelines
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the prompt sizes")
+    parser.add_argument("--paragraphs", type=int, default=60, help="Approximate number of resume body paragraphs")
+    parser.add_argument("--budget", type=int, default=3000, help="Token budget used for the trimming example")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        build_resume_document(args.paragraphs).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+        resume = process_template("resume.docx")
+        cover_letter = process_template("cover_letter.docx")
+
+    cases = [
+        (
+            "resume",
+            [("system", llm_utils.RESUME_SYSTEM_PROMPT), ("human", llm_utils.RESUME_HUMAN_PROMPT)],
+            lambda: llm_utils.build_resume_prompt(resume, "Platform Engineer", "Acme", JOB_DESCRIPTION, "Acme builds tools."),
+            resume["sections"],
+        ),
+        (
+            "cover_letter",
+            [("system", llm_utils.COVER_LETTER_SYSTEM_PROMPT), ("human", llm_utils.COVER_LETTER_HUMAN_PROMPT)],
+            lambda: llm_utils.build_cover_letter_prompt(
+                cover_letter, "Platform Engineer", "Acme", JOB_DESCRIPTION, "Acme builds tools.", "Alex", "unknown"
+            ),
+            cover_letter["sections"],
+        ),
+    ]
+
+    print("Prompt tokens (estimated locally)")
+    for name, raw_messages, build, sections in cases:
+        prompt, variables = build()
+
+        # Previous serialization: indented templates and verbatim variables
+        previous_variables = {
+            **variables,
+            "job_description": JOB_DESCRIPTION,
+            "sections": json.dumps(sections, indent=2),
+        }
+        previous_tokens = count_message_tokens(
+            ChatPromptTemplate.from_messages(raw_messages).format_messages(**previous_variables)
+        )
+
+        start_time = time.perf_counter()
+        _, tokens = render_prompt(prompt, variables, budget=0)
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"  {name:<14} previous {previous_tokens:6d}   compact {tokens:6d} "
+            f"({tokens / previous_tokens:.0%})   rendered and counted in {elapsed * 1000:.2f} ms"
+        )
+
+    # Trim an oversized job description to the budget
+    prompt, variables = llm_utils.build_resume_prompt(
+        resume, "Platform Engineer", "Acme", JOB_DESCRIPTION * 40, "Acme builds tools. " * 200
+    )
+    _, untrimmed = render_prompt(prompt, variables, budget=0)
+    messages, trimmed = render_prompt(prompt, variables, budget=args.budget)
+    human = messages[-1].content
+    print(f"\nOversized resume prompt: {untrimmed} tokens, {trimmed} after trimming to a budget of {args.budget}")
+    for variable, label, end_label in [
+        ("company_overview", "Company Overview:", "Additional Relevant Experience:"),
+        ("job_description", "Job Description:", "Company Overview:"),
+    ]:
+        kept = human.split(label, 1)[1].split(end_label, 1)[0]
+        print(f"  {variable:<18} {count_tokens(variables[variable]):6d} tokens -> {count_tokens(kept):6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+AIRG-LangGraph - Benchmark of the relevance ranking of resume lines
+
+Generates the content of synthetic senior-level resumes of several lengths (in
+the default document mode, or the mode given) with a fake LLM whose latency
+grows with the number of output tokens, sending every experience/skills line or only the top-k most relevant
+ones, and reports the prompt size, the output tokens and the latency.
+
+Usage: python -m benchmarks.bench_ranking [--runs N] [--top-k K ...] [--mode MODE]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+# Neither the quota nor the rate limit applies to the fake model (set before the
+# scheduler settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_senior_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template
+from utils.ranking_utils import prune_sections
+
+JOB_DESCRIPTION = (
+    "We are hiring a Staff Platform Engineer to run our Kubernetes clusters and Terraform infrastructure, "
+    "build Go services and Kafka pipelines, and improve observability with Prometheus."
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the relevance ranking of resume lines")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs per measurement")
+    parser.add_argument("--bullets", type=int, nargs="+", default=[60, 120, 240], help="Experience bullets per resume")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[0, 10, 20], help="Lines kept per ranked section")
+    parser.add_argument("--mode", choices=llm_utils.GENERATION_MODES, default="document", help="Generation mode")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated fixed latency per request in seconds")
+    parser.add_argument(
+        "--output-token-seconds", type=float, default=0.005, help="Simulated latency per output token in seconds"
+    )
+    args = parser.parse_args()
+
+    llm = EchoChatModel(latency=args.latency, output_token_seconds=args.output_token_seconds)
+    llm_utils.set_llm(llm)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        print(
+            f"Fake LLM: {args.latency * 1000:.0f} ms per request + {args.output_token_seconds * 1000:.1f} ms "
+            f"per output token (tokens estimated at 4 characters per token); {args.mode} mode"
+        )
+        print(f"  {'bullets':>7}{'top-k':>7}{'ranking':>11}{'input tokens':>14}{'output tokens':>15}{'latency':>12}")
+
+        for bullets in args.bullets:
+            build_senior_resume_document(bullets, skills=bullets // 3).save(f"resume_{bullets}.docx")
+            template_content = process_template(f"resume_{bullets}.docx")
+
+            baseline = None
+            for top_k in args.top_k:
+                # Time the ranking alone
+                start_time = time.perf_counter()
+                prune_sections(template_content["sections"], JOB_DESCRIPTION, top_k)
+                ranking_seconds = time.perf_counter() - start_time
+
+                durations = []
+                llm.reset_usage()
+                for i in range(args.runs):
+                    start_time = time.perf_counter()
+                    llm_utils.generate_resume_content(
+                        template_content, f"Staff Engineer {i}", "Acme", JOB_DESCRIPTION, "",
+                        use_cache=False, mode=args.mode, top_k=top_k,
+                    )
+                    durations.append(time.perf_counter() - start_time)
+
+                usage = llm.usage()
+                latency = statistics.median(durations)
+                baseline = baseline or latency
+                print(
+                    f"  {bullets:>7}{top_k or 'all':>7}{ranking_seconds * 1000:>8.2f} ms"
+                    f"{usage['input_tokens'] // args.runs:>14}{usage['output_tokens'] // args.runs:>15}"
+                    f"{latency * 1000:>9.0f} ms"
+                    + (f"   ({latency / baseline:.0%} of the latency)" if top_k else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
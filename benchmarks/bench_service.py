@@ -0,0 +1,198 @@
+"""
+AIRG-LangGraph - Load test of the HTTP service
+
+Starts the service in this process with a fake LLM, uploads a synthetic resume
+and cover letter, then has concurrent clients submit a burst of jobs. A client
+whose job is rejected with 429 waits for the Retry-After delay and submits it
+again; an accepted job is polled until it is done and its documents are
+downloaded. Reports how long submissions took to be answered, how many were
+rejected, the queue depth, the job latencies and the throughput.
+
+Usage: python -m benchmarks.bench_service [--jobs N] [--clients N] [--workers N]
+       [--queue-size N] [--latency SECONDS]
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+# Neither the quota nor the rate limit applies to the fake model (set before the
+# scheduler settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils import llm_utils
+
+
+def request(
+    base_url: str, method: str, path: str, body: Optional[bytes] = None
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Send an HTTP request to the service
+
+    Returns:
+        Tuple containing the status code, the response headers and the body
+    """
+    req = urllib.request.Request(base_url + path, data=body, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Value below which the given fraction of the values fall
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the HTTP service")
+    parser.add_argument("--jobs", type=int, default=40, help="Number of jobs submitted")
+    parser.add_argument("--clients", type=int, default=20, help="Number of concurrent clients")
+    parser.add_argument("--workers", type=int, default=4, help="Number of service workers")
+    parser.add_argument("--queue-size", type=int, default=8, help="Size of the service queue")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated latency per LLM request in seconds")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="Number of PDF render worker processes")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        build_resume_document(60).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+
+        from service import create_server
+
+        if args.pdf_workers is not None:
+            from utils.pdf_utils import configure_render_pool
+
+            configure_render_pool(args.pdf_workers)
+
+        llm_utils.set_llm(EchoChatModel(latency=args.latency))
+        server = create_server("127.0.0.1", 0, workers=args.workers, queue_size=args.queue_size)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        # Upload the templates
+        template_ids = {}
+        for document_name in ["resume", "cover_letter"]:
+            with open(f"{document_name}.docx", "rb") as f:
+                status, _, body = request(base_url, "POST", "/templates", f.read())
+            template_ids[f"{document_name}_template_id"] = json.loads(body)["template_id"]
+
+        # Sample the queue depth while the load test runs
+        depths: List[int] = []
+        sampling = threading.Event()
+
+        def sample_queue() -> None:
+            while not sampling.is_set():
+                _, _, body = request(base_url, "GET", "/health")
+                depths.append(json.loads(body)["queue_depth"])
+                time.sleep(0.05)
+
+        submit_ms: List[float] = []
+        job_seconds: List[float] = []
+        results: Dict[str, int] = {"succeeded": 0, "failed": 0, "rejected": 0, "downloaded_bytes": 0}
+        lock = threading.Lock()
+        next_job = iter(range(args.jobs))
+
+        def client() -> None:
+            while True:
+                with lock:
+                    index = next(next_job, None)
+                if index is None:
+                    return
+
+                record: Dict[str, Any] = {
+                    **template_ids,
+                    "job_title": f"Engineer {index}",
+                    "company_name": "Acme",
+                    "job_description": "Build reliable services.",
+                    "use_llm_cache": False,
+                    "use_node_cache": False,
+                }
+
+                # Submit the job, backing off while the queue is full
+                start_time = time.perf_counter()
+                while True:
+                    submitted_at = time.perf_counter()
+                    status, headers, body = request(base_url, "POST", "/jobs", json.dumps(record).encode("utf-8"))
+                    with lock:
+                        submit_ms.append((time.perf_counter() - submitted_at) * 1000)
+                    if status != 429:
+                        break
+                    with lock:
+                        results["rejected"] += 1
+                    time.sleep(float(headers.get("Retry-After", "1")))
+                job_id = json.loads(body)["job_id"]
+
+                # Wait for the job, then download its documents
+                while True:
+                    _, _, body = request(base_url, "GET", f"/jobs/{job_id}")
+                    job = json.loads(body)
+                    if job["status"] in ("succeeded", "failed"):
+                        break
+                    time.sleep(0.05)
+                downloaded = 0
+                for url in job.get("artifacts", {}).values():
+                    downloaded += len(request(base_url, "GET", url)[2])
+
+                with lock:
+                    job_seconds.append(time.perf_counter() - start_time)
+                    results[job["status"]] += 1
+                    results["downloaded_bytes"] += downloaded
+
+        sampler = threading.Thread(target=sample_queue, daemon=True)
+        sampler.start()
+        load_start = time.perf_counter()
+        clients = [threading.Thread(target=client) for _ in range(args.clients)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - load_start
+        sampling.set()
+        sampler.join()
+
+        server.shutdown()
+        server.server_close()
+        server.service.stop()
+
+    print(
+        f"{args.jobs} jobs from {args.clients} clients, {args.workers} workers, queue of {args.queue_size}, "
+        f"{args.latency:g}s per LLM request"
+    )
+    print(
+        f"  submissions answered in     median {statistics.median(submit_ms):8.2f} ms   "
+        f"p95 {percentile(submit_ms, 0.95):8.2f} ms   max {max(submit_ms):8.2f} ms"
+    )
+    print(f"  rejected with 429           {results['rejected']:>5} ({results['rejected'] / len(submit_ms):.0%} of submissions)")
+    print(f"  queue depth                 median {statistics.median(depths or [0]):>5}   max {max(depths or [0]):>5}")
+    print(
+        f"  job latency (with retries)  median {statistics.median(job_seconds):8.2f} s    "
+        f"p95 {percentile(job_seconds, 0.95):8.2f} s"
+    )
+    print(
+        f"  completed                   {results['succeeded']} succeeded, {results['failed']} failed in {elapsed:.1f}s "
+        f"({results['succeeded'] / elapsed * 60:.1f} jobs/minute), {results['downloaded_bytes'] / 1024:.0f} KiB downloaded"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+AIRG-LangGraph - Startup time regression check of the CLI
+
+Runs the commands that must answer without loading the generation stack
+(--help, argument errors) in fresh interpreters, and fails when one of them
+exceeds the time limit or imports a heavy dependency. tests/test_startup.py
+runs the same check once per command under pytest.
+
+Usage: python -m benchmarks.bench_startup [--runs N] [--limit SECONDS]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import tempfile
+from typing import Dict, Any, List
+
+from utils.import_utils import run_with_import_times
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Commands answered by click alone
+COMMANDS = [
+    ["--help"],
+    ["generate", "--help"],
+    ["batch", "--help"],
+    ["--job-title", "Engineer"],
+    ["batch", "missing.jsonl"],
+]
+
+# Dependencies only the commands running the graph may load
+HEAVY_MODULES = ["langgraph", "langchain_core", "langchain_google_genai", "google.genai", "docx", "weasyprint"]
+
+
+def heavy_imports(result: Dict[str, Any]) -> List[str]:
+    """
+    Find the heavy dependencies a command imported
+
+    Args:
+        result: Result of run_with_import_times()
+
+    Returns:
+        Sorted names of the heavy modules that were imported
+    """
+    return sorted(
+        {
+            module
+            for entry in result["imports"]
+            for module in HEAVY_MODULES
+            if entry["module"] == module or entry["module"].startswith(module + ".")
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the startup time of the CLI")
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs per command")
+    parser.add_argument("--limit", type=float, default=1.0, help="Maximum median wall time in seconds")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for command in COMMANDS:
+            label = " ".join(command)
+            durations = []
+            for _ in range(args.runs):
+                # Run without an API key, as when it is missing
+                result = run_with_import_times([MAIN_PATH] + command, cwd=directory)
+                durations.append(result["seconds"])
+
+            median = statistics.median(durations)
+            heavy = heavy_imports(result)
+            print(
+                f"  {label:<28} exit {result['returncode']}   median {median * 1000:7.1f} ms   "
+                f"best {min(durations) * 1000:7.1f} ms   {len(result['imports'])} modules"
+            )
+
+            if median > args.limit:
+                failures.append(f"{label}: {median:.2f}s exceeds {args.limit:.2f}s")
+            if heavy:
+                failures.append(f"{label}: imports {', '.join(heavy)}")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nAll commands answered within {args.limit:.2f}s without loading the generation stack")
+
+
+if __name__ == "__main__":
+    main()
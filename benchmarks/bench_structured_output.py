@@ -0,0 +1,98 @@
+"""
+AIRG-LangGraph - Benchmark of the repair of malformed LLM responses
+
+Generates the content of a synthetic resume and cover letter with a fake LLM
+that answers a share of the requests with malformed JSON (trailing comma, prose
+around the object, unclosed code fence, truncated object or missing section),
+and reports how many runs the previous strict parser would have failed, the
+repair and follow-up rates, and the extra requests spent on follow-ups.
+
+Usage: python -m benchmarks.bench_structured_output [--runs N] [--defect-rate R ...]
+"""
+
+import os
+import logging
+import argparse
+import tempfile
+
+# Neither the quota nor the rate limit applies to the fake model (set before the
+# scheduler settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the repair of malformed LLM responses")
+    parser.add_argument("--runs", type=int, default=50, help="Number of runs per defect rate and mode")
+    parser.add_argument("--defect-rate", type=float, nargs="+", default=[0.0, 0.1, 0.3], help="Share of malformed responses")
+    args = parser.parse_args()
+
+    # The repairs are counted, not logged one by one
+    logging.getLogger("utils.llm_utils").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        build_resume_document(30).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+        resume = process_template("resume.docx")
+        cover_letter = process_template("cover_letter.docx")
+
+        print(f"{args.runs} resumes and cover letters per defect rate and mode")
+        print(
+            f"  {'defects':>7}  {'mode':<10}{'strict failures':>16}{'complete':>10}"
+            f"{'repair rate':>13}{'follow-ups':>12}{'requests':>10}"
+        )
+
+        for defect_rate in args.defect_rate:
+            for mode in ["document", "sections"]:
+                llm = EchoChatModel(defect_rate=defect_rate, seed=1)
+                llm_utils.set_llm(llm)
+                stats = llm_utils.get_output_stats()
+
+                strict_failures = 0
+                complete = 0
+                before = stats.stats()
+                for i in range(args.runs):
+                    run_before = stats.stats()
+                    resume_content = llm_utils.generate_resume_content(
+                        resume, f"Engineer {i}", "Acme", "Build services.", "", use_cache=False, mode=mode,
+                    )
+                    cover_letter_content = llm_utils.generate_cover_letter_content(
+                        cover_letter, f"Engineer {i}", "Acme", "Build services.", "", "Alex", "unknown",
+                        use_cache=False, mode=mode,
+                    )
+                    run_after = stats.stats()
+
+                    # The strict parser raised on any response that needed a repair
+                    if any(run_after[name] > run_before[name] for name in ["repaired", "unparseable"]):
+                        strict_failures += 1
+
+                    # Every non-empty section of both documents is tailored
+                    if all(
+                        content.get(name) and all(line.endswith("(tailored)") for line in content[name])
+                        for template, content, document in [
+                            (resume, resume_content, "resume"), (cover_letter, cover_letter_content, "cover_letter"),
+                        ]
+                        for name, lines in template["sections"].items()
+                        if lines and name not in llm_utils.PROTECTED_SECTIONS[document]
+                    ):
+                        complete += 1
+
+                after = stats.stats()
+                responses = after["responses"] - before["responses"]
+                repaired = after["repaired"] - before["repaired"]
+                followups = after["followups"] - before["followups"]
+                print(
+                    f"  {defect_rate:>7.0%}  {mode:<10}{strict_failures / args.runs:>16.0%}{complete / args.runs:>10.0%}"
+                    f"{repaired / responses if responses else 0:>13.1%}{followups:>12}"
+                    f"{llm.usage()['calls'] / args.runs:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
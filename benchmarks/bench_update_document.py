@@ -0,0 +1,110 @@
+"""
+AIRG-LangGraph - Benchmark of the document update
+
+Compares update_document_content(), which uses the paragraph to section mapping
+computed when the template is read, with the previous implementation matching
+every paragraph's text against every section, on synthetic resumes of 50 to
+500 paragraphs.
+
+Usage: python -m benchmarks.bench_update_document [--repeat N]
+"""
+
+import time
+import argparse
+import statistics
+from typing import Dict, List
+from docx import Document
+from benchmarks.synthetic import build_resume_document
+from utils.docx_utils import analyze_paragraph_sections, analyze_document_structure, update_document_content
+
+
+def legacy_update_document_content(doc: Document, updated_sections: Dict[str, List[str]]) -> Document:
+    """
+    Previous implementation of update_document_content(), kept for comparison
+    """
+    new_doc = Document()
+    for style in doc.styles:
+        if style.name not in new_doc.styles:
+            try:
+                new_doc.styles.add_style(style.name, style.type)
+            except:
+                pass
+    
+    original_sections = analyze_document_structure(doc)
+    processed_sections = set()
+    
+    for paragraph in doc.paragraphs:
+        text = paragraph.text.strip()
+        current_section = None
+        for section_name, section_content in original_sections.items():
+            if text in section_content and section_name not in processed_sections:
+                current_section = section_name
+                break
+        
+        if current_section and current_section in updated_sections and current_section not in processed_sections:
+            for updated_text in updated_sections[current_section]:
+                p = new_doc.add_paragraph(updated_text)
+                try:
+                    p.style = paragraph.style.name
+                except:
+                    pass
+            processed_sections.add(current_section)
+        else:
+            p = new_doc.add_paragraph(paragraph.text)
+            try:
+                p.style = paragraph.style.name
+            except:
+                pass
+    
+    for table in doc.tables:
+        new_table = new_doc.add_table(rows=len(table.rows), cols=len(table.columns))
+        try:
+            new_table.style = table.style
+        except:
+            pass
+        for i, row in enumerate(table.rows):
+            for j, cell in enumerate(row.cells):
+                for paragraph in cell.paragraphs:
+                    new_table.cell(i, j).text = paragraph.text
+    
+    return new_doc
+
+
+def median_ms(func, repeat: int) -> float:
+    """
+    Median duration of repeated calls of a function, in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start_time)
+    return statistics.median(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the document update")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per measurement")
+    parser.add_argument("--sizes", default="50,100,250,500", help="Comma-separated numbers of body paragraphs")
+    args = parser.parse_args()
+    
+    print(f"{'paragraphs':>10} {'legacy (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        doc = build_resume_document(size)
+        sections, paragraph_sections = analyze_paragraph_sections(doc)
+        
+        # Rewrite the sections the model usually tailors
+        updated_sections = {
+            name: [f"{line} (tailored)" for line in sections[name]]
+            for name in ["summary", "experience", "skills"]
+        }
+        
+        legacy = median_ms(lambda: legacy_update_document_content(doc, updated_sections), args.repeat)
+        indexed = median_ms(
+            lambda: update_document_content(doc, updated_sections, paragraph_sections), args.repeat
+        )
+        print(f"{len(doc.paragraphs):>10} {legacy:>12.1f} {indexed:>13.1f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+AIRG-LangGraph - Benchmark of a fleet of worker processes sharing the job queue
+
+Queues synthetic jobs, then drains the queue with 1, 2, 4, ... worker processes
+running a fake LLM, and reports the throughput of each fleet size from the
+first lease to the last finished job (process startup excluded). With --rpm, the
+fleet shares one requests-per-minute limit, and the throughput levels off at
+the limit instead of growing with the workers.
+
+A recovery test then kills a worker holding leases and checks that another
+worker leases its jobs again once the visibility timeout expires.
+
+Usage: python -m benchmarks.bench_worker_fleet [--jobs N] [--workers 1 2 4]
+       [--latency SECONDS] [--rpm RPM]
+"""
+
+import os
+import time
+import signal
+import sqlite3
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from typing import Dict, Any
+
+# No daily quota applies to the fake model, and PDFs are rendered in the worker
+# processes (set before the settings are read; the RPM limit is inherited by the
+# worker processes)
+os.environ.setdefault("AIRG_LLM_RPM", "0")
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+os.environ["AIRG_PDF_WORKERS"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+
+
+def run_worker(
+    directory: str, queue_path: str, latency: float, concurrency: int, visibility_timeout: float, start: Any = None
+) -> None:
+    """
+    Worker process: drain the queue with a fake LLM, once every worker of the
+    fleet is warm (start barrier)
+    """
+    from benchmarks.fake_llm import EchoChatModel
+    from engine import get_engine
+    from utils import llm_utils
+    from utils.checkpoint_utils import configure_checkpointer
+    from worker import Worker, worker_sessions_path
+
+    os.chdir(directory)
+    logging.getLogger().setLevel(logging.ERROR)
+    configure_checkpointer(worker_sessions_path(), delete_on_exit=True)
+    llm_utils.set_llm(EchoChatModel(latency=latency))
+    get_engine().warm_up()
+    if start is not None:
+        start.wait()
+    Worker(
+        queue_path,
+        concurrency=concurrency,
+        visibility_timeout=visibility_timeout,
+        poll_interval=0.1,
+        exit_when_empty=True,
+    ).run()
+
+
+def queue_span(queue_path: str) -> Dict[str, Any]:
+    """
+    Summarize a drained queue: job counts, re-leased jobs and the time from the
+    first lease to the last finished job
+    """
+    with sqlite3.connect(queue_path) as conn:
+        succeeded, failed, released, first, last = conn.execute(
+            "SELECT SUM(status = 'succeeded'), SUM(status = 'failed'), SUM(attempts > 1), "
+            "MIN(started_at), MAX(finished_at) FROM jobs"
+        ).fetchone()
+    return {
+        "succeeded": succeeded or 0,
+        "failed": failed or 0,
+        "released": released or 0,
+        "seconds": (last - first) if first and last else 0.0,
+    }
+
+
+def enqueue_jobs(queue_path: str, count: int, prefix: str) -> None:
+    from worker import enqueue_records
+
+    enqueue_records(
+        [
+            {
+                "job_title": f"Engineer {index}",
+                "company_name": "Acme",
+                "job_description": "Build reliable services.",
+                "output_file_name": f"{prefix}_{index}",
+            }
+            for index in range(count)
+        ],
+        defaults={
+            "resume_template": "resume.docx",
+            "cover_letter_template": "cover_letter.docx",
+            "use_llm_cache": False,
+            "use_node_cache": False,
+        },
+        queue_path=queue_path,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark a fleet of worker processes sharing the job queue")
+    parser.add_argument("--jobs", type=int, default=24, help="Number of queued jobs per fleet size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Fleet sizes")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs run at the same time by each worker")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated latency per LLM request in seconds")
+    parser.add_argument("--rpm", type=float, default=0.0, help="Requests per minute shared by the fleet (0 for no limit)")
+    args = parser.parse_args()
+
+    # The worker processes read the shared RPM limit from the environment
+    os.environ["AIRG_LLM_RPM"] = str(args.rpm)
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        build_resume_document(60).save("resume.docx")
+        build_cover_letter_document().save("cover_letter.docx")
+
+        print(
+            f"{args.jobs} jobs per fleet, {args.concurrency} job(s) at a time per worker, "
+            f"{args.latency:g}s per LLM request" + (f", {args.rpm:g} RPM shared" if args.rpm else "")
+        )
+        print(f"  {'workers':>7}{'seconds':>10}{'jobs/minute':>13}{'speedup':>9}{'failed':>8}")
+
+        baseline = None
+        for workers in args.workers:
+            queue_path = os.path.join(directory, f"queue_{workers}.db")
+            enqueue_jobs(queue_path, args.jobs, f"fleet{workers}")
+
+            start = context.Barrier(workers)
+            processes = [
+                context.Process(
+                    target=run_worker, args=(directory, queue_path, args.latency, args.concurrency, 60.0, start)
+                )
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            span = queue_span(queue_path)
+            throughput = span["succeeded"] / span["seconds"] * 60 if span["seconds"] else 0.0
+            baseline = baseline or throughput
+            print(
+                f"  {workers:>7}{span['seconds']:>10.1f}{throughput:>13.1f}"
+                f"{throughput / baseline if baseline else 0:>8.2f}x{span['failed']:>8}"
+            )
+
+        # Kill a worker holding leases; a second worker takes its jobs over once
+        # the visibility timeout expires
+        os.environ["AIRG_LLM_RPM"] = "0"
+        queue_path = os.path.join(directory, "queue_recovery.db")
+        enqueue_jobs(queue_path, 4, "recovery")
+        visibility_timeout = 3.0
+
+        doomed = context.Process(target=run_worker, args=(directory, queue_path, 30.0, 2, visibility_timeout))
+        doomed.start()
+        while True:
+            with sqlite3.connect(queue_path) as conn:
+                if conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'leased'").fetchone()[0]:
+                    break
+            time.sleep(0.1)
+        os.kill(doomed.pid, signal.SIGKILL)
+        doomed.join()
+
+        start_time = time.perf_counter()
+        survivor = context.Process(target=run_worker, args=(directory, queue_path, args.latency, 2, visibility_timeout))
+        survivor.start()
+        survivor.join()
+        span = queue_span(queue_path)
+        print(
+            f"\nRecovery: worker killed while holding leases; {span['released']} jobs leased again after the "
+            f"{visibility_timeout:g}s visibility timeout, {span['succeeded']}/4 succeeded "
+            f"in {time.perf_counter() - start_time:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+AIRG-LangGraph - Benchmark of writing the generated DOCX documents
+
+Compares rebuilding the document with python-docx (update_document_content()
+and save_document()) with patching the template package in place
+(write_updated_docx()), on synthetic templates with a growing number of
+images and tables.
+
+Usage: python -m benchmarks.bench_write_docx [--repeat N]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import statistics
+from typing import Callable
+from docx import Document
+from benchmarks.synthetic import build_resume_document
+from utils.docx_utils import process_template, save_document, update_document_content, write_updated_docx
+
+
+def median_ms(func: Callable[[], object], repeat: int) -> float:
+    """
+    Median duration of repeated calls of a function, in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start_time)
+    return statistics.median(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark writing the generated DOCX documents")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per measurement")
+    parser.add_argument("--paragraphs", type=int, default=60, help="Number of body paragraphs")
+    parser.add_argument("--sizes", default="0,4,16,32", help="Comma-separated numbers of images and tables")
+    args = parser.parse_args()
+
+    print(f"{'images/tables':>13} {'size (KB)':>10} {'rebuild (ms)':>13} {'patch (ms)':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            template_path = os.path.join(directory, f"template_{size}.docx")
+            build_resume_document(args.paragraphs, images=size, tables=max(1, size)).save(template_path)
+            template_content = process_template(template_path, use_cache=False)
+
+            # Rewrite the sections the model usually tailors
+            sections = template_content["sections"]
+            updated_sections = {
+                name: [f"{line} (tailored)" for line in sections[name]]
+                for name in ["summary", "experience", "skills"]
+            }
+            output_path = os.path.join(directory, "output", "resume.docx")
+
+            rebuild = median_ms(lambda: save_document(
+                update_document_content(
+                    Document(template_path), updated_sections, template_content["paragraph_sections"]
+                ),
+                output_path,
+            ), args.repeat)
+            patch = median_ms(lambda: write_updated_docx(
+                template_path, updated_sections, template_content["paragraph_sections"], output_path
+            ), args.repeat)
+
+            size_kb = os.path.getsize(template_path) / 1024
+            print(f"{size:>13} {size_kb:>10.0f} {rebuild:>13.1f} {patch:>11.1f} {rebuild / patch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+AIRG-LangGraph - Fake chat model for the benchmarks
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Any, ClassVar, Dict, Iterator, List, Optional
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class EchoChatModel(BaseChatModel):
+    """
+    Chat model answering the generation prompts without calling any API
+
+    It returns the sections found in the last prompt message with every line
+    marked as tailored, after an optional simulated latency: a fixed delay per
+    request plus a delay per output token, as output tokens dominate the latency
+    of real models. Tokens are estimated at 4 characters per token.
+
+    A share of the responses (defect_rate) can be made malformed the way real
+    models sometimes answer: with a trailing comma, prose around the JSON, an
+    unclosed code fence, a truncated object or a missing section.
+    """
+
+    latency: float = 0.0
+    output_token_seconds: float = 0.0
+    stream_chunks: int = 20
+    defect_rate: float = 0.0
+    seed: int = 0
+
+    # Kinds of malformed responses
+    DEFECTS: ClassVar[List[str]] = ["trailing_comma", "prose", "unclosed_fence", "truncated", "missing_section"]
+
+    _usage: Dict[str, int] = PrivateAttr(default_factory=lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+    _usage_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _random: Any = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        # Echo the JSON object of sections embedded in the prompt
+        match = re.search(r"(\{.*\})", messages[-1].content, re.S)
+        try:
+            sections = json.loads(match.group(1)) if match else {}
+        except json.JSONDecodeError:
+            sections = {}
+        tailored = {
+            name: [f"{line} (tailored)" for line in lines] if isinstance(lines, list) else lines
+            for name, lines in sections.items()
+        }
+        text = "```json\n" + json.dumps(tailored, indent=2) + "\n```"
+
+        # Record the request's estimated token usage
+        with self._usage_lock:
+            if self._random is None:
+                self._random = random.Random(self.seed)
+            if tailored and self._random.random() < self.defect_rate:
+                text = self._malformed(tailored, self._random.choice(self.DEFECTS))
+            self._usage["calls"] += 1
+            self._usage["input_tokens"] += sum(len(str(message.content)) for message in messages) // 4
+            self._usage["output_tokens"] += len(text) // 4
+        return text
+
+    @staticmethod
+    def _malformed(sections: Dict[str, Any], defect: str) -> str:
+        # Malformed version of a response
+        body = json.dumps(sections, indent=2)
+        if defect == "trailing_comma":
+            return "```json\n" + body[:-2] + ",\n}\n```"
+        if defect == "prose":
+            return "Here is the tailored content:\n" + body + "\nLet me know if you need any changes."
+        if defect == "unclosed_fence":
+            return "```json\n" + body
+        if defect == "truncated":
+            return "```json\n" + body[:int(len(body) * 0.7)]
+        # Missing section: the last one is left out
+        return "```json\n" + json.dumps(dict(list(sections.items())[:-1]), indent=2) + "\n```"
+
+    def _delay(self, text: str) -> float:
+        return self.latency + len(text) // 4 * self.output_token_seconds
+
+    def usage(self) -> Dict[str, int]:
+        """
+        Get the number of requests and the estimated tokens since the last reset
+        """
+        with self._usage_lock:
+            return dict(self._usage)
+
+    def reset_usage(self) -> None:
+        """
+        Reset the request and token counters
+        """
+        with self._usage_lock:
+            self._usage.update(calls=0, input_tokens=0, output_tokens=0)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text = self._respond(messages)
+        if self._delay(text):
+            time.sleep(self._delay(text))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text = self._respond(messages)
+        if self._delay(text):
+            await asyncio.sleep(self._delay(text))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        step = max(1, len(text) // self.stream_chunks)
+        for i in range(0, len(text), step):
+            if self._delay(text):
+                time.sleep(self._delay(text) / self.stream_chunks)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + step]))
@@ -0,0 +1,278 @@
+"""
+AIRG-LangGraph - Offline benchmark suite
+
+Measures the duration and the peak Python memory of each stage of the pipeline
+on a synthetic corpus of small, medium and large resumes and cover letters:
+process_template, write_updated_docx (the DOCX writing of the document
+creation node), docx_to_pdf and complete run_graph runs with a deterministic
+fake LLM. Memory is traced with tracemalloc, so the
+allocations of C libraries such as libxml2 are not included. The results are written as JSON and compared with the regression thresholds in
+benchmarks/thresholds.json and, optionally, with a previous results file.
+
+The process exits with status 1 when a measurement exceeds a threshold, so the
+suite can gate changes in CI. Stages whose dependencies are missing (e.g.
+WeasyPrint's system libraries) are reported as skipped.
+
+Usage: python -m benchmarks.suite [--repeat N] [--sizes small medium large]
+       [--output results.json] [--baseline previous.json] [--tolerance 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+# Neither the quota nor the rate limit applies to the fake model, and PDFs are
+# rendered in this process so that their memory is traced (set before the
+# settings are read)
+os.environ["AIRG_LLM_RPM"] = "0"
+os.environ["AIRG_LLM_DAILY_QUOTA"] = "0"
+os.environ["AIRG_PDF_WORKERS"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from benchmarks.fake_llm import EchoChatModel
+from benchmarks.synthetic import build_cover_letter_document, build_resume_document
+from utils import llm_utils
+from utils.docx_utils import process_template, write_updated_docx
+
+# Synthetic corpus: resume body paragraphs, skills tables and rows, and cover letter paragraphs
+CORPUS = {
+    "small": {"paragraphs": 20, "tables": 1, "table_rows": 4, "letter_paragraphs": 3},
+    "medium": {"paragraphs": 60, "tables": 2, "table_rows": 8, "letter_paragraphs": 5},
+    "large": {"paragraphs": 240, "tables": 4, "table_rows": 16, "letter_paragraphs": 10},
+}
+
+STAGES = ["process_template", "write_updated_docx", "docx_to_pdf", "run_graph"]
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+
+def measure(func: Callable[[int], object], repeat: int) -> Dict[str, Any]:
+    """
+    Measure a stage: the durations of repeated calls (with the run index), then
+    the peak memory of one more call traced with tracemalloc
+
+    Args:
+        func: Stage to measure
+        repeat: Number of timed calls
+
+    Returns:
+        Dictionary with the median and best durations in milliseconds and the peak memory in KiB
+    """
+    durations = []
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        func(i)
+        durations.append((time.perf_counter() - start_time) * 1000)
+
+    # Tracing slows the calls down, so memory is measured separately
+    tracemalloc.start()
+    try:
+        func(repeat)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "best_ms": round(min(durations), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def build_corpus(directory: str, sizes: List[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Write the synthetic resumes and cover letters of the selected sizes
+
+    Args:
+        directory: Directory to write the documents to
+        sizes: Names of the corpus sizes
+
+    Returns:
+        Dictionary mapping each size to the paths of its resume and cover letter
+    """
+    paths = {}
+    for size in sizes:
+        spec = CORPUS[size]
+        resume_path = os.path.join(directory, f"resume_{size}.docx")
+        cover_letter_path = os.path.join(directory, f"cover_letter_{size}.docx")
+        build_resume_document(spec["paragraphs"], table_rows=spec["table_rows"], tables=spec["tables"]).save(resume_path)
+        build_cover_letter_document(spec["letter_paragraphs"]).save(cover_letter_path)
+        paths[size] = {"resume": resume_path, "cover_letter": cover_letter_path}
+    return paths
+
+
+def run_stages(paths: Dict[str, str], size: str, repeat: int) -> Dict[str, Any]:
+    """
+    Measure every stage on the documents of one size
+
+    Args:
+        paths: Paths of the resume and cover letter
+        size: Name of the corpus size
+        repeat: Number of timed calls per stage
+
+    Returns:
+        Dictionary mapping each stage to its measurement (or to the reason it was skipped)
+    """
+    results: Dict[str, Any] = {}
+    resume_path = paths["resume"]
+
+    results["process_template"] = measure(lambda i: process_template(resume_path, use_cache=False), repeat)
+
+    # Rewrite the sections the model usually tailors
+    template_content = process_template(resume_path, use_cache=False)
+    sections = template_content["sections"]
+    updated_sections = {name: [f"{line} (tailored)" for line in sections[name]] for name in ["summary", "experience", "skills"]}
+    results["write_updated_docx"] = measure(
+        lambda i: write_updated_docx(
+            resume_path,
+            updated_sections,
+            template_content["paragraph_sections"],
+            os.path.join("output", f"resume_{size}.docx"),
+        ),
+        repeat,
+    )
+
+    try:
+        from utils.pdf_utils import docx_to_pdf
+
+        results["docx_to_pdf"] = measure(
+            lambda i: docx_to_pdf(resume_path, os.path.join("output", f"resume_{size}.pdf")), repeat
+        )
+    except (ImportError, OSError) as e:
+        results["docx_to_pdf"] = {"skipped": str(e)}
+
+    def run_once(i: int) -> None:
+        from app import run_graph
+
+        run_graph({
+            "resume_source_path": resume_path,
+            "cover_letter_source_path": paths["cover_letter"],
+            "job_title": f"Engineer {i}",
+            "company_name": "Acme",
+            "job_description": "Build reliable services.",
+            "output_file_name": f"{size}_{i}",
+            "use_llm_cache": False,
+            "use_node_cache": False,
+        })
+
+    try:
+        results["run_graph"] = measure(run_once, repeat)
+    except (ImportError, OSError) as e:
+        results["run_graph"] = {"skipped": str(e)}
+
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, Any]],
+    thresholds: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]] = None,
+    tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Compare measurements with the absolute thresholds and with a previous run
+
+    Args:
+        results: Measurements by size and stage
+        thresholds: Maximum median_ms and peak_kib by stage and size
+        baseline: Results of a previous run of the suite, if any
+        tolerance: Relative increase over the baseline that counts as a regression
+
+    Returns:
+        Description of each regression
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, measurement in stages.items():
+            if "skipped" in measurement:
+                continue
+
+            limits = thresholds.get(stage, {}).get(size, {})
+            previous = (baseline or {}).get("results", {}).get(size, {}).get(stage, {})
+            for metric in ["median_ms", "peak_kib"]:
+                value = measurement[metric]
+                if metric in limits and value > limits[metric]:
+                    regressions.append(f"{stage} ({size}): {metric} {value} exceeds the threshold of {limits[metric]}")
+                if previous.get(metric) and value > previous[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{stage} ({size}): {metric} {value} is more than {tolerance:.0%} above the baseline "
+                        f"of {previous[metric]}"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed calls per stage")
+    parser.add_argument("--sizes", nargs="+", choices=list(CORPUS), default=list(CORPUS), help="Corpus sizes to measure")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency per LLM request in seconds")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON results")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="Path of the regression thresholds")
+    parser.add_argument("--baseline", help="Results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative increase over the baseline allowed")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    logging.getLogger().setLevel(logging.ERROR)
+    llm_utils.set_llm(EchoChatModel(latency=args.latency))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        corpus = build_corpus(directory, args.sizes)
+
+        print(f"{'size':<8}{'stage':<26}{'median':>12}{'best':>12}{'peak memory':>14}")
+        for size in args.sizes:
+            results[size] = run_stages(corpus[size], size, args.repeat)
+            for stage in STAGES:
+                measurement = results[size][stage]
+                if "skipped" in measurement:
+                    print(f"{size:<8}{stage:<26}  skipped ({measurement['skipped'][:60]})")
+                else:
+                    print(
+                        f"{size:<8}{stage:<26}{measurement['median_ms']:>9.2f} ms{measurement['best_ms']:>9.2f} ms"
+                        f"{measurement['peak_kib'] / 1024:>10.2f} MiB"
+                    )
+
+    regressions = find_regressions(results, thresholds, baseline, args.tolerance)
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "llm_latency_seconds": args.latency,
+        },
+        "corpus": {size: CORPUS[size] for size in args.sizes},
+        "results": results,
+        "regressions": regressions,
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults: {output_path}")
+
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
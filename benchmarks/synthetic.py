@@ -0,0 +1,196 @@
+"""
+AIRG-LangGraph - Synthetic documents for the benchmarks
+"""
+
+import io
+import os
+import zlib
+import random
+import struct
+from typing import Dict, List
+from docx import Document
+from docx.shared import Inches, Pt, RGBColor
+
+
+# Sections of the synthetic resumes, in document order
+RESUME_SECTIONS = ["Summary", "Experience", "Skills", "Education", "Projects", "Certifications"]
+
+# Vocabulary of the senior resumes' experience bullets and skills
+ACTIONS = ["Led", "Built", "Designed", "Migrated", "Scaled", "Automated", "Optimized", "Launched", "Mentored", "Owned"]
+TOPICS = [
+    "Kubernetes clusters", "Python microservices", "React frontends", "Kafka pipelines", "PostgreSQL databases",
+    "Terraform infrastructure", "machine learning models", "iOS applications", "payment systems", "CI/CD pipelines",
+    "Spark batch jobs", "GraphQL APIs", "observability with Prometheus", "Go services", "data warehouses",
+    "Android applications", "search ranking", "security audits", "AWS cost reduction", "customer support tooling",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "serving {n} million users", "reducing costs by {n}%", "with a team of {n} engineers",
+    "raising availability to 99.{n}%", "shipping {n} releases a quarter",
+]
+
+
+def make_png(width: int, height: int) -> bytes:
+    """
+    Build an RGB PNG image of random noise, which does not compress
+
+    Args:
+        width: Width in pixels
+        height: Height in pixels
+
+    Returns:
+        Content of the PNG file
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def build_resume_document(paragraphs: int = 60, table_rows: int = 4, images: int = 0, tables: int = 1):
+    """
+    Build a synthetic resume with headings, bullet lists, formatted runs, tables and images
+
+    Args:
+        paragraphs: Approximate number of body paragraphs
+        table_rows: Number of rows of each skills table
+        images: Number of 256x256 images
+        tables: Number of skills tables
+
+    Returns:
+        Document object
+    """
+    doc = Document()
+
+    # Header with contact details
+    doc.add_paragraph("Jane Example", style="Title")
+    contact = doc.add_paragraph()
+    contact.add_run("jane@example.com").italic = True
+    contact.add_run(" | +1 555 0100 | Springfield")
+
+    # Distribute the body paragraphs over the sections
+    per_section = max(1, paragraphs // len(RESUME_SECTIONS))
+    for section_index, section in enumerate(RESUME_SECTIONS):
+        doc.add_heading(section, level=1)
+        for i in range(per_section):
+            if i % 3 == 0:
+                paragraph = doc.add_paragraph()
+                run = paragraph.add_run(f"Role {section_index}.{i} at Company {i}")
+                run.bold = True
+                run.font.size = Pt(12)
+                run.font.color.rgb = RGBColor(0x1F, 0x3A, 0x5F)
+            else:
+                doc.add_paragraph(
+                    f"Delivered project {i} in {section.lower()}, improving throughput by {i * 7 % 90}% "
+                    "through careful measurement, profiling and iterative design.",
+                    style="List Bullet",
+                )
+        doc.add_paragraph()
+
+    # Skills tables
+    for table_index in range(tables):
+        table = doc.add_table(rows=table_rows, cols=3)
+        for row_index, row in enumerate(table.rows):
+            for col_index, cell in enumerate(row.cells):
+                cell.text = f"Skill {table_index}.{row_index}.{col_index}"
+
+    # Images (e.g. a photo and logos)
+    for _ in range(images):
+        doc.add_picture(io.BytesIO(make_png(256, 256)), width=Inches(1))
+
+    return doc
+
+
+def build_cover_letter_document(paragraphs: int = 5):
+    """
+    Build a synthetic cover letter with a contact header, a greeting, body paragraphs and a closing
+
+    Args:
+        paragraphs: Number of body paragraphs
+
+    Returns:
+        Document object
+    """
+    doc = Document()
+
+    # Header with contact details
+    doc.add_paragraph("Jane Example")
+    doc.add_paragraph("jane@example.com | +1 555 0100 | Springfield")
+
+    doc.add_paragraph("Dear Hiring Manager,")
+    for i in range(paragraphs):
+        doc.add_paragraph(
+            f"In my role number {i}, I led a team that shipped reliable services, reduced costs by {i * 11 % 60}% "
+            "and worked closely with product and design to deliver what customers needed."
+        )
+    doc.add_paragraph("Sincerely,")
+    doc.add_paragraph("Jane Example")
+
+    return doc
+
+
+def build_senior_resume_document(bullets: int = 120, skills: int = 40, seed: int = 0):
+    """
+    Build a synthetic senior-level resume with many varied experience bullets and skills
+
+    Args:
+        bullets: Number of experience bullets
+        skills: Number of skills lines
+        seed: Seed of the random content
+
+    Returns:
+        Document object
+    """
+    rng = random.Random(seed)
+    doc = Document()
+
+    # Header with contact details
+    doc.add_paragraph("Jane Example", style="Title")
+    doc.add_paragraph("jane@example.com | +1 555 0100 | Springfield")
+
+    doc.add_heading("Summary", level=1)
+    doc.add_paragraph("Engineering leader with 15 years of experience building reliable products at scale.")
+
+    doc.add_heading("Experience", level=1)
+    for i in range(bullets):
+        if i % 8 == 0:
+            doc.add_paragraph(f"Principal Engineer, Company {i // 8} ({2024 - i // 8})")
+        outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 90))
+        doc.add_paragraph(
+            f"{rng.choice(ACTIONS)} {rng.choice(TOPICS)} and {rng.choice(TOPICS)}, {outcome}.",
+            style="List Bullet",
+        )
+
+    doc.add_heading("Skills", level=1)
+    for _ in range(skills):
+        doc.add_paragraph(", ".join(rng.sample(TOPICS, 3)), style="List Bullet")
+
+    doc.add_heading("Education", level=1)
+    doc.add_paragraph("MSc Computer Science, Example University")
+
+    return doc
+
+
+def write_resume_documents(directory: str, sizes: List[int]) -> Dict[int, str]:
+    """
+    Write synthetic resumes of several sizes to disk
+
+    Args:
+        directory: Directory to write the documents to
+        sizes: Approximate numbers of body paragraphs
+
+    Returns:
+        Dictionary mapping each size to the path of its document
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for size in sizes:
+        path = os.path.join(directory, f"resume_{size}.docx")
+        build_resume_document(size).save(path)
+        paths[size] = path
+    return paths
@@ -0,0 +1,183 @@
+"""
+AIRG-LangGraph - AI Resume Generator using LangChain and LangGraph
+Warm engine shared by every run of the process
+"""
+
+import os
+import time
+import uuid
+import threading
+from typing import Dict, Any, Callable, Optional
+
+from app import create_graph
+from utils.cache_utils import get_llm_cache
+from utils.checkpoint_utils import get_checkpointer
+from utils.docx_utils import get_template_cache
+from utils.llm_utils import get_llm_chain, get_llm_scheduler, set_llm
+from utils.metrics_utils import trace_run
+
+
+class AIRGEngine:
+    """
+    Holds everything a run needs that is expensive to build: the compiled graph
+    and its checkpointer, the LLM client (with its HTTP connections) and chain,
+    the request scheduler and the caches
+
+    The CLI, batch mode and server modes create the engine once and then call
+    run() or arun() for every job.
+    """
+
+    def __init__(self, llm=None):
+        """
+        Args:
+            llm: Optional LangChain chat model to use instead of Gemini (e.g. a fake
+                model in benchmarks)
+        """
+        if llm is not None:
+            set_llm(llm)
+
+        # Compile the graph once, with the process-wide session checkpointer
+        self.checkpointer = get_checkpointer()
+        self.graph = create_graph(self.checkpointer)
+
+        self.runs = 0
+        self.total_run_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> "AIRGEngine":
+        """
+        Create the LLM client, the scheduler and the caches ahead of the first run
+
+        Returns:
+            The engine itself
+        """
+        get_llm_chain()
+        get_llm_scheduler()
+        get_llm_cache()
+        get_template_cache()
+        return self
+
+    @staticmethod
+    def session_config(session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the run configuration identifying a session in the checkpointer
+
+        Args:
+            session_id: Thread ID of the session, or None to start a new one
+
+        Returns:
+            Run configuration for invoke/stream
+        """
+        return {"configurable": {"thread_id": session_id or uuid.uuid4().hex}}
+
+    def run(
+        self,
+        input_data: Dict[str, Any],
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        session_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the graph with the provided input data
+
+        Args:
+            input_data: Dictionary containing the input data for the graph
+            on_progress: Optional callback; when given, LLM responses are streamed and the
+                callback receives an event for each generated section as soon as it is complete
+            session_id: Thread ID under which the run is checkpointed (a new one by default)
+
+        Returns:
+            Dictionary containing the output paths for the generated documents
+        """
+        # Create the output directory if it doesn't exist
+        os.makedirs("output", exist_ok=True)
+
+        config = self.session_config(session_id)
+        start_time = time.perf_counter()
+        try:
+            # Run the graph with the input data, checkpointing every step and
+            # tracing it when tracing is enabled
+            with trace_run(config["configurable"]["thread_id"]):
+                if on_progress is None:
+                    result = self.graph.invoke(input_data, config)
+                else:
+                    # Stream the section events emitted by the generation nodes, keeping the final state
+                    result = None
+                    for mode, chunk in self.graph.stream(
+                        {**input_data, "stream_llm": True},
+                        config,
+                        stream_mode=["custom", "values"],
+                    ):
+                        if mode == "custom":
+                            on_progress(chunk)
+                        else:
+                            result = chunk
+        finally:
+            # Commit the checkpoints of the run
+            self.checkpointer.flush()
+            self._record_run(time.perf_counter() - start_time)
+
+        return result
+
+    async def arun(self, input_data: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the graph asynchronously with the provided input data
+
+        Args:
+            input_data: Dictionary containing the input data for the graph
+            session_id: Thread ID under which the run is checkpointed (a new one by default)
+
+        Returns:
+            Dictionary containing the output paths for the generated documents
+        """
+        # Create the output directory if it doesn't exist
+        os.makedirs("output", exist_ok=True)
+
+        config = self.session_config(session_id)
+        start_time = time.perf_counter()
+        try:
+            # Run the graph with the input data, checkpointing every step and
+            # tracing it when tracing is enabled
+            with trace_run(config["configurable"]["thread_id"]):
+                result = await self.graph.ainvoke(input_data, config)
+        finally:
+            # Commit the checkpoints of the run
+            self.checkpointer.flush()
+            self._record_run(time.perf_counter() - start_time)
+
+        return result
+
+    def _record_run(self, seconds: float) -> None:
+        with self._lock:
+            self.runs += 1
+            self.total_run_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the number of runs served by the engine and their average duration
+
+        Returns:
+            Dictionary with the run count and the average run duration in seconds
+        """
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "average_run_seconds": self.total_run_seconds / self.runs if self.runs else 0.0,
+            }
+
+
+_engine: Optional[AIRGEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AIRGEngine:
+    """
+    Get the process-wide engine, creating it on first use
+
+    Returns:
+        AIRGEngine instance
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AIRGEngine()
+        return _engine
@@ -6,6 +6,7 @@ Main entry point for the application
 
 import os
 import sys
+import logging
 import click
 from dotenv import load_dotenv
 from typing import Optional
@@ -13,10 +14,113 @@ from typing import Optional
 # Load environment variables from .env file
 load_dotenv()
 
-# Import the LangGraph application
-from app import run_graph
+# Log warnings (e.g. throttled LLM requests being retried) unless configured otherwise
+logging.basicConfig(
+    level=os.environ.get("AIRG_LOG_LEVEL", "WARNING").upper(),
+    format="%(levelname)s: %(message)s",
+)
+
+# The engine (LangGraph, LangChain, python-docx, WeasyPrint) is imported by the
+# commands that run it, so that --help and argument errors return immediately
+
+
+class DefaultCommandGroup(click.Group):
+    """
+    Click group that falls back to a default command when no subcommand is given,
+    so that `python main.py --job-title ...` keeps working
+    """
+
+    default_command = "generate"
 
-@click.command()
+    def parse_args(self, ctx, args):
+        # Skip the group's own flags, which come before the command name
+        group_flags = {opt for param in self.params if getattr(param, "is_flag", False) for opt in param.opts}
+        index = 0
+        while index < len(args) and args[index] in group_flags:
+            index += 1
+
+        rest = list(args[index:])
+        if not rest or (rest[0] not in self.commands and rest[0] not in ("--help", "-h")):
+            args = list(args[:index]) + [self.default_command] + rest
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+@click.option(
+    "--import-profile",
+    is_flag=True,
+    default=False,
+    help="Run the command with import time profiling and report what slows down startup",
+)
+def cli(import_profile: bool):
+    """
+    AIRG-LangGraph: AI Resume Generator using LangChain and LangGraph
+    """
+    if import_profile:
+        from utils.import_utils import profile_command
+
+        sys.exit(profile_command([arg for arg in sys.argv[1:] if arg != "--import-profile"]))
+
+
+def check_api_key():
+    """
+    Exit with an error if the Gemini API key is not set
+    """
+    if not os.environ.get("GEMINI_API_KEY"):
+        click.echo(
+            "Error: GEMINI_API_KEY environment variable is not set. "
+            "Please set it in your .env file or environment."
+        )
+        sys.exit(1)
+
+
+def echo_llm_cache_stats():
+    """
+    Display the hit/miss counters of the LLM response cache
+    """
+    from utils.cache_utils import get_llm_cache
+
+    stats = get_llm_cache().stats()
+    click.echo(
+        f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB)"
+    )
+
+
+def echo_output_stats(stats=None):
+    """
+    Display how many LLM responses had to be repaired or completed with a follow-up request
+
+    Args:
+        stats: Counters of the model's JSON responses (the process-wide ones by default)
+    """
+    from utils.llm_utils import get_output_stats
+
+    stats = stats or get_output_stats().stats()
+    if stats["repaired"] or stats["incomplete"] or stats["unparseable"] or stats["followups"]:
+        click.echo(
+            f"LLM responses: {stats['responses']} received, {stats['repaired']} repaired, "
+            f"{stats['incomplete'] + stats['unparseable']} incomplete, {stats['followups']} follow-up requests "
+            f"recovering {stats['recovered_sections']}/{stats['followup_sections']} sections"
+        )
+
+
+def echo_trace(rows):
+    """
+    Display the per-node breakdown of traced runs
+
+    Args:
+        rows: Rows returned by node_breakdown()
+    """
+    from utils.metrics_utils import METRICS_PATH, TRACE_PATH, format_breakdown
+
+    click.echo("\nPer-node breakdown (LLM, DOCX, PDF and checkpoint times add up concurrent calls):")
+    click.echo(format_breakdown(rows))
+    click.echo(f"Trace: {TRACE_PATH}")
+    click.echo(f"Metrics: {METRICS_PATH}")
+
+
+@cli.command("generate", short_help="Generate a resume and cover letter for one job posting")
 @click.option(
     "--resume-template",
     type=click.Path(exists=True),
@@ -44,6 +148,45 @@ from app import run_graph
     default=False,
     help="Run in interactive mode, prompting for missing values",
 )
+@click.option(
+    "--no-llm-cache",
+    is_flag=True,
+    default=False,
+    help="Always call the model, bypassing the LLM response cache",
+)
+@click.option(
+    "--generation-mode",
+    type=click.Choice(["document", "compact", "sections"]),
+    default=None,
+    help="Send the whole document to the model (document), only the editable sections in one "
+    "prompt (compact) or one prompt per editable section (sections); AIRG_GENERATION_MODE by default",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Send only the K experience/skills lines most relevant to the job and keep the others "
+    "unchanged (0 sends every line); AIRG_RANKING_TOP_K (20) by default",
+)
+@click.option(
+    "--no-node-cache",
+    is_flag=True,
+    default=False,
+    help="Run every node, even when its inputs are unchanged since a previous run",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Stream LLM responses and report each section as soon as it is generated",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    default=False,
+    help="Trace the run: print a per-node breakdown of time, tokens and bytes written, append the "
+    "spans to output/trace.jsonl and write the metrics to output/metrics.prom",
+)
 def main(
     resume_template: Optional[str],
     cover_letter_template: Optional[str],
@@ -56,6 +199,12 @@ def main(
     relevant_experience: Optional[str],
     output_file_name: Optional[str],
     interactive: bool,
+    no_llm_cache: bool,
+    generation_mode: Optional[str],
+    top_k: Optional[int],
+    no_node_cache: bool,
+    stream: bool,
+    trace: bool,
 ):
     """
     AIRG-LangGraph: AI Resume Generator using LangChain and LangGraph
@@ -64,12 +213,7 @@ def main(
     and company information using Google's Gemini AI.
     """
     # Check if Gemini API key is set
-    if not os.environ.get("GEMINI_API_KEY"):
-        click.echo(
-            "Error: GEMINI_API_KEY environment variable is not set. "
-            "Please set it in your .env file or environment."
-        )
-        sys.exit(1)
+    check_api_key()
 
     # If interactive mode is enabled, prompt for missing values
     if interactive:
@@ -130,11 +274,32 @@ def main(
         "hirer_gender": hirer_gender,
         "relevant_experience": relevant_experience or "",
         "output_file_name": output_file_name,
+        "use_llm_cache": not no_llm_cache,
+        "use_node_cache": not no_node_cache,
+        "generation_mode": generation_mode,
+        "ranking_top_k": top_k,
     }
 
     # Run the graph
     click.echo("Starting document generation...")
-    result = run_graph(input_data)
+    from engine import get_engine
+    from utils.metrics_utils import enable_tracing, trace_run
+
+    if trace:
+        enable_tracing()
+
+    engine = get_engine()
+    with trace_run() as run_trace:
+        if stream:
+            def echo_section(event):
+                click.echo(
+                    f"  {event['document']}: {event['section']} ready after {event['elapsed']:.2f}s "
+                    f"({len(event['lines'])} lines)"
+                )
+
+            result = engine.run(input_data, on_progress=echo_section)
+        else:
+            result = engine.run(input_data)
     
     # Display the result
     click.echo("\nDocument generation complete!")
@@ -143,6 +308,472 @@ def main(
     click.echo(f"Cover Letter DOCX: {result['cover_letter_docx_path']}")
     click.echo(f"Cover Letter PDF: {result['cover_letter_pdf_path']}")
 
+    # Display the timings of the parallel generation branches
+    node_timings = result.get("node_timings", {})
+    if node_timings:
+        click.echo("\nGeneration timings:")
+        for node_name, seconds in node_timings.items():
+            click.echo(f"  {node_name}: {seconds:.2f}s")
+
+    # Display the nodes whose outputs were reused from a previous run
+    skipped_nodes = result.get("skipped_nodes", [])
+    if skipped_nodes:
+        click.echo(f"Reused unchanged outputs of: {', '.join(skipped_nodes)}")
+    if result.get("renders_avoided"):
+        click.echo(f"Reused identical documents from output/artifacts: {result['renders_avoided']} renders avoided")
+
+    echo_output_stats()
+    if not no_llm_cache:
+        echo_llm_cache_stats()
+
+    if run_trace is not None:
+        echo_trace(run_trace.breakdown())
+
+
+@cli.command("batch")
+@click.argument("records_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--resume-template",
+    type=click.Path(exists=True),
+    help="Resume DOCX template used for records that don't specify one",
+)
+@click.option(
+    "--cover-letter-template",
+    type=click.Path(exists=True),
+    help="Cover letter DOCX template used for records that don't specify one",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Maximum number of job records processed at the same time",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False),
+    default=os.path.join("output", "batch_manifest.json"),
+    show_default=True,
+    help="Path of the JSON summary manifest",
+)
+@click.option(
+    "--no-llm-cache",
+    is_flag=True,
+    default=False,
+    help="Always call the model, bypassing the LLM response cache",
+)
+@click.option(
+    "--generation-mode",
+    type=click.Choice(["document", "compact", "sections"]),
+    default=None,
+    help="Send the whole document to the model (document), only the editable sections in one "
+    "prompt (compact) or one prompt per editable section (sections); AIRG_GENERATION_MODE by default",
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Send only the K experience/skills lines most relevant to the job and keep the others "
+    "unchanged (0 sends every line); AIRG_RANKING_TOP_K (20) by default",
+)
+@click.option(
+    "--no-node-cache",
+    is_flag=True,
+    default=False,
+    help="Run every node, even when its inputs are unchanged since a previous run",
+)
+@click.option(
+    "--pdf-workers",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Number of PDF render worker processes (0 renders in the main process)",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    default=False,
+    help="Trace the runs: print a per-node breakdown of time, tokens and bytes written, append the "
+    "spans to output/trace.jsonl and write the metrics to output/metrics.prom",
+)
+def batch(
+    records_file: str,
+    resume_template: Optional[str],
+    cover_letter_template: Optional[str],
+    concurrency: int,
+    manifest: str,
+    no_llm_cache: bool,
+    generation_mode: Optional[str],
+    top_k: Optional[int],
+    no_node_cache: bool,
+    pdf_workers: Optional[int],
+    trace: bool,
+):
+    """
+    Generate documents for every job record in a JSONL or CSV file
+
+    Records use the same field names as the generate options
+    (job_title, company_name, job_description, ...).
+    """
+    from batch import read_job_records, run_batch
+
+    # Check if Gemini API key is set
+    check_api_key()
+
+    if trace:
+        from utils.metrics_utils import enable_tracing
+
+        enable_tracing()
+
+    if pdf_workers is not None:
+        from utils.pdf_utils import configure_render_pool
+
+        configure_render_pool(pdf_workers)
+
+    records = read_job_records(records_file)
+    if not records:
+        click.echo(f"No job records found in {records_file}")
+        sys.exit(1)
+
+    defaults = {
+        "resume_template": resume_template,
+        "cover_letter_template": cover_letter_template,
+        "use_llm_cache": not no_llm_cache,
+        "use_node_cache": not no_node_cache,
+        "generation_mode": generation_mode,
+        "ranking_top_k": top_k,
+    }
+
+    # Show how long the LLM quota alone will make this batch take, for planning
+    from utils.llm_utils import get_llm_scheduler, max_requests_per_job
+
+    scheduler = get_llm_scheduler()
+    request_count = max_requests_per_job(generation_mode) * len(records)
+    remaining = scheduler.ledger.remaining_today()
+    click.echo(
+        f"Up to {request_count} LLM requests needed: at least "
+        f"{scheduler.estimate_seconds(request_count) / 60:.1f} minutes at "
+        f"{scheduler.requests_per_minute:g} RPM"
+        + (f", {remaining} requests left in today's quota" if remaining is not None else "")
+    )
+
+    click.echo(f"Processing {len(records)} job records with concurrency {concurrency}...")
+    summary = run_batch(records, defaults=defaults, concurrency=concurrency, manifest_path=manifest)
+
+    # Display the per-record results
+    for entry in summary["records"]:
+        if entry["status"] == "success":
+            reused = f", reused {', '.join(entry['skipped_nodes'])}" if entry.get("skipped_nodes") else ""
+            if entry.get("renders_avoided"):
+                reused += f", {entry['renders_avoided']} renders avoided"
+            click.echo(f"  [ok]     #{entry['index']} {entry['output_file_name']} ({entry['seconds']:.1f}s{reused})")
+        else:
+            click.echo(f"  [failed] #{entry['index']} {entry['error']}")
+
+    click.echo(
+        f"\nBatch complete: {summary['succeeded']} succeeded, {summary['failed']} failed "
+        f"in {summary['elapsed_seconds']:.1f}s ({summary['jobs_per_minute']:.2f} jobs/minute)"
+    )
+    click.echo(f"Manifest: {manifest}")
+    scheduler_stats = summary["llm_scheduler"]
+    click.echo(
+        f"LLM scheduler: {scheduler_stats['requests']} requests, {scheduler_stats['throttled']} throttled, "
+        f"{scheduler_stats['retries']} retries, average queue wait {scheduler_stats['average_wait_seconds']:.1f}s"
+    )
+    echo_output_stats(summary["structured_output"])
+    if not no_llm_cache:
+        echo_llm_cache_stats()
+    artifact_stats = summary["artifact_store"]
+    click.echo(
+        f"Artifact store: {artifact_stats['hits']} documents reused, {artifact_stats['misses']} generated, "
+        f"{artifact_stats['renders_avoided']} renders avoided"
+    )
+
+    if trace:
+        from utils.metrics_utils import get_metrics, node_breakdown
+
+        echo_trace(node_breakdown(get_metrics().totals()))
+
+    if summary["failed"]:
+        sys.exit(1)
+
+
+@cli.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on")
+@click.option("--port", type=click.IntRange(min=0, max=65535), default=8080, show_default=True, help="Port to listen on")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of jobs run at the same time; AIRG_SERVICE_WORKERS (2) by default",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of accepted jobs that may wait for a worker before new jobs are rejected with 429; "
+    "AIRG_SERVICE_QUEUE_SIZE (16) by default",
+)
+@click.option(
+    "--pdf-workers",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Number of PDF render worker processes (0 renders in the main process)",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    default=False,
+    help="Trace the jobs: append the spans to output/trace.jsonl and write the metrics to output/metrics.prom",
+)
+def serve(
+    host: str,
+    port: int,
+    workers: Optional[int],
+    queue_size: Optional[int],
+    pdf_workers: Optional[int],
+    trace: bool,
+):
+    """
+    Run a local HTTP service accepting templates and jobs
+
+    Jobs are answered with a job ID right away and processed by a pool of
+    workers; the generated DOCX and PDF documents are served once a job is done.
+    """
+    from service import SERVICE_QUEUE_SIZE, SERVICE_WORKERS, create_server
+
+    # Check if Gemini API key is set
+    check_api_key()
+
+    if trace:
+        from utils.metrics_utils import enable_tracing
+
+        enable_tracing()
+
+    if pdf_workers is not None:
+        from utils.pdf_utils import configure_render_pool
+
+        configure_render_pool(pdf_workers)
+
+    server = create_server(
+        host,
+        port,
+        workers=workers or SERVICE_WORKERS,
+        queue_size=queue_size or SERVICE_QUEUE_SIZE,
+    )
+    service = server.service
+    click.echo(
+        f"Serving on http://{server.server_address[0]}:{server.server_address[1]} "
+        f"with {service.workers} workers and room for {service.queue.maxsize} queued jobs (Ctrl+C to stop)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nStopping: finishing the running and queued jobs...")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+@cli.command("enqueue")
+@click.argument("records_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--queue",
+    "queue_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path of the job queue database shared by the workers; AIRG_QUEUE_PATH or output/job_queue.db by default",
+)
+@click.option(
+    "--resume-template",
+    type=click.Path(exists=True),
+    help="Resume DOCX template used for records that don't specify one",
+)
+@click.option(
+    "--cover-letter-template",
+    type=click.Path(exists=True),
+    help="Cover letter DOCX template used for records that don't specify one",
+)
+@click.option(
+    "--no-llm-cache",
+    is_flag=True,
+    default=False,
+    help="Always call the model, bypassing the LLM response cache",
+)
+@click.option(
+    "--generation-mode",
+    type=click.Choice(["document", "compact", "sections"]),
+    default=None,
+    help="How content is generated (see generate --help); AIRG_GENERATION_MODE by default",
+)
+@click.option(
+    "--max-attempts",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of times a job is leased before it is failed when its workers stop responding; "
+    "AIRG_QUEUE_MAX_ATTEMPTS (3) by default",
+)
+def enqueue(
+    records_file: str,
+    queue_path: Optional[str],
+    resume_template: Optional[str],
+    cover_letter_template: Optional[str],
+    no_llm_cache: bool,
+    generation_mode: Optional[str],
+    max_attempts: Optional[int],
+):
+    """
+    Add every job record in a JSONL or CSV file to the durable job queue
+
+    Records use the same field names as for the batch command. Start one or more
+    `worker` processes on the same queue to process them.
+    """
+    from batch import read_job_records
+    from utils.queue_utils import QUEUE_PATH, SQLiteJobQueue
+    from worker import enqueue_records
+
+    records = read_job_records(records_file)
+    if not records:
+        click.echo(f"No job records found in {records_file}")
+        sys.exit(1)
+
+    defaults = {
+        "resume_template": resume_template,
+        "cover_letter_template": cover_letter_template,
+        "use_llm_cache": not no_llm_cache,
+        "generation_mode": generation_mode,
+    }
+    queue_path = queue_path or QUEUE_PATH
+    job_ids = enqueue_records(records, defaults=defaults, queue_path=queue_path, max_attempts=max_attempts)
+
+    stats = SQLiteJobQueue(queue_path).stats()
+    click.echo(f"Queued {len(job_ids)} jobs in {queue_path}")
+    click.echo(
+        f"Queue: {stats['queued']} queued, {stats['leased']} leased, "
+        f"{stats['succeeded']} succeeded, {stats['failed']} failed"
+    )
+
+
+@cli.command("worker")
+@click.option(
+    "--queue",
+    "queue_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path of the job queue database shared by the workers; AIRG_QUEUE_PATH or output/job_queue.db by default",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Number of jobs this worker runs at the same time",
+)
+@click.option(
+    "--visibility-timeout",
+    type=click.FloatRange(min=1),
+    default=None,
+    help="Seconds after which the job of a worker that stopped sending heartbeats is leased again; "
+    "AIRG_QUEUE_VISIBILITY_TIMEOUT (300) by default",
+)
+@click.option(
+    "--exit-when-empty",
+    is_flag=True,
+    default=False,
+    help="Stop once no job is queued or running, instead of waiting for new jobs",
+)
+@click.option(
+    "--max-jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stop after this many jobs",
+)
+@click.option(
+    "--pdf-workers",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Number of PDF render worker processes (0 renders in the main process)",
+)
+@click.option(
+    "--trace",
+    is_flag=True,
+    default=False,
+    help="Trace the jobs: print a per-node breakdown at the end, append the spans to "
+    "output/trace.jsonl and write the metrics to output/metrics.prom",
+)
+def worker(
+    queue_path: Optional[str],
+    concurrency: int,
+    visibility_timeout: Optional[float],
+    exit_when_empty: bool,
+    max_jobs: Optional[int],
+    pdf_workers: Optional[int],
+    trace: bool,
+):
+    """
+    Pull jobs from the durable job queue and generate their documents
+
+    Start several workers, on this machine or on others sharing the filesystem,
+    to spread the jobs; the LLM quota and rate limit are shared by all of them.
+    A job whose worker dies is leased again once its visibility timeout expires.
+    """
+    from utils.checkpoint_utils import configure_checkpointer
+    from utils.queue_utils import QUEUE_PATH, QUEUE_VISIBILITY_TIMEOUT
+    from worker import Worker, remove_stale_sessions, worker_sessions_path
+
+    # Check if Gemini API key is set
+    check_api_key()
+
+    # Sessions are only needed while their job runs: delete this worker's database
+    # on exit, and those of killed workers of this host
+    remove_stale_sessions()
+    configure_checkpointer(worker_sessions_path(), delete_on_exit=True)
+
+    if trace:
+        from utils.metrics_utils import enable_tracing
+
+        enable_tracing()
+
+    if pdf_workers is not None:
+        from utils.pdf_utils import configure_render_pool
+
+        configure_render_pool(pdf_workers)
+
+    def echo_job(entry):
+        if entry["status"] == "succeeded":
+            reused = f", reused {', '.join(entry['skipped_nodes'])}" if entry.get("skipped_nodes") else ""
+            if entry.get("renders_avoided"):
+                reused += f", {entry['renders_avoided']} renders avoided"
+            click.echo(f"  [ok]     {entry['job_id']} {entry['output_file_name']} ({entry['seconds']:.1f}s{reused})")
+        else:
+            click.echo(f"  [{entry['status']}] {entry['job_id']} {entry.get('error', '')}")
+
+    job_worker = Worker(
+        queue_path=queue_path or QUEUE_PATH,
+        concurrency=concurrency,
+        visibility_timeout=visibility_timeout or QUEUE_VISIBILITY_TIMEOUT,
+        exit_when_empty=exit_when_empty,
+        max_jobs=max_jobs,
+        on_job=echo_job,
+    )
+    click.echo(f"Worker {job_worker.worker_id} pulling jobs from {job_worker.queue.path} (Ctrl+C to stop)")
+    summary = job_worker.run()
+
+    click.echo(
+        f"\nWorker stopped: {summary['succeeded']} succeeded, {summary['failed']} failed "
+        f"in {summary['elapsed_seconds']:.1f}s ({summary['jobs_per_minute']:.2f} jobs/minute)"
+    )
+    if summary["renders_avoided"]:
+        click.echo(f"{summary['renders_avoided']} renders avoided by reusing identical documents")
+    if summary["retried"]:
+        click.echo(f"{summary['retried']} jobs failed on a transient error and were queued again")
+    if summary["lost_leases"]:
+        click.echo(f"{summary['lost_leases']} jobs took too long and were leased by another worker")
+
+    if trace:
+        from utils.metrics_utils import get_metrics, node_breakdown
+
+        echo_trace(node_breakdown(get_metrics().totals()))
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
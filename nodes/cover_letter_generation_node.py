@@ -3,9 +3,25 @@ AIRG-LangGraph - Cover Letter Generation Node
 Generates content for the cover letter based on the template and job details
 """
 
+import time
+import asyncio
 from typing import Dict, Any
-from utils.llm_utils import generate_cover_letter_content
+from utils.llm_utils import generate_cover_letter_content, agenerate_cover_letter_content, track_incomplete_sections
 from utils.docx_utils import process_template
+from utils.progress_utils import SectionProgress, replay_sections
+
+# State fields the cover letter generation reads (besides its template)
+INPUT_FIELDS = [
+    "job_title",
+    "company_name",
+    "job_description",
+    "company_overview",
+    "hirer_name",
+    "hirer_gender",
+    "relevant_experience",
+    "generation_mode",
+    "ranking_top_k",
+]
 
 
 def generate_cover_letter(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -16,28 +32,100 @@ def generate_cover_letter(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current state of the graph
 
     Returns:
-        Updated state with generated cover letter content
+        State update containing only the cover letter keys, so that it can be
+        merged with the parallel resume branch
     """
-    # Create a new state dictionary to avoid modifying the input state
-    new_state = state.copy()
+    start_time = time.perf_counter()
+    progress = SectionProgress("cover_letter") if state.get("stream_llm") else None
 
-    # Process the cover letter template
-    cover_letter_template_content = process_template(state["cover_letter_source_path"])
-    new_state["cover_letter_template_content"] = cover_letter_template_content
+    # Process the cover letter template, unless it was already parsed (e.g. shared by a batch run)
+    cover_letter_template_content = state.get("cover_letter_template_content") or process_template(state["cover_letter_source_path"])
 
     # Generate cover letter content
-    cover_letter_content = generate_cover_letter_content(
-        cover_letter_template_content=cover_letter_template_content,
-        job_title=state["job_title"],
-        company_name=state["company_name"],
-        job_description=state["job_description"],
-        company_overview=state["company_overview"],
-        hirer_name=state["hirer_name"],
-        hirer_gender=state["hirer_gender"],
-        relevant_experience=state["relevant_experience"],
+    with track_incomplete_sections() as incomplete_sections:
+        cover_letter_content = generate_cover_letter_content(
+            cover_letter_template_content=cover_letter_template_content,
+            job_title=state["job_title"],
+            company_name=state["company_name"],
+            job_description=state["job_description"],
+            company_overview=state["company_overview"],
+            hirer_name=state["hirer_name"],
+            hirer_gender=state["hirer_gender"],
+            relevant_experience=state["relevant_experience"],
+            use_cache=state.get("use_llm_cache", True),
+            on_section=progress,
+            mode=state.get("generation_mode"),
+            top_k=state.get("ranking_top_k"),
+        )
+
+    node_timings = {"cover_letter_generation": time.perf_counter() - start_time}
+    if progress is not None and progress.first_section_seconds is not None:
+        node_timings["cover_letter_first_section"] = progress.first_section_seconds
+
+    return {
+        "cover_letter_template_content": cover_letter_template_content,
+        "cover_letter_content": cover_letter_content,
+        "node_timings": node_timings,
+        # Sections that kept their original content make the outputs unfit for reuse
+        "incomplete_nodes": ["cover_letter_generation"] if incomplete_sections else [],
+    }
+
+
+async def agenerate_cover_letter(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of generate_cover_letter(), offloading template parsing to a thread
+
+    Args:
+        state: Current state of the graph
+
+    Returns:
+        State update containing only the cover letter keys
+    """
+    start_time = time.perf_counter()
+    progress = SectionProgress("cover_letter") if state.get("stream_llm") else None
+
+    # Process the cover letter template, unless it was already parsed (e.g. shared by a batch run)
+    cover_letter_template_content = state.get("cover_letter_template_content") or await asyncio.to_thread(
+        process_template, state["cover_letter_source_path"]
     )
 
-    # Add the generated content to the state
-    new_state["cover_letter_content"] = cover_letter_content
+    # Generate cover letter content
+    with track_incomplete_sections() as incomplete_sections:
+        cover_letter_content = await agenerate_cover_letter_content(
+            cover_letter_template_content=cover_letter_template_content,
+            job_title=state["job_title"],
+            company_name=state["company_name"],
+            job_description=state["job_description"],
+            company_overview=state["company_overview"],
+            hirer_name=state["hirer_name"],
+            hirer_gender=state["hirer_gender"],
+            relevant_experience=state["relevant_experience"],
+            use_cache=state.get("use_llm_cache", True),
+            on_section=progress,
+            mode=state.get("generation_mode"),
+            top_k=state.get("ranking_top_k"),
+        )
+
+    node_timings = {"cover_letter_generation": time.perf_counter() - start_time}
+    if progress is not None and progress.first_section_seconds is not None:
+        node_timings["cover_letter_first_section"] = progress.first_section_seconds
+
+    return {
+        "cover_letter_template_content": cover_letter_template_content,
+        "cover_letter_content": cover_letter_content,
+        "node_timings": node_timings,
+        # Sections that kept their original content make the outputs unfit for reuse
+        "incomplete_nodes": ["cover_letter_generation"] if incomplete_sections else [],
+    }
+
 
-    return new_state
\ No newline at end of file
+def replay_cover_letter(state: Dict[str, Any], outputs: Dict[str, Any]) -> None:
+    """
+    Report the sections of reused cover letter content as stream events
+
+    Args:
+        state: Current state of the graph
+        outputs: Reused outputs of the node
+    """
+    if state.get("stream_llm"):
+        replay_sections("cover_letter", outputs["cover_letter_content"])
@@ -4,15 +4,148 @@ Updates documents with generated content and creates PDF files
 """
 
 import os
-from typing import Dict, Any
-from utils.docx_utils import update_document_content, save_document
-from utils.pdf_utils import docx_to_pdf
+import asyncio
+from concurrent.futures import Future
+from typing import Dict, Any, List
+from utils.artifact_utils import artifact_key, get_artifact_store
+from utils.docx_utils import write_updated_docx
+from utils.pdf_utils import DOCX_HTML_CONVERTER, submit_docx_to_pdf
+
+
+# Documents created by the node: (name, template content key, generated content key)
+DOCUMENTS = [
+    ("resume", "resume_template_content", "resume_content"),
+    ("cover_letter", "cover_letter_template_content", "cover_letter_content"),
+]
+
+# Files created for each document
+EXTENSIONS = [".docx", ".pdf"]
+
+
+def create_docx(
+    template_content: Dict[str, Any],
+    content: Dict[str, List[str]],
+    docx_path: str,
+) -> str:
+    """
+    Create a DOCX document from a template and its generated content
+    
+    Args:
+        template_content: Processed template content
+        content: Generated content for the document
+        docx_path: Path to save the document to
+        
+    Returns:
+        Path to the DOCX file
+    """
+    # Write a copy of the template package with the updated sections
+    write_updated_docx(
+        template_content["path"], content, template_content.get("paragraph_sections"), docx_path
+    )
+    
+    return docx_path
+
+
+def find_documents(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up the documents of the state in the artifact store
+    
+    Args:
+        state: Current state of the graph
+        
+    Returns:
+        Dictionary mapping each document name to its key, its template and
+        content, and its stored files (None if the document has to be generated)
+    """
+    store = get_artifact_store()
+    documents = {}
+    for document_name, template_key, content_key in DOCUMENTS:
+        key = artifact_key(state[template_key], state[content_key], DOCX_HTML_CONVERTER)
+        stored = store.lookup(key, EXTENSIONS)
+        documents[document_name] = {
+            "key": key,
+            "template_content": state[template_key],
+            "content": state[content_key],
+            "stored": stored,
+            "found": stored is not None,
+        }
+    return documents
+
+
+def store_docx(document: Dict[str, Any]) -> str:
+    """
+    Create the DOCX file of a document in the artifact store
+    
+    Args:
+        document: Key, template and content of the document, as found by find_documents()
+        
+    Returns:
+        Path of the stored DOCX file
+    """
+    store = get_artifact_store()
+    temp_path = store.temp_path(document["key"], ".docx")
+    create_docx(document["template_content"], document["content"], temp_path)
+    return store.commit(temp_path, document["key"], ".docx")
+
+
+def submit_stored_pdf(docx_path: str, key: str) -> "Future[str]":
+    """
+    Render the PDF file of a stored DOCX file into the artifact store
+    
+    Args:
+        docx_path: Path of the stored DOCX file
+        key: Key of the document in the artifact store
+        
+    Returns:
+        Future resolving to the path of the stored PDF file
+    """
+    store = get_artifact_store()
+    temp_path = store.temp_path(key, ".pdf")
+    future: "Future[str]" = Future()
+    
+    def commit(render_future: "Future[str]") -> None:
+        try:
+            future.set_result(store.commit(render_future.result(), key, ".pdf"))
+        except Exception as e:
+            future.set_exception(e)
+    
+    submit_docx_to_pdf(docx_path, temp_path).add_done_callback(commit)
+    return future
+
+
+def link_documents(new_state: Dict[str, Any], documents: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Link the named output files to the stored documents and count the renders avoided
+    
+    Args:
+        new_state: State to add the output paths to
+        documents: Keys, stored files and whether each document was found in the store
+        
+    Returns:
+        Updated state with paths to the generated documents
+    """
+    store = get_artifact_store()
+    output_dir = os.path.join("output", new_state["output_file_name"])
+    for document_name, document in documents.items():
+        for extension, stored_path in document["stored"].items():
+            new_state[f"{document_name}_{extension[1:]}_path"] = store.link(
+                stored_path, os.path.join(output_dir, f"{document_name}{extension}")
+            )
+    
+    # A stored document avoids a DOCX assembly and a PDF render
+    renders_avoided = 2 * sum(1 for document in documents.values() if document["found"])
+    store.record_avoided_renders(renders_avoided)
+    new_state["renders_avoided"] = renders_avoided
+    return new_state
 
 
 def create_documents(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create documents by updating content with generated improvements
     
+    Documents whose template and generated content match a previous run are
+    linked from the artifact store without being created again.
+    
     Args:
         state: Current state of the graph
         
@@ -22,35 +155,48 @@ def create_documents(state: Dict[str, Any]) -> Dict[str, Any]:
     # Create a new state dictionary to avoid modifying the input state
     new_state = state.copy()
     
-    # Create output directory if it doesn't exist
-    output_dir = os.path.join("output", state["output_file_name"])
-    os.makedirs(output_dir, exist_ok=True)
+    documents = find_documents(state)
+    missing = [name for name, document in documents.items() if not document["found"]]
     
-    # Update and save the resume
-    resume_doc = update_document_content(
-        state["resume_template_content"]["document"],
-        state["resume_content"],
-    )
-    resume_docx_path = os.path.join(output_dir, "resume.docx")
-    save_document(resume_doc, resume_docx_path)
-    new_state["resume_docx_path"] = resume_docx_path
-    
-    # Update and save the cover letter
-    cover_letter_doc = update_document_content(
-        state["cover_letter_template_content"]["document"],
-        state["cover_letter_content"],
-    )
-    cover_letter_docx_path = os.path.join(output_dir, "cover_letter.docx")
-    save_document(cover_letter_doc, cover_letter_docx_path)
-    new_state["cover_letter_docx_path"] = cover_letter_docx_path
+    # Update and save the resume and the cover letter that are not stored yet
+    docx_paths = {name: store_docx(documents[name]) for name in missing}
+    
+    # Generate their PDF files concurrently in the render pool
+    pdf_futures = {name: submit_stored_pdf(docx_paths[name], documents[name]["key"]) for name in missing}
+    for document_name, pdf_future in pdf_futures.items():
+        documents[document_name]["stored"] = {".docx": docx_paths[document_name], ".pdf": pdf_future.result()}
+    
+    return link_documents(new_state, documents)
+
+
+async def acreate_documents(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of create_documents(), running the blocking DOCX work in the
+    default executor and awaiting the PDF renders
+    
+    Args:
+        state: Current state of the graph
+        
+    Returns:
+        Updated state with paths to the generated documents
+    """
+    # Create a new state dictionary to avoid modifying the input state
+    new_state = state.copy()
+    
+    documents = await asyncio.to_thread(find_documents, state)
+    missing = [name for name, document in documents.items() if not document["found"]]
+    
+    # Update and save the resume and the cover letter that are not stored yet
+    docx_paths = await asyncio.gather(*[asyncio.to_thread(store_docx, documents[name]) for name in missing])
     
-    # Generate PDF files
-    resume_pdf_path = os.path.join(output_dir, "resume.pdf")
-    docx_to_pdf(resume_docx_path, resume_pdf_path)
-    new_state["resume_pdf_path"] = resume_pdf_path
+    # Generate their PDF files concurrently in the render pool
+    pdf_futures = await asyncio.gather(*[
+        asyncio.to_thread(submit_stored_pdf, docx_path, documents[name]["key"])
+        for docx_path, name in zip(docx_paths, missing)
+    ])
+    pdf_paths = await asyncio.gather(*[asyncio.wrap_future(pdf_future) for pdf_future in pdf_futures])
     
-    cover_letter_pdf_path = os.path.join(output_dir, "cover_letter.pdf")
-    docx_to_pdf(cover_letter_docx_path, cover_letter_pdf_path)
-    new_state["cover_letter_pdf_path"] = cover_letter_pdf_path
+    for name, docx_path, pdf_path in zip(missing, docx_paths, pdf_paths):
+        documents[name]["stored"] = {".docx": docx_path, ".pdf": pdf_path}
     
-    return new_state
\ No newline at end of file
+    return await asyncio.to_thread(link_documents, new_state, documents)
@@ -5,6 +5,37 @@ Processes and validates input data
 
 import os
 from typing import Dict, Any
+from utils.llm_utils import GENERATION_MODE, GENERATION_MODES
+from utils.ranking_utils import RANKING_TOP_K
+
+
+# Spellings of booleans accepted in text records (e.g. CSV)
+TRUE_VALUES = ["true", "yes", "on", "1"]
+FALSE_VALUES = ["false", "no", "off", "0"]
+
+
+def parse_bool(field: str, value: Any) -> bool:
+    """
+    Parse a boolean field, which CSV records give as text
+
+    Args:
+        field: Name of the field, for the error message
+        value: Boolean, or text such as "true" or "false"
+
+    Returns:
+        Boolean value of the field
+
+    Raises:
+        ValueError: If the text is not a known boolean spelling
+    """
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid {field}: {value} (expected true or false)")
 
 
 def process_input(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,6 +85,41 @@ def process_input(state: Dict[str, Any]) -> Dict[str, Any]:
     if new_state["hirer_gender"] not in ["male", "female", "unknown"]:
         new_state["hirer_gender"] = "unknown"
     
+    # Use the LLM response cache unless explicitly disabled
+    if "use_llm_cache" not in state or state["use_llm_cache"] is None:
+        new_state["use_llm_cache"] = True
+    else:
+        new_state["use_llm_cache"] = parse_bool("use_llm_cache", state["use_llm_cache"])
+    
+    # Reuse the outputs of unchanged nodes unless explicitly disabled
+    if "use_node_cache" not in state or state["use_node_cache"] is None:
+        new_state["use_node_cache"] = True
+    else:
+        new_state["use_node_cache"] = parse_bool("use_node_cache", state["use_node_cache"])
+    
+    # Validate the generation mode
+    new_state["generation_mode"] = state.get("generation_mode") or GENERATION_MODE
+    if new_state["generation_mode"] not in GENERATION_MODES:
+        raise ValueError(
+            f"Unknown generation mode: {new_state['generation_mode']} "
+            f"(expected one of {', '.join(GENERATION_MODES)})"
+        )
+    
+    # Number of experience/skills lines sent to the model (0 = every line); CSV
+    # records give it as text
+    if state.get("ranking_top_k") is None:
+        new_state["ranking_top_k"] = RANKING_TOP_K
+    else:
+        try:
+            new_state["ranking_top_k"] = int(state["ranking_top_k"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid top_k: {state['ranking_top_k']} (expected a whole number)")
+        if new_state["ranking_top_k"] < 0:
+            raise ValueError(f"Invalid top_k: {state['ranking_top_k']} (0 sends every line)")
+    
+    # Only stream LLM responses when requested
+    new_state["stream_llm"] = bool(state.get("stream_llm"))
+    
     # Set default output file name if not provided
     if "output_file_name" not in state or not state["output_file_name"]:
         new_state["output_file_name"] = f"{new_state['company_name']}_{new_state['job_title']}".replace(" ", "_").lower()
@@ -3,9 +3,23 @@ AIRG-LangGraph - Resume Generation Node
 Generates content for the resume based on the template and job details
 """
 
+import time
+import asyncio
 from typing import Dict, Any
-from utils.llm_utils import generate_resume_content
+from utils.llm_utils import generate_resume_content, agenerate_resume_content, track_incomplete_sections
 from utils.docx_utils import process_template
+from utils.progress_utils import SectionProgress, replay_sections
+
+# State fields the resume generation reads (besides its template)
+INPUT_FIELDS = [
+    "job_title",
+    "company_name",
+    "job_description",
+    "company_overview",
+    "relevant_experience",
+    "generation_mode",
+    "ranking_top_k",
+]
 
 
 def generate_resume(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -16,26 +30,96 @@ def generate_resume(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current state of the graph
 
     Returns:
-        Updated state with generated resume content
+        State update containing only the resume keys, so that it can be merged
+        with the parallel cover letter branch
     """
-    # Create a new state dictionary to avoid modifying the input state
-    new_state = state.copy()
+    start_time = time.perf_counter()
+    progress = SectionProgress("resume") if state.get("stream_llm") else None
 
-    # Process the resume template
-    resume_template_content = process_template(state["resume_source_path"])
-    new_state["resume_template_content"] = resume_template_content
+    # Process the resume template, unless it was already parsed (e.g. shared by a batch run)
+    resume_template_content = state.get("resume_template_content") or process_template(state["resume_source_path"])
 
     # Generate resume content
-    resume_content = generate_resume_content(
-        resume_template_content=resume_template_content,
-        job_title=state["job_title"],
-        company_name=state["company_name"],
-        job_description=state["job_description"],
-        company_overview=state["company_overview"],
-        relevant_experience=state["relevant_experience"],
+    with track_incomplete_sections() as incomplete_sections:
+        resume_content = generate_resume_content(
+            resume_template_content=resume_template_content,
+            job_title=state["job_title"],
+            company_name=state["company_name"],
+            job_description=state["job_description"],
+            company_overview=state["company_overview"],
+            relevant_experience=state["relevant_experience"],
+            use_cache=state.get("use_llm_cache", True),
+            on_section=progress,
+            mode=state.get("generation_mode"),
+            top_k=state.get("ranking_top_k"),
+        )
+
+    node_timings = {"resume_generation": time.perf_counter() - start_time}
+    if progress is not None and progress.first_section_seconds is not None:
+        node_timings["resume_first_section"] = progress.first_section_seconds
+
+    return {
+        "resume_template_content": resume_template_content,
+        "resume_content": resume_content,
+        "node_timings": node_timings,
+        # Sections that kept their original content make the outputs unfit for reuse
+        "incomplete_nodes": ["resume_generation"] if incomplete_sections else [],
+    }
+
+
+async def agenerate_resume(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of generate_resume(), offloading template parsing to a thread
+
+    Args:
+        state: Current state of the graph
+
+    Returns:
+        State update containing only the resume keys
+    """
+    start_time = time.perf_counter()
+    progress = SectionProgress("resume") if state.get("stream_llm") else None
+
+    # Process the resume template, unless it was already parsed (e.g. shared by a batch run)
+    resume_template_content = state.get("resume_template_content") or await asyncio.to_thread(
+        process_template, state["resume_source_path"]
     )
 
-    # Add the generated content to the state
-    new_state["resume_content"] = resume_content
+    # Generate resume content
+    with track_incomplete_sections() as incomplete_sections:
+        resume_content = await agenerate_resume_content(
+            resume_template_content=resume_template_content,
+            job_title=state["job_title"],
+            company_name=state["company_name"],
+            job_description=state["job_description"],
+            company_overview=state["company_overview"],
+            relevant_experience=state["relevant_experience"],
+            use_cache=state.get("use_llm_cache", True),
+            on_section=progress,
+            mode=state.get("generation_mode"),
+            top_k=state.get("ranking_top_k"),
+        )
+
+    node_timings = {"resume_generation": time.perf_counter() - start_time}
+    if progress is not None and progress.first_section_seconds is not None:
+        node_timings["resume_first_section"] = progress.first_section_seconds
+
+    return {
+        "resume_template_content": resume_template_content,
+        "resume_content": resume_content,
+        "node_timings": node_timings,
+        # Sections that kept their original content make the outputs unfit for reuse
+        "incomplete_nodes": ["resume_generation"] if incomplete_sections else [],
+    }
+
 
-    return new_state
\ No newline at end of file
+def replay_resume(state: Dict[str, Any], outputs: Dict[str, Any]) -> None:
+    """
+    Report the sections of reused resume content as stream events
+
+    Args:
+        state: Current state of the graph
+        outputs: Reused outputs of the node
+    """
+    if state.get("stream_llm"):
+        replay_sections("resume", outputs["resume_content"])
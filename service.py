@@ -0,0 +1,598 @@
+"""
+AIRG-LangGraph - AI Resume Generator using LangChain and LangGraph
+Local HTTP service processing jobs through a bounded queue and a worker pool
+
+Endpoints:
+    POST /templates                       Upload a DOCX template (raw request body)
+    POST /jobs                            Submit a job (JSON), answered with 202 and a job ID
+    GET  /jobs/<job_id>                   Status of a job and the URLs of its artifacts
+    GET  /jobs/<job_id>/artifacts/<name>  Generated document (resume.docx, resume.pdf, ...)
+    GET  /health                          Queue depth, worker count and job counters
+
+A job is only accepted when there is room in the queue; otherwise the request is
+rejected with 429 and a Retry-After header, so that bursts are pushed back to
+the clients instead of piling up in the process.
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import hashlib
+import logging
+import threading
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+from batch import build_input_data
+
+
+logger = logging.getLogger(__name__)
+
+# Worker pool and queue settings
+SERVICE_WORKERS = int(os.environ.get("AIRG_SERVICE_WORKERS", "2"))
+SERVICE_QUEUE_SIZE = int(os.environ.get("AIRG_SERVICE_QUEUE_SIZE", "16"))
+
+# Largest accepted request body (templates are uploaded as a single body)
+MAX_BODY_BYTES = int(os.environ.get("AIRG_SERVICE_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+
+# Seconds an idle worker waits for a job before checking whether the service stops
+WORKER_STOP_POLL_SECONDS = 0.5
+
+# Number of finished jobs whose status is kept in memory
+MAX_FINISHED_JOBS = 1000
+
+# Uploaded templates, named after the SHA-256 of their bytes; those not used for
+# this many days are deleted, and the least recently used ones beyond the size limit
+TEMPLATE_DIR = os.path.join("output", "service_templates")
+TEMPLATE_MAX_AGE_DAYS = float(os.environ.get("AIRG_SERVICE_TEMPLATE_MAX_AGE_DAYS", "30"))
+TEMPLATE_MAX_BYTES = int(os.environ.get("AIRG_SERVICE_TEMPLATE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Generated documents served for a finished job, by artifact name
+ARTIFACTS = {
+    "resume.docx": "resume_docx_path",
+    "resume.pdf": "resume_pdf_path",
+    "cover_letter.docx": "cover_letter_docx_path",
+    "cover_letter.pdf": "cover_letter_pdf_path",
+}
+
+CONTENT_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pdf": "application/pdf",
+}
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is full
+    """
+
+
+class JobService:
+    """
+    Accepts jobs into a bounded queue and runs them on a pool of worker threads
+    sharing the process-wide engine
+
+    Uploaded templates are stored by the SHA-256 of their bytes, so that jobs refer
+    to them by ID, also after a restart; their analysis comes from the template
+    cache, which is keyed by the same hash.
+    """
+
+    def __init__(self, workers: int = SERVICE_WORKERS, queue_size: int = SERVICE_QUEUE_SIZE):
+        """
+        Args:
+            workers: Number of jobs run at the same time
+            queue_size: Number of accepted jobs that may wait for a worker
+        """
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, queue_size))
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.counters = {"accepted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        # Templates of the running jobs (a list, as jobs may share a template)
+        self._running_templates: List[str] = []
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._engine = None
+
+    def start(self) -> "JobService":
+        """
+        Warm the engine up and start the worker threads
+
+        Returns:
+            The service itself
+        """
+        from engine import get_engine
+
+        self._engine = get_engine().warm_up()
+        os.makedirs(TEMPLATE_DIR, exist_ok=True)
+        self.remove_old_templates()
+
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"airg-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Let the workers finish the queued jobs, then stop them
+
+        Args:
+            timeout: Maximum number of seconds to wait for each worker
+        """
+        # The workers exit once the queue is empty, so a full queue never blocks the stop
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def add_template(self, data: bytes) -> Dict[str, Any]:
+        """
+        Store and parse an uploaded DOCX template
+
+        Args:
+            data: Bytes of the DOCX file
+
+        Returns:
+            Dictionary with the template ID and the names of its sections
+
+        Raises:
+            ValueError: If the upload is not a DOCX template
+        """
+        from utils.docx_utils import process_template
+
+        template_id = hashlib.sha256(data).hexdigest()
+        path = self.template_path(template_id)
+        if os.path.exists(path):
+            # Uploading a template again counts as using it
+            os.utime(path)
+        else:
+            # Write to a temporary file first so that a concurrent upload of
+            # the same template never sees a partial file
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+        try:
+            template_content = process_template(path)
+        except Exception as e:
+            os.remove(path)
+            raise ValueError(f"The upload is not a DOCX template ({type(e).__name__})")
+        self.remove_old_templates()
+
+        return {
+            "template_id": template_id,
+            "sections": [name for name, lines in template_content["sections"].items() if lines],
+        }
+
+    @staticmethod
+    def template_path(template_id: str) -> str:
+        """
+        Get the path of a stored template
+
+        Args:
+            template_id: SHA-256 of the template bytes
+
+        Returns:
+            Path of the DOCX file in TEMPLATE_DIR
+
+        Raises:
+            ValueError: If the ID is not a SHA-256 hex digest
+        """
+        if len(template_id) != 64 or any(char not in "0123456789abcdef" for char in template_id):
+            raise ValueError(f"Invalid template ID: {template_id}")
+        return os.path.join(TEMPLATE_DIR, f"{template_id}.docx")
+
+    def remove_old_templates(self) -> List[str]:
+        """
+        Delete the stored templates not used for TEMPLATE_MAX_AGE_DAYS, then the
+        least recently used ones until they take at most TEMPLATE_MAX_BYTES;
+        templates of queued or running jobs are kept
+
+        Returns:
+            Paths of the deleted templates
+        """
+        with self._lock:
+            in_use = {
+                job["_input"].get(field)
+                for job in self.jobs.values()
+                if "_input" in job
+                for field in ["resume_source_path", "cover_letter_source_path"]
+            }
+            in_use.update(self._running_templates)
+
+        # Stored templates that may be deleted, least recently used first
+        templates = []
+        total_bytes = 0
+        for file_name in os.listdir(TEMPLATE_DIR):
+            path = os.path.join(TEMPLATE_DIR, file_name)
+            if not file_name.endswith(".docx"):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            total_bytes += stat.st_size
+            if path not in in_use:
+                templates.append((stat.st_mtime, stat.st_size, path))
+        templates.sort()
+
+        removed = []
+        oldest_mtime = time.time() - TEMPLATE_MAX_AGE_DAYS * 24 * 60 * 60
+        for mtime, size, path in templates:
+            if mtime >= oldest_mtime and total_bytes <= TEMPLATE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            removed.append(path)
+        return removed
+
+    def submit(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a job record and add it to the queue
+
+        Args:
+            record: Job record using the batch field names, with resume_template_id
+                and cover_letter_template_id referring to uploaded templates
+
+        Returns:
+            Status of the new job
+
+        Raises:
+            ValueError: If the record is invalid
+            QueueFullError: If the queue has no room left
+        """
+        input_data = build_input_data(
+            {key: value for key, value in record.items() if key not in ("resume_template", "cover_letter_template")}
+        )
+
+        for field in ["job_title", "company_name"]:
+            if not input_data.get(field):
+                raise ValueError(f"Missing required field: {field}")
+
+        # Refer to the stored templates, whose analysis process_template() caches by hash
+        from utils.docx_utils import process_template
+
+        for document_name in ["resume", "cover_letter"]:
+            template_id = str(record.get(f"{document_name}_template_id") or "")
+            path = self.template_path(template_id) if template_id else None
+            if path is None or not os.path.exists(path):
+                raise ValueError(f"Unknown {document_name}_template_id: {template_id} (upload it to /templates)")
+            # Mark the template as used so that it is kept
+            os.utime(path)
+            input_data[f"{document_name}_source_path"] = path
+            input_data[f"{document_name}_template_content"] = process_template(path)
+
+        # Every job writes to its own output directory
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "output_file_name": input_data.get("output_file_name") or job_id,
+            "submitted_at": time.time(),
+        }
+        input_data["output_file_name"] = job_id
+
+        with self._lock:
+            try:
+                self.queue.put_nowait(job_id)
+            except queue.Full:
+                self.counters["rejected"] += 1
+                raise QueueFullError(f"The queue is full ({self.queue.maxsize} jobs waiting)")
+            job["_input"] = input_data
+            self.jobs[job_id] = job
+            self.counters["accepted"] += 1
+
+        return self.describe(job_id)
+
+    def describe(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the public status of a job
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Status of the job, or None if the job is unknown
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            status = {key: value for key, value in job.items() if not key.startswith("_")}
+
+        if status["status"] == "succeeded":
+            status["artifacts"] = {
+                name: f"/jobs/{job_id}/artifacts/{name}" for name in self.artifact_paths(job_id)
+            }
+        return status
+
+    def artifact_paths(self, job_id: str) -> Dict[str, str]:
+        """
+        Get the paths of the documents generated by a finished job
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Dictionary mapping artifact names to existing file paths
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            outputs = dict(job.get("_outputs") or {}) if job else {}
+
+        return {
+            name: outputs[field]
+            for name, field in ARTIFACTS.items()
+            if outputs.get(field) and os.path.exists(outputs[field])
+        }
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Get the load of the service
+
+        Returns:
+            Dictionary with the queue depth and size, the worker count, the number
+            of running jobs and the job counters
+        """
+        with self._lock:
+            running = sum(1 for job in self.jobs.values() if job["status"] == "running")
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_size": self.queue.maxsize,
+                "running": running,
+                **self.counters,
+            }
+
+    def retry_after_seconds(self) -> int:
+        """
+        Estimate when a rejected client should try again: the time the workers
+        need to take one job each off the queue
+
+        Returns:
+            Number of seconds, at least 1
+        """
+        average_run_seconds = self._engine.stats()["average_run_seconds"] if self._engine else 0.0
+        return max(1, round(average_run_seconds))
+
+    def _work(self) -> None:
+        while True:
+            try:
+                job_id = self.queue.get(timeout=WORKER_STOP_POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            try:
+                self._run_job(job_id)
+            finally:
+                self.queue.task_done()
+
+    def _run_job(self, job_id: str) -> None:
+        with self._lock:
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            input_data = job.pop("_input")
+            templates = [input_data["resume_source_path"], input_data["cover_letter_source_path"]]
+            self._running_templates.extend(templates)
+
+        try:
+            result = self._engine.run(input_data, session_id=job_id)
+            update = {
+                "status": "succeeded",
+                "_outputs": {field: result.get(field) for field in ARTIFACTS.values()},
+                "skipped_nodes": result.get("skipped_nodes", []),
+                "renders_avoided": result.get("renders_avoided", 0),
+            }
+        except Exception as e:
+            logger.error("Job %s failed: %s", job_id, traceback.format_exc())
+            update = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+        with self._lock:
+            for path in templates:
+                self._running_templates.remove(path)
+            job.update(update)
+            job["finished_at"] = time.time()
+            job["seconds"] = round(job["finished_at"] - job["started_at"], 3)
+            self.counters[job["status"]] += 1
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        # Forget the oldest finished jobs (their documents stay on disk)
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("succeeded", "failed")]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes the HTTP requests to the job service of the server
+    """
+
+    server_version = "AIRG"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> JobService:
+        return self.server.service
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Send a JSON response
+
+        Args:
+            status: HTTP status code
+            body: JSON body
+            headers: Additional response headers
+        """
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_json(status, {"error": message}, headers)
+
+    def read_body(self) -> Optional[bytes]:
+        """
+        Read the request body, answering with an error if it is missing, its
+        Content-Length is invalid or it is too large
+
+        Returns:
+            Bytes of the body, or None if an error was sent
+        """
+        header = self.headers.get("Content-Length")
+        if header is None:
+            # The body can't be delimited (e.g. chunked), so the connection can't be reused
+            self.close_connection = True
+            self.send_error_json(HTTPStatus.LENGTH_REQUIRED, "A request body with a Content-Length is required")
+            return None
+        if not header.strip().isdigit():
+            self.close_connection = True
+            self.send_error_json(HTTPStatus.BAD_REQUEST, f"Invalid Content-Length: {header}")
+            return None
+        length = int(header)
+        if length == 0:
+            self.send_error_json(HTTPStatus.LENGTH_REQUIRED, "A request body with a Content-Length is required")
+            return None
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self.send_error_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"The body exceeds {MAX_BODY_BYTES} bytes")
+            return None
+        return self.rfile.read(length)
+
+    def path_parts(self) -> Tuple[str, ...]:
+        return tuple(part for part in self.path.split("?", 1)[0].split("/") if part)
+
+    def do_POST(self) -> None:
+        parts = self.path_parts()
+
+        if parts == ("templates",):
+            data = self.read_body()
+            if data is None:
+                return
+            try:
+                self.send_json(HTTPStatus.CREATED, self.service.add_template(data))
+            except ValueError as e:
+                self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+
+        elif parts == ("jobs",):
+            data = self.read_body()
+            if data is None:
+                return
+            try:
+                record = json.loads(data)
+                if not isinstance(record, dict):
+                    raise ValueError("The job must be a JSON object")
+                job = self.service.submit(record)
+            except QueueFullError as e:
+                retry_after = self.service.retry_after_seconds()
+                self.send_error_json(HTTPStatus.TOO_MANY_REQUESTS, str(e), {"Retry-After": str(retry_after)})
+            except ValueError as e:
+                self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+            else:
+                self.send_json(HTTPStatus.ACCEPTED, job, {"Location": f"/jobs/{job['job_id']}"})
+
+        else:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"Unknown endpoint: POST {self.path}")
+
+    def do_GET(self) -> None:
+        parts = self.path_parts()
+
+        if parts == ("health",):
+            self.send_json(HTTPStatus.OK, self.service.health())
+
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.describe(parts[1])
+            if job is None:
+                self.send_error_json(HTTPStatus.NOT_FOUND, f"Unknown job: {parts[1]}")
+            else:
+                self.send_json(HTTPStatus.OK, job)
+
+        elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "artifacts":
+            job = self.service.describe(parts[1])
+            path = self.service.artifact_paths(parts[1]).get(parts[3])
+            if job is None or path is None:
+                self.send_error_json(HTTPStatus.NOT_FOUND, f"No artifact {parts[3]} for job {parts[1]}")
+                return
+            download_name = os.path.basename(str(job["output_file_name"])).replace('"', "")
+            self.send_file(path, f"{download_name}_{parts[3]}")
+
+        else:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"Unknown endpoint: GET {self.path}")
+
+    def send_file(self, path: str, download_name: str) -> None:
+        """
+        Send a generated document
+
+        Args:
+            path: Path of the document
+            download_name: File name suggested to the client
+        """
+        size = os.path.getsize(path)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream"))
+        self.send_header("Content-Length", str(size))
+        self.send_header("Content-Disposition", f'attachment; filename="{download_name}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """
+    Threading HTTP server holding the job service; the request threads only
+    validate and enqueue, so they return immediately
+    """
+
+    daemon_threads = True
+    # Clients polling their jobs reconnect often; a longer listen backlog keeps
+    # bursts of connections from waiting for SYN retransmits
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], service: JobService):
+        self.service = service
+        super().__init__(address, ServiceRequestHandler)
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    workers: int = SERVICE_WORKERS,
+    queue_size: int = SERVICE_QUEUE_SIZE,
+) -> ServiceHTTPServer:
+    """
+    Create the HTTP server and start its job service
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+        workers: Number of jobs run at the same time
+        queue_size: Number of accepted jobs that may wait for a worker
+
+    Returns:
+        Server ready for serve_forever()
+    """
+    service = JobService(workers=workers, queue_size=queue_size).start()
+    return ServiceHTTPServer((host, port), service)
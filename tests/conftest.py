@@ -0,0 +1,9 @@
+"""
+AIRG-LangGraph - Test configuration
+"""
+
+import os
+import sys
+
+# The modules are imported from the root of the repository, as when running main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+"""
+AIRG-LangGraph - Tests of the SQLite disk cache
+"""
+
+import time
+
+from utils.cache_utils import DiskCache
+
+
+def test_disk_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=10, max_age_seconds=None)
+    cache.set("a", "aaaaa")
+    time.sleep(0.01)
+    cache.set("b", "bbbbb")
+    time.sleep(0.01)
+    assert cache.get("a") == "aaaaa"
+    time.sleep(0.01)
+
+    cache.set("c", "ccccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaaa"
+    assert cache.get("c") == "ccccc"
+    assert cache.stats()["bytes"] == 10
+
+
+def test_disk_cache_expires_old_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_age_seconds=0.05)
+    cache.set("a", "value")
+    assert cache.get("a") == "value"
+
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,56 @@
+"""
+AIRG-LangGraph - Tests of the DOCX template utilities
+"""
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from utils import docx_utils
+from utils.cache_utils import DiskCache
+from utils.docx_utils import analyze_paragraph_sections, process_template, write_updated_docx
+
+
+def build_template(path: str) -> None:
+    # Summary line with plain runs, a hyperlink and a bookmark
+    doc = Document()
+    doc.add_paragraph("SUMMARY")
+    paragraph = doc.add_paragraph()
+    paragraph.add_run("Old ")
+    paragraph.add_run("text").bold = True
+    paragraph._p.append(parse_xml(
+        f'<w:hyperlink {nsdecls("w", "r")} r:id="rId99"><w:r><w:t>portfolio</w:t></w:r></w:hyperlink>'
+    ))
+    paragraph._p.append(parse_xml(f'<w:bookmarkStart {nsdecls("w")} w:id="0" w:name="summary"/>'))
+    paragraph._p.append(parse_xml(f'<w:bookmarkEnd {nsdecls("w")} w:id="0"/>'))
+    doc.save(path)
+
+
+def test_write_updated_docx_keeps_inline_elements(tmp_path):
+    template_path = str(tmp_path / "template.docx")
+    output_path = str(tmp_path / "output.docx")
+    build_template(template_path)
+    _, paragraph_sections = analyze_paragraph_sections(Document(template_path))
+
+    write_updated_docx(template_path, {"summary": ["SUMMARY", "New line "]}, paragraph_sections, output_path)
+
+    paragraph = Document(output_path).paragraphs[1]._p
+    texts = [element.text for element in paragraph.iter() if element.tag.endswith("}t")]
+    assert texts == ["New line ", "portfolio"]
+    assert paragraph.find(".//{*}hyperlink") is not None
+    assert paragraph.find("{*}bookmarkStart") is not None
+    assert paragraph.find("{*}bookmarkEnd") is not None
+
+
+def test_process_template_results_do_not_share_the_cached_analysis(tmp_path, monkeypatch):
+    monkeypatch.setattr(docx_utils, "_template_cache", DiskCache(str(tmp_path / "template_cache.db")))
+    template_path = str(tmp_path / "template.docx")
+    build_template(template_path)
+
+    first = process_template(template_path)
+    first["sections"]["summary"].append("Changed")
+    first["paragraph_sections"].clear()
+    second = process_template(template_path)
+
+    assert "Changed" not in second["sections"]["summary"]
+    assert second["paragraph_sections"]
@@ -0,0 +1,43 @@
+"""
+AIRG-LangGraph - Tests of the input validation
+"""
+
+import pytest
+
+from nodes.input_node import process_input
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ["resume.docx", "cover_letter.docx"]:
+        (tmp_path / name).write_bytes(b"")
+    return {
+        "resume_source_path": "resume.docx",
+        "cover_letter_source_path": "cover_letter.docx",
+        "job_title": "Engineer",
+        "company_name": "Acme",
+    }
+
+
+def test_top_k_from_a_csv_record_is_a_number(state):
+    assert process_input({**state, "ranking_top_k": "5"})["ranking_top_k"] == 5
+    assert process_input({**state, "ranking_top_k": 0})["ranking_top_k"] == 0
+
+
+@pytest.mark.parametrize("top_k", ["five", "-1"])
+def test_invalid_top_k_is_rejected(state, top_k):
+    with pytest.raises(ValueError):
+        process_input({**state, "ranking_top_k": top_k})
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("0", False), ("True", True), (False, False)])
+def test_cache_flags_from_a_csv_record_are_booleans(state, value, expected):
+    result = process_input({**state, "use_llm_cache": value, "use_node_cache": value})
+    assert result["use_llm_cache"] is expected
+    assert result["use_node_cache"] is expected
+
+
+def test_invalid_cache_flag_is_rejected(state):
+    with pytest.raises(ValueError):
+        process_input({**state, "use_llm_cache": "sometimes"})
@@ -0,0 +1,91 @@
+"""
+AIRG-LangGraph - Tests of the parsing of JSON produced by the LLM
+"""
+
+import json
+
+import pytest
+
+from utils.json_utils import IncrementalSectionParser, parse_sections, repair_json
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        '{"summary": ["Line one", "Line two"]}',
+        '```json\n{"summary": ["Line one", "Line two"]}\n```',
+        'Here is the JSON:\n{"summary": ["Line one", "Line two"]}\nGood luck!',
+    ],
+)
+def test_parse_sections_reads_well_formed_responses(response):
+    sections, repaired = parse_sections(response)
+
+    assert sections == {"summary": ["Line one", "Line two"]}
+    assert repaired == response.startswith("Here")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Trailing commas
+        ('{"a": ["x", "y",], "b": ["z"],}', {"a": ["x", "y"], "b": ["z"]}),
+        # Unclosed code fence
+        ('```json\n{"a": ["x"]}', {"a": ["x"]}),
+        # Mismatched closing bracket
+        ('{"a": ["x"}', {"a": ["x"]}),
+        # Truncated response: the incomplete member is dropped
+        ('{"a": ["x"], "b": ["y", "z', {"a": ["x"]}),
+        # Brackets and quotes inside strings are left alone
+        ('{"a": ["[x], {y}", "say \\"hi\\""],}', {"a": ["[x], {y}", 'say "hi"']}),
+    ],
+)
+def test_repair_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_repair_json_without_object():
+    assert repair_json("no JSON here") == "no JSON here"
+
+
+def test_parse_sections_coerces_near_misses():
+    sections, _ = parse_sections('{"summary": "One line", "skills": ["Python", 3], "other": {"x": 1}}')
+
+    assert sections == {"summary": ["One line"], "skills": ["Python", "3"]}
+
+
+def test_parse_sections_returns_nothing_for_prose():
+    assert parse_sections("I can't help with that.") == ({}, True)
+
+
+def test_parse_sections_skips_member_with_missing_comma():
+    sections, repaired = parse_sections('{"a": ["x"], "b": ["y" "z"], "c": ["q"]}')
+
+    assert sections == {"a": ["x"], "c": ["q"]}
+    assert repaired
+
+
+def test_incremental_parser_returns_members_as_they_complete():
+    parser = IncrementalSectionParser()
+
+    assert parser.feed('Sure! ```json\n{"summary": ["a", "b') == []
+    assert parser.feed('"], "count": 3') == [("summary", ["a", "b"])]
+    assert parser.feed(', "nested": {"x": [1, {"y": "}"}]}, "name": "n"') == [
+        ("count", 3),
+        ("nested", {"x": [1, {"y": "}"}]}),
+        ("name", "n"),
+    ]
+    assert not parser.done
+    assert parser.feed("}\n```") == []
+    assert parser.done
+
+
+def test_incremental_parser_accepts_control_characters_in_strings():
+    parser = IncrementalSectionParser()
+    response = '```json\n{"summary": ["first\nline", "tab\there"], "skills": ["Python"]}\n```'
+
+    completed = []
+    for index in range(0, len(response), 7):
+        completed.extend(parser.feed(response[index:index + 7]))
+
+    assert completed == [("summary", ["first\nline", "tab\there"]), ("skills", ["Python"])]
+    assert parser.done
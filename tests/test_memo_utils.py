@@ -0,0 +1,62 @@
+"""
+AIRG-LangGraph - Tests of the node memoization
+"""
+
+from utils import memo_utils
+from utils.cache_utils import DiskCache
+from utils.memo_utils import MemoizedNode
+
+
+def make_node(outputs, settings=None):
+    calls = []
+
+    def generate(state):
+        calls.append(state["job_title"])
+        return outputs.pop(0)
+
+    node = MemoizedNode(
+        "resume_generation",
+        generate,
+        None,
+        source_field="resume_source_path",
+        template_field="resume_template_content",
+        input_fields=["job_title"],
+        output_fields=["resume_content"],
+        settings=settings,
+    )
+    return node, calls
+
+
+def make_state():
+    return {"job_title": "Engineer", "resume_template_content": {"sha256": "abc"}, "use_node_cache": True}
+
+
+def test_incomplete_outputs_are_not_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(memo_utils, "_node_cache", DiskCache(str(tmp_path / "node_cache.db")))
+    node, calls = make_node([
+        {"resume_content": {"summary": ["original"]}, "incomplete_nodes": ["resume_generation"]},
+        {"resume_content": {"summary": ["tailored"]}, "incomplete_nodes": []},
+    ])
+
+    node(make_state())
+    node(make_state())
+    result = node(make_state())
+
+    assert len(calls) == 2
+    assert result["resume_content"] == {"summary": ["tailored"]}
+
+
+def test_changed_settings_run_the_node_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(memo_utils, "_node_cache", DiskCache(str(tmp_path / "node_cache.db")))
+    settings = ["model-a"]
+    node, calls = make_node(
+        [{"resume_content": {"summary": ["a"]}}, {"resume_content": {"summary": ["b"]}}],
+        settings=lambda: list(settings),
+    )
+
+    node(make_state())
+    node(make_state())
+    settings[0] = "model-b"
+    node(make_state())
+
+    assert len(calls) == 2
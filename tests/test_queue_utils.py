@@ -0,0 +1,49 @@
+"""
+AIRG-LangGraph - Tests of the durable SQLite job queue
+"""
+
+import time
+
+from utils.queue_utils import SQLiteJobQueue
+
+
+def test_lease_complete(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.db"))
+    first, second = queue.enqueue([{"n": 1}, {"n": 2}])
+
+    job = queue.lease("worker-1")
+    assert job == {"id": first, "payload": {"n": 1}, "attempt": 1, "max_attempts": queue.max_attempts}
+    assert queue.lease("worker-1")["id"] == second
+    assert queue.lease("worker-1") is None
+
+    assert queue.complete(first, "worker-1", {"ok": True})
+    assert queue.get(first)["status"] == "succeeded"
+    assert queue.get(first)["result"] == {"ok": True}
+    assert queue.pending() == 1
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.db"), visibility_timeout=0.05, max_attempts=2)
+    (job_id,) = queue.enqueue([{"n": 1}])
+
+    assert queue.lease("worker-1")["attempt"] == 1
+    assert queue.lease("worker-2") is None
+    time.sleep(0.1)
+
+    # The lease expired: another worker takes the job, and the first worker's result is discarded
+    assert queue.lease("worker-2") == {"id": job_id, "payload": {"n": 1}, "attempt": 2, "max_attempts": 2}
+    assert queue.heartbeat([job_id], "worker-1") == [job_id]
+    assert not queue.complete(job_id, "worker-1", {})
+    assert queue.heartbeat([job_id], "worker-2") == []
+
+
+def test_expired_lease_after_last_attempt_fails_the_job(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.db"), visibility_timeout=0.05, max_attempts=1)
+    (job_id,) = queue.enqueue([{"n": 1}])
+    queue.lease("worker-1")
+    time.sleep(0.1)
+
+    assert queue.lease("worker-2") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "Lease expired" in job["error"]
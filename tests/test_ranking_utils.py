@@ -0,0 +1,19 @@
+"""
+AIRG-LangGraph - Tests of the selection of the lines sent to the model
+"""
+
+from utils.ranking_utils import merge_selected_lines
+
+
+def test_merge_selected_lines_replaces_in_place():
+    lines = ["a", "b", "c", "d"]
+
+    assert merge_selected_lines(lines, [1, 3], ["B", "D"]) == ["a", "B", "c", "D"]
+    assert lines == ["a", "b", "c", "d"]
+
+
+def test_merge_selected_lines_inserts_at_first_selected_line():
+    lines = ["a", "b", "c", "d"]
+
+    assert merge_selected_lines(lines, [1, 3], ["X", "Y", "Z"]) == ["a", "X", "Y", "Z", "c"]
+    assert merge_selected_lines(lines, [0, 2], ["X"]) == ["X", "b", "d"]
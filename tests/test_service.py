@@ -0,0 +1,65 @@
+"""
+AIRG-LangGraph - Tests of the template store of the HTTP service
+"""
+
+import os
+import time
+import threading
+
+import pytest
+
+import service
+from service import JobService
+
+
+@pytest.fixture
+def template_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "TEMPLATE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def store_template(directory, name, size, age_days):
+    path = directory / f"{name * 64}.docx"
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_days * 24 * 60 * 60
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_old_templates_are_removed(template_dir, monkeypatch):
+    monkeypatch.setattr(service, "TEMPLATE_MAX_AGE_DAYS", 30)
+    old = store_template(template_dir, "a", 10, age_days=40)
+    recent = store_template(template_dir, "b", 10, age_days=1)
+
+    assert JobService().remove_old_templates() == [old]
+    assert os.path.exists(recent)
+
+
+def test_least_recently_used_templates_are_removed_beyond_the_size_limit(template_dir, monkeypatch):
+    monkeypatch.setattr(service, "TEMPLATE_MAX_BYTES", 25)
+    oldest = store_template(template_dir, "a", 10, age_days=3)
+    queued = store_template(template_dir, "b", 10, age_days=2)
+    store_template(template_dir, "c", 10, age_days=1)
+    job_service = JobService()
+    job_service.jobs["job"] = {"status": "queued", "_input": {"resume_source_path": queued}}
+
+    assert job_service.remove_old_templates() == [oldest]
+    assert os.path.exists(queued)
+
+
+def test_template_ids_are_hashes():
+    with pytest.raises(ValueError):
+        JobService.template_path("../secrets")
+
+
+def test_stop_does_not_block_on_a_full_queue():
+    job_service = JobService(workers=1, queue_size=1)
+    job_service._threads = [threading.Thread(target=lambda: None)]
+    job_service._threads[0].start()
+    job_service.queue.put_nowait("job")
+
+    stopper = threading.Thread(target=job_service.stop)
+    stopper.start()
+    stopper.join(2)
+
+    assert not stopper.is_alive()
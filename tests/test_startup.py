@@ -0,0 +1,21 @@
+"""
+AIRG-LangGraph - Startup time regression test of the CLI
+"""
+
+import pytest
+
+from benchmarks.bench_startup import COMMANDS, MAIN_PATH, heavy_imports
+from utils.import_utils import run_with_import_times
+
+# Wall time allowed for a command answered by click alone (the benchmark's
+# limit, with room for a loaded test machine)
+STARTUP_LIMIT_SECONDS = 2.0
+
+
+@pytest.mark.parametrize("command", COMMANDS, ids=" ".join)
+def test_command_starts_without_generation_stack(command, tmp_path):
+    result = run_with_import_times([MAIN_PATH] + command, cwd=str(tmp_path))
+
+    assert heavy_imports(result) == []
+    assert result["seconds"] < STARTUP_LIMIT_SECONDS
+    assert "Traceback" not in result["stderr"]
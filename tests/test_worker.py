@@ -0,0 +1,21 @@
+"""
+AIRG-LangGraph - Tests of the queue worker
+"""
+
+from worker import is_transient_error
+
+
+class ServerError(Exception):
+    code = 503
+
+
+def test_transient_errors_are_retried():
+    assert is_transient_error(ServerError("UNAVAILABLE"))
+    assert is_transient_error(ConnectionResetError("reset by peer"))
+    assert is_transient_error(TimeoutError("timed out"))
+
+
+def test_invalid_input_fails_the_job():
+    assert not is_transient_error(ValueError("Missing required field: job_title"))
+    assert not is_transient_error(FileNotFoundError("template.docx"))
+    assert not is_transient_error(KeyError("job_title"))
@@ -0,0 +1,31 @@
+"""
+AIRG-LangGraph - Tests of the rewriting of ZIP packages
+"""
+
+import zipfile
+
+from utils.zip_utils import rewrite_zip
+
+
+def test_rewrite_zip_round_trip(tmp_path):
+    source_path = str(tmp_path / "source.zip")
+    output_path = str(tmp_path / "output.zip")
+    members = {
+        "[Content_Types].xml": b"<Types/>",
+        "word/document.xml": b"<document>old</document>" * 100,
+        "word/media/image.png": bytes(range(256)) * 10,
+    }
+    with zipfile.ZipFile(source_path, "w") as source_zip:
+        for name, data in members.items():
+            compression = zipfile.ZIP_STORED if name.endswith(".png") else zipfile.ZIP_DEFLATED
+            source_zip.writestr(name, data, compress_type=compression)
+
+    rewrite_zip(source_path, output_path, {"word/document.xml": b"<document>new</document>"})
+
+    with zipfile.ZipFile(source_path) as source_zip, zipfile.ZipFile(output_path) as output_zip:
+        assert output_zip.testzip() is None
+        assert output_zip.namelist() == list(members)
+        assert output_zip.read("word/document.xml") == b"<document>new</document>"
+        for name in ["[Content_Types].xml", "word/media/image.png"]:
+            assert output_zip.read(name) == members[name]
+            assert output_zip.getinfo(name).compress_type == source_zip.getinfo(name).compress_type
@@ -0,0 +1,225 @@
+"""
+AIRG-LangGraph - Content-addressed store of the generated documents
+"""
+
+import os
+import uuid
+import shutil
+import threading
+from typing import Dict, Any, List, Optional
+
+from utils.cache_utils import make_cache_key
+
+
+# Location of the stored documents
+ARTIFACT_STORE_DIR = os.path.join("output", "artifacts")
+
+# Bump when the generated DOCX or PDF files change for the same inputs
+ARTIFACT_VERSION = 1
+
+
+def artifact_key(template_content: Dict[str, Any], content: Dict[str, List[str]], *settings: Any) -> str:
+    """
+    Build the key of a generated document
+
+    Args:
+        template_content: Processed template content (identified by its SHA-256)
+        content: Generated sections of the document
+        settings: Other values the generated files depend on (e.g. the DOCX to HTML converter)
+
+    Returns:
+        Hex SHA-256 key of the document
+    """
+    return make_cache_key("artifact", ARTIFACT_VERSION, template_content["sha256"], content, *settings)
+
+
+class ArtifactStore:
+    """
+    Store of generated files, addressed by the key of the inputs they were
+    generated from
+
+    Files are written to a temporary name in the store and then linked into
+    place read-only, so a stored file is always complete and never rewritten. The named output
+    paths are hardlinks to the stored files (symlinks, or copies, on filesystems
+    without hardlinks) and are replaced atomically, so writing a new output
+    never modifies a file another output links to.
+    """
+
+    def __init__(self, root: str = ARTIFACT_STORE_DIR):
+        """
+        Args:
+            root: Directory of the store
+        """
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self.renders_avoided = 0
+        self.bytes_deduplicated = 0
+        self.links: Dict[str, int] = {"hardlink": 0, "symlink": 0, "copy": 0}
+        self._lock = threading.Lock()
+
+    def path(self, key: str, extension: str) -> str:
+        """
+        Get the path of a stored file
+
+        Args:
+            key: Key of the document
+            extension: File extension, with its dot
+
+        Returns:
+            Path of the file in the store
+        """
+        return os.path.join(self.root, key[:2], f"{key}{extension}")
+
+    def lookup(self, key: str, extensions: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Find the stored files of a document
+
+        Args:
+            key: Key of the document
+            extensions: Extensions of the files that must all be stored
+
+        Returns:
+            Dictionary mapping each extension to its stored file, or None if any is missing
+        """
+        paths = {extension: self.path(key, extension) for extension in extensions}
+        found = all(os.path.exists(path) for path in paths.values())
+
+        with self._lock:
+            if found:
+                self.hits += 1
+                self.bytes_deduplicated += sum(os.path.getsize(path) for path in paths.values())
+            else:
+                self.misses += 1
+        return paths if found else None
+
+    def temp_path(self, key: str, extension: str) -> str:
+        """
+        Get a unique temporary path in the store to write a file to before commit()
+
+        Args:
+            key: Key of the document
+            extension: File extension, with its dot
+
+        Returns:
+            Temporary path next to the stored file
+        """
+        path = self.path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{uuid.uuid4().hex}.tmp{extension}"
+
+    def commit(self, temp_path: str, key: str, extension: str) -> str:
+        """
+        Move a completely written file into the store
+
+        When concurrent runs generate the same document, the first stored file is
+        kept and the others are discarded, so that every output links to it.
+
+        Args:
+            temp_path: Path returned by temp_path()
+            key: Key of the document
+            extension: File extension, with its dot
+
+        Returns:
+            Path of the stored file
+        """
+        path = self.path(key, extension)
+
+        # Stored files are read-only, so that editing a named output (a hardlink
+        # to it) fails instead of changing the content stored under the key
+        os.chmod(temp_path, 0o444)
+        try:
+            # Unlike a rename, a link never replaces an existing file
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        except OSError:
+            # Without hardlinks, replace the stored file with an identical one
+            os.replace(temp_path, path)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return path
+
+    def link(self, stored_path: str, output_path: str) -> str:
+        """
+        Make a named output path point to a stored file
+
+        Args:
+            stored_path: Path of the stored file
+            output_path: Path of the output file, replaced if it exists
+
+        Returns:
+            The output path
+        """
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        # The output may already be linked to the stored file (renaming a link over
+        # another link to the same file does nothing)
+        if os.path.exists(output_path) and os.path.samefile(stored_path, output_path):
+            with self._lock:
+                self.links["hardlink" if not os.path.islink(output_path) else "symlink"] += 1
+            return output_path
+
+        temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+
+        # Prefer a hardlink, which survives the deletion of the store
+        try:
+            os.link(stored_path, temp_path)
+            method = "hardlink"
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(stored_path), temp_path)
+                method = "symlink"
+            except OSError:
+                shutil.copyfile(stored_path, temp_path)
+                method = "copy"
+        os.replace(temp_path, output_path)
+
+        with self._lock:
+            self.links[method] += 1
+        return output_path
+
+    def record_avoided_renders(self, count: int) -> None:
+        """
+        Count the DOCX and PDF renders a stored document made unnecessary
+
+        Args:
+            count: Number of renders avoided
+        """
+        with self._lock:
+            self.renders_avoided += count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of the store
+
+        Returns:
+            Dictionary with the documents found and generated, the renders
+            avoided, the bytes not written again and how outputs were linked
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders_avoided": self.renders_avoided,
+                "bytes_deduplicated": self.bytes_deduplicated,
+                "links": dict(self.links),
+            }
+
+
+_artifact_store: Optional[ArtifactStore] = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Get the process-wide artifact store
+
+    Returns:
+        ArtifactStore instance backed by output/artifacts
+    """
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
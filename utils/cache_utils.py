@@ -0,0 +1,178 @@
+"""
+AIRG-LangGraph - Utilities for persistent, content-addressed caches
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+
+# Default location and limits of the LLM response cache
+LLM_CACHE_PATH = os.path.join("output", "llm_cache.db")
+LLM_CACHE_MAX_BYTES = 100 * 1024 * 1024
+LLM_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed cache key from JSON-serializable parts
+
+    Args:
+        parts: Values that together identify the cached content
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON serialization of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Key/value cache stored in a SQLite database, with size- and age-based LRU eviction
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        max_age_seconds: Optional[float] = LLM_CACHE_MAX_AGE_SECONDS,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file
+            max_bytes: Maximum total size of the cached values
+            max_age_seconds: Maximum age of an entry, or None to keep entries until evicted by size
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps the cache safe to share
+        # between threads and processes
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value and mark it as recently used
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if the key is missing or expired
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and self.max_age_seconds is not None and now - row[1] > self.max_age_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a value and evict old entries if the cache grew over its limits
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        # Drop expired entries first
+        if self.max_age_seconds is not None:
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.max_age_seconds,))
+
+        # Then drop least recently used entries until the cache fits in its size limit
+        total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        stale_keys = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC"):
+            if total_size <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total_size -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the hit/miss counters of this process and the size of the cache
+
+        Returns:
+            Dictionary with hits, misses, hit rate, number of entries and total size in bytes
+        """
+        with self._connect() as conn:
+            entries, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_size,
+        }
+
+
+_llm_cache: Optional[DiskCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskCache:
+    """
+    Get the process-wide LLM response cache
+
+    Returns:
+        DiskCache instance backed by output/llm_cache.db
+    """
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = DiskCache(LLM_CACHE_PATH)
+        return _llm_cache
@@ -0,0 +1,372 @@
+"""
+AIRG-LangGraph - Persistent checkpoint store for graph sessions
+"""
+
+import os
+import time
+import atexit
+import asyncio
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+from utils.metrics_utils import traced
+
+
+# Location of the session checkpoints
+SESSIONS_DB_PATH = os.path.join("output", "airg_sessions.db")
+
+# Sessions not updated for this many days are deleted (0 keeps them forever)
+SESSION_RETENTION_DAYS = float(os.environ.get("AIRG_SESSION_RETENTION_DAYS", "7"))
+
+# Checkpoint writes are committed together at most this many seconds apart
+CHECKPOINT_COMMIT_INTERVAL = float(os.environ.get("AIRG_CHECKPOINT_COMMIT_INTERVAL", "1.0"))
+
+# How often the background thread applies the retention policy, and the share of
+# free pages above which the database file is compacted with VACUUM
+SESSION_MAINTENANCE_INTERVAL = 60 * 60
+VACUUM_FREE_PAGE_RATIO = 0.25
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCheckpointer(SqliteSaver):
+    """
+    SQLite checkpointer shared by every graph run of the process
+
+    A single connection in WAL mode is used by all runs; writes are serialized by
+    the saver's lock and committed in batches (every CHECKPOINT_COMMIT_INTERVAL
+    seconds, and when a run finishes) rather than after every node. A sessions
+    table records when each thread was last updated, so that a background thread
+    can delete expired sessions and compact the database file.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSIONS_DB_PATH,
+        retention_days: float = SESSION_RETENTION_DAYS,
+        commit_interval: float = CHECKPOINT_COMMIT_INTERVAL,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file
+            retention_days: Days after which an inactive session is deleted (0 keeps sessions forever)
+            commit_interval: Maximum number of seconds between two commits of checkpoint writes
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # check_same_thread=False is safe as every access goes through self.lock
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode, NORMAL only syncs at WAL checkpoints, which is enough for
+        # sessions that can be regenerated
+        conn.execute("PRAGMA synchronous=NORMAL")
+        super().__init__(conn)
+
+        self.path = path
+        self.retention_days = retention_days
+        self.commit_interval = commit_interval
+        self._last_commit = time.monotonic()
+        self._uncommitted_writes = 0
+        self._closed = False
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._stop_maintenance = threading.Event()
+
+    def setup(self) -> None:
+        """
+        Create the checkpoint tables and the session index
+        """
+        if self.is_setup:
+            return
+
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "thread_id TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        # Index the sessions of databases created before the index existed
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO sessions (thread_id, created_at, updated_at) "
+            "SELECT DISTINCT thread_id, ?, ? FROM checkpoints",
+            (now, now),
+        )
+        self.conn.commit()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        """
+        Get a cursor for the database, committing writes in batches
+
+        Args:
+            transaction: Whether the cursor writes to the database
+        """
+        with self.lock:
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+                if transaction:
+                    self._uncommitted_writes += 1
+                    if time.monotonic() - self._last_commit >= self.commit_interval:
+                        self._commit()
+
+    def _commit(self) -> None:
+        # Commit the pending writes (self.lock must be held)
+        self.conn.commit()
+        self._uncommitted_writes = 0
+        self._last_commit = time.monotonic()
+
+    @traced("checkpoint")
+    def flush(self) -> None:
+        """
+        Commit the checkpoint writes not committed yet
+        """
+        with self.lock:
+            if self._uncommitted_writes and not self._closed:
+                self._commit()
+
+    @traced("checkpoint")
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint and mark its session as updated
+        """
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+
+        now = time.time()
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO sessions (thread_id, created_at, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (str(config["configurable"]["thread_id"]), now, now),
+            )
+
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete all checkpoints and writes of a session
+
+        Args:
+            thread_id: Thread ID of the session
+        """
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM sessions WHERE thread_id = ?", (str(thread_id),))
+
+    def expire_sessions(self, vacuum: bool = True) -> int:
+        """
+        Delete the sessions not updated within the retention period, and compact the
+        database file when a large share of it is free
+
+        Args:
+            vacuum: Whether VACUUM may run after deleting sessions
+
+        Returns:
+            Number of sessions deleted
+        """
+        if self.retention_days <= 0:
+            return 0
+
+        cutoff = time.time() - self.retention_days * 24 * 60 * 60
+        with self.lock:
+            self.setup()
+            self._commit()
+
+            expired = [
+                (thread_id,) for (thread_id,) in
+                self.conn.execute("SELECT thread_id FROM sessions WHERE updated_at < ?", (cutoff,))
+            ]
+            if not expired:
+                return 0
+
+            self.conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", expired)
+            self.conn.executemany("DELETE FROM writes WHERE thread_id = ?", expired)
+            self.conn.executemany("DELETE FROM sessions WHERE thread_id = ?", expired)
+            self._commit()
+
+            # Compact the file once enough of it is free, then shrink the WAL
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if vacuum and page_count and free_pages / page_count > VACUUM_FREE_PAGE_RATIO:
+                self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        logger.info("Deleted %d expired sessions from %s", len(expired), self.path)
+        return len(expired)
+
+    def start_maintenance(self, interval: float = SESSION_MAINTENANCE_INTERVAL) -> None:
+        """
+        Start the background thread committing pending writes and applying the
+        retention policy
+
+        Args:
+            interval: Seconds between two applications of the retention policy
+        """
+        if self._maintenance_thread is not None:
+            return
+
+        def maintain() -> None:
+            next_expiry = time.monotonic()
+            while not self._stop_maintenance.wait(self.commit_interval):
+                try:
+                    self.flush()
+                    if time.monotonic() >= next_expiry:
+                        self.expire_sessions()
+                        next_expiry = time.monotonic() + interval
+                except sqlite3.Error as e:
+                    logger.warning("Session store maintenance failed: %s", e)
+
+        self._maintenance_thread = threading.Thread(target=maintain, name="airg-sessions", daemon=True)
+        self._maintenance_thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the number of sessions and the size of the database
+
+        Returns:
+            Dictionary with the number of sessions and checkpoints, and the size in bytes
+        """
+        with self.cursor(transaction=False) as cur:
+            sessions = cur.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+        size = sum(
+            os.path.getsize(path) for path in [self.path, f"{self.path}-wal"] if os.path.exists(path)
+        )
+        return {"sessions": sessions, "checkpoints": checkpoints, "bytes": size}
+
+    def close(self) -> None:
+        """
+        Stop the maintenance thread, commit pending writes and close the connection
+        """
+        self._stop_maintenance.set()
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join()
+        with self.lock:
+            if not self._closed:
+                self.conn.commit()
+                self.conn.close()
+                self._closed = True
+
+    # The async interface runs the synchronous methods in the default executor, so
+    # that the same checkpointer serves graph.invoke and graph.ainvoke
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Any],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aget_delta_channel_history(
+        self, *, config: RunnableConfig, channels: Sequence[str]
+    ) -> Mapping[str, Any]:
+        return await asyncio.to_thread(
+            lambda: self.get_delta_channel_history(config=config, channels=channels)
+        )
+
+
+_checkpointer: Optional[SessionCheckpointer] = None
+_checkpointer_lock = threading.Lock()
+# Whether the database of the process-wide checkpointer is deleted when the process exits
+_delete_on_exit = False
+
+
+def configure_checkpointer(path: str, delete_on_exit: bool = False) -> None:
+    """
+    Set the database of the process-wide checkpointer (before it is first used)
+
+    Processes running jobs concurrently, such as queue workers, each use their own
+    database, as a commit batch holds the write lock of the database file.
+
+    Args:
+        path: Path to the SQLite database file
+        delete_on_exit: Whether to delete the database when the process exits, for
+            sessions that are not resumed by another process
+    """
+    global SESSIONS_DB_PATH, _delete_on_exit
+    with _checkpointer_lock:
+        if _checkpointer is not None:
+            raise RuntimeError("The checkpointer is already in use")
+        SESSIONS_DB_PATH = path
+        _delete_on_exit = delete_on_exit
+
+
+def delete_database(path: str) -> None:
+    """
+    Delete a session database with its write-ahead log and shared memory files
+
+    Args:
+        path: Path to the SQLite database file
+    """
+    for file_path in [path, f"{path}-wal", f"{path}-shm"]:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+def get_checkpointer() -> SessionCheckpointer:
+    """
+    Get the process-wide session checkpointer, starting its maintenance thread on first use
+
+    Returns:
+        SessionCheckpointer instance backed by output/airg_sessions.db (see configure_checkpointer)
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SessionCheckpointer(SESSIONS_DB_PATH)
+            _checkpointer.start_maintenance()
+            # Exit handlers run in reverse order: the database is closed before it is deleted
+            if _delete_on_exit:
+                atexit.register(delete_database, SESSIONS_DB_PATH)
+            atexit.register(_checkpointer.close)
+        return _checkpointer
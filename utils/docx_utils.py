@@ -4,8 +4,36 @@ AIRG-LangGraph - Utilities for working with DOCX files
 
 import re
 import os
-from typing import Dict, List, Tuple, Any
+import json
+import copy
+import zipfile
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any, Optional
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from lxml import etree
+from utils.cache_utils import DiskCache, make_cache_key
+from utils.metrics_utils import traced
+from utils.zip_utils import rewrite_zip
+
+
+# Sections recognized in templates
+SECTION_NAMES = ["personal_info", "summary", "experience", "skills", "education", "other"]
+
+# Location of the parsed template cache; bump the version whenever the
+# structure analysis changes so that stale entries are ignored
+TEMPLATE_CACHE_PATH = os.path.join("output", "template_cache.db")
+TEMPLATE_CACHE_VERSION = 1
+
+# Number of parsed templates also kept in memory, most recently used first
+TEMPLATE_MEMORY_CACHE_SIZE = int(os.environ.get("AIRG_TEMPLATE_MEMORY_CACHE_SIZE", "64"))
+
+# Package relationship pointing at the main document part
+OFFICE_DOCUMENT_RELATIONSHIP = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+PACKAGE_RELATIONSHIPS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
 
 
 def read_document(document_path: str) -> Tuple[Document, str, Dict[str, List[str]]]:
@@ -22,20 +50,33 @@ def read_document(document_path: str) -> Tuple[Document, str, Dict[str, List[str
     doc = Document(document_path)
     
     # Extract text from the document
-    text_content = ""
-    for paragraph in doc.paragraphs:
-        text_content += paragraph.text + "\n"
+    text_content = extract_text_content(doc)
+    
+    # Analyze document structure to identify sections
+    sections = analyze_document_structure(doc)
+    
+    return doc, text_content, sections
+
+
+def extract_text_content(doc: Document) -> str:
+    """
+    Extract the text of all paragraphs and table cells of a document
+    
+    Args:
+        doc: Document object to read
+        
+    Returns:
+        Text content with one line per paragraph
+    """
+    lines = [paragraph.text for paragraph in doc.paragraphs]
     
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
                 for paragraph in cell.paragraphs:
-                    text_content += paragraph.text + "\n"
-    
-    # Analyze document structure to identify sections
-    sections = analyze_document_structure(doc)
+                    lines.append(paragraph.text)
     
-    return doc, text_content, sections
+    return "".join(line + "\n" for line in lines)
 
 
 def analyze_document_structure(doc: Document) -> Dict[str, List[str]]:
@@ -48,14 +89,25 @@ def analyze_document_structure(doc: Document) -> Dict[str, List[str]]:
     Returns:
         Dictionary mapping section names to their content
     """
-    sections = {
-        "personal_info": [],
-        "summary": [],
-        "experience": [],
-        "skills": [],
-        "education": [],
-        "other": []
-    }
+    sections, _ = analyze_paragraph_sections(doc)
+    
+    return sections
+
+
+def analyze_paragraph_sections(doc: Document) -> Tuple[Dict[str, List[str]], List[Optional[str]]]:
+    """
+    Analyze the document structure to identify sections and the section of each paragraph
+    
+    Args:
+        doc: Document object to analyze
+        
+    Returns:
+        Tuple containing the dictionary mapping section names to their content, and
+        a list with the section name of each paragraph (None for empty paragraphs)
+    """
+    sections = {name: [] for name in SECTION_NAMES}
+    
+    paragraph_sections = []
     
     current_section = "other"
     
@@ -65,6 +117,7 @@ def analyze_document_structure(doc: Document) -> Dict[str, List[str]]:
         
         # Skip empty paragraphs
         if not text:
+            paragraph_sections.append(None)
             continue
         
         # Check if this is a section heading
@@ -86,21 +139,39 @@ def analyze_document_structure(doc: Document) -> Dict[str, List[str]]:
         
         # Add the paragraph text to the current section
         sections[current_section].append(text)
+        paragraph_sections.append(current_section)
     
-    return sections
+    return sections, paragraph_sections
 
 
-def update_document_content(doc: Document, updated_sections: Dict[str, List[str]]) -> Document:
+@traced("docx")
+def update_document_content(
+    doc: Document,
+    updated_sections: Dict[str, List[str]],
+    paragraph_sections: Optional[List[Optional[str]]] = None,
+) -> Document:
     """
     Update a DOCX document with the provided section content
     
+    The document is rewritten in a single pass over its paragraphs: the updated
+    content of a section replaces its first paragraph, and its other paragraphs
+    are dropped.
+    
     Args:
         doc: Document object to update
         updated_sections: Dictionary mapping section names to their updated content
+        paragraph_sections: Section name of each paragraph, as computed by
+            process_template(); computed from the document when not provided
         
     Returns:
         Updated Document object
     """
+    paragraphs = doc.paragraphs
+    
+    # Map every paragraph to its section, unless the template already did
+    if paragraph_sections is None or len(paragraph_sections) != len(paragraphs):
+        _, paragraph_sections = analyze_paragraph_sections(doc)
+    
     # Create a new document to avoid modifying the original
     new_doc = Document()
     
@@ -112,44 +183,38 @@ def update_document_content(doc: Document, updated_sections: Dict[str, List[str]
             except:
                 pass  # Skip if style already exists or can't be added
     
-    # Analyze the original document structure
-    original_sections = analyze_document_structure(doc)
+    # Style ids of the new document by style id of the original one, as looking a
+    # paragraph style up by name scans the whole style sheet
+    style_ids: Dict[Optional[str], Optional[str]] = {}
+    
+    def add_paragraph(text: str, source_paragraph) -> None:
+        source_style_id = source_paragraph._p.style
+        if source_style_id not in style_ids:
+            # Try to resolve the style in the new document
+            try:
+                style_ids[source_style_id] = new_doc.styles.get_style_id(
+                    source_paragraph.style.name, WD_STYLE_TYPE.PARAGRAPH
+                )
+            except:
+                style_ids[source_style_id] = None  # Skip if style can't be applied
+        p = new_doc.add_paragraph(text)
+        p._p.style = style_ids[source_style_id]
     
     # Track which sections we've processed
     processed_sections = set()
     
     # Copy the document paragraph by paragraph, replacing section content as needed
-    for i, paragraph in enumerate(doc.paragraphs):
-        text = paragraph.text.strip()
-        
-        # Determine which section this paragraph belongs to
-        current_section = None
-        for section_name, section_content in original_sections.items():
-            if text in section_content and section_name not in processed_sections:
-                current_section = section_name
-                break
-        
-        # If this is a section we need to update and haven't processed yet
-        if current_section and current_section in updated_sections and current_section not in processed_sections:
+    for paragraph, section in zip(paragraphs, paragraph_sections):
+        if section is None or section not in updated_sections:
+            # Copy the paragraph as is
+            add_paragraph(paragraph.text, paragraph)
+        elif section not in processed_sections:
             # Add the updated content for this section
-            for updated_text in updated_sections[current_section]:
-                p = new_doc.add_paragraph(updated_text)
-                # Try to copy the style
-                try:
-                    p.style = paragraph.style.name
-                except:
-                    pass  # Skip if style can't be applied
+            for updated_text in updated_sections[section]:
+                add_paragraph(updated_text, paragraph)
             
             # Mark this section as processed
-            processed_sections.add(current_section)
-        else:
-            # Copy the paragraph as is
-            p = new_doc.add_paragraph(paragraph.text)
-            # Try to copy the style
-            try:
-                p.style = paragraph.style.name
-            except:
-                pass  # Skip if style can't be applied
+            processed_sections.add(section)
     
     # Copy tables
     for table in doc.tables:
@@ -171,6 +236,150 @@ def update_document_content(doc: Document, updated_sections: Dict[str, List[str]
     return new_doc
 
 
+@traced("docx", output=True)
+def write_updated_docx(
+    template_path: str,
+    updated_sections: Dict[str, List[str]],
+    paragraph_sections: Optional[List[Optional[str]]],
+    output_path: str,
+) -> str:
+    """
+    Write a copy of a DOCX template with the provided section content
+    
+    Unlike update_document_content(), the template package is not rebuilt: only
+    the body paragraphs of the sections whose content changed are edited in the
+    main document part, and every other part (styles, numbering, headers, images)
+    is copied byte for byte without being decompressed. Each updated line takes the
+    place of the section paragraph at the same position, keeping its paragraph
+    properties and the formatting of its first run; extra lines repeat the last
+    paragraph of the section and missing ones are removed.
+    
+    Args:
+        template_path: Path to the DOCX template
+        updated_sections: Dictionary mapping section names to their updated content
+        paragraph_sections: Section name of each body paragraph, as computed by
+            process_template(); computed from the template when it does not match
+        output_path: Path to save the document to
+        
+    Returns:
+        Path to the saved document
+    """
+    # Create the directory if it doesn't exist
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # Read the main document part
+    with zipfile.ZipFile(template_path) as package:
+        document_part = _main_document_part_name(package)
+        root = etree.fromstring(package.read(document_part))
+    
+    body = root.find(qn("w:body"))
+    paragraphs = [child for child in body if child.tag == qn("w:p")]
+    if paragraph_sections is None or len(paragraph_sections) != len(paragraphs):
+        _, paragraph_sections = analyze_paragraph_sections(Document(template_path))
+    
+    # Group the body paragraphs by section, in document order
+    section_paragraphs: Dict[str, List[Any]] = {}
+    for paragraph, section in zip(paragraphs, paragraph_sections):
+        if section is not None:
+            section_paragraphs.setdefault(section, []).append(paragraph)
+    
+    changed = False
+    for section, lines in updated_sections.items():
+        originals = section_paragraphs.get(section)
+        if not originals:
+            continue
+        
+        # Leave sections whose content did not change untouched
+        if [_paragraph_text(paragraph).strip() for paragraph in originals] == [line.strip() for line in lines]:
+            continue
+        changed = True
+        
+        previous = None
+        for i, line in enumerate(lines):
+            if i < len(originals):
+                paragraph = originals[i]
+                if _paragraph_text(paragraph).strip() != line.strip():
+                    _set_paragraph_text(paragraph, line)
+            else:
+                # Repeat the last paragraph of the section for extra lines
+                paragraph = copy.deepcopy(originals[-1])
+                _set_paragraph_text(paragraph, line)
+                previous.addnext(paragraph)
+            previous = paragraph
+        
+        # Remove the paragraphs left over when the section got shorter
+        for paragraph in originals[len(lines):]:
+            paragraph.getparent().remove(paragraph)
+    
+    replacements = {}
+    if changed:
+        replacements[document_part] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+    
+    return rewrite_zip(template_path, output_path, replacements)
+
+
+def _main_document_part_name(package: zipfile.ZipFile) -> str:
+    # Follow the package relationship to the main document part
+    try:
+        relationships = etree.fromstring(package.read("_rels/.rels"))
+        for relationship in relationships.iter(f"{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"):
+            if relationship.get("Type") == OFFICE_DOCUMENT_RELATIONSHIP:
+                return relationship.get("Target").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def _paragraph_text(paragraph) -> str:
+    # Concatenate the text of a w:p element the way python-docx does for the common cases
+    text = []
+    for element in paragraph.iter(qn("w:t"), qn("w:tab"), qn("w:br"), qn("w:cr")):
+        if element.tag == qn("w:t"):
+            text.append(element.text or "")
+        elif element.tag == qn("w:tab"):
+            text.append("\t")
+        else:
+            text.append("\n")
+    return "".join(text)
+
+
+def _set_paragraph_text(paragraph, text: str) -> None:
+    # Replace the text runs of a w:p element with a single run keeping the run
+    # properties of the first one. Only the runs are edited: the paragraph
+    # properties, hyperlinks, bookmarks, fields and comment ranges are kept.
+    # The runs are the direct children of the paragraph or, when it has none
+    # (e.g. the whole line is a hyperlink), the runs around its first text
+    runs = _text_runs(paragraph)
+    if not runs:
+        first_run = paragraph.find(f".//{qn('w:r')}")
+        runs = _text_runs(first_run.getparent()) if first_run is not None else []
+    
+    if runs:
+        run = runs[0]
+        for other_run in runs[1:]:
+            other_run.getparent().remove(other_run)
+        for child in list(run):
+            if child.tag != qn("w:rPr"):
+                run.remove(child)
+    else:
+        run = etree.SubElement(paragraph, qn("w:r"))
+    
+    text_element = etree.SubElement(run, qn("w:t"))
+    text_element.text = text
+    text_element.set(qn("xml:space"), "preserve")
+
+
+def _text_runs(parent) -> List[Any]:
+    # Direct w:r children of an element, except the runs holding the instructions
+    # of a complex field (w:fldChar, w:instrText), which are kept as they are
+    return [
+        child
+        for child in parent
+        if child.tag == qn("w:r") and child.find(qn("w:fldChar")) is None and child.find(qn("w:instrText")) is None
+    ]
+
+
+@traced("docx", output=True)
 def save_document(doc: Document, output_path: str) -> str:
     """
     Save a Document object to a file
@@ -191,21 +400,101 @@ def save_document(doc: Document, output_path: str) -> str:
     return output_path
 
 
-def process_template(template_path: str) -> Dict[str, Any]:
+def file_sha256(file_path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file's bytes
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    
+    return digest.hexdigest()
+
+
+_template_cache: Optional[DiskCache] = None
+_parsed_templates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def get_template_cache() -> DiskCache:
+    """
+    Get the process-wide parsed template cache
+    
+    Returns:
+        DiskCache instance backed by output/template_cache.db
+    """
+    global _template_cache
+    with _template_cache_lock:
+        if _template_cache is None:
+            _template_cache = DiskCache(TEMPLATE_CACHE_PATH, max_age_seconds=None)
+        return _template_cache
+
+
+@traced("docx")
+def process_template(template_path: str, use_cache: bool = True) -> Dict[str, Any]:
     """
     Process a DOCX template and analyze its content
     
+    The analysis is cached by the SHA-256 of the template bytes, on disk and, for
+    the most recently used templates, in memory, so an unchanged template is only
+    parsed with python-docx once. The Document itself is not part of the result.
+    
     Args:
         template_path: Path to the DOCX template
+        use_cache: Whether to read from and write to the template cache
         
     Returns:
-        Dictionary containing the Document object, text content, and section content
+        Dictionary containing the template path and hash, text content, section
+        content, and the section of each paragraph
     """
-    # Read and analyze the document
-    doc, text_content, sections = read_document(template_path)
+    sha256 = file_sha256(template_path)
+    cache_key = make_cache_key("template", TEMPLATE_CACHE_VERSION, sha256)
+    
+    # Look the analysis up in memory, then on disk
+    parsed = None
+    if use_cache:
+        with _template_cache_lock:
+            parsed = _parsed_templates.get(cache_key)
+            if parsed is not None:
+                _parsed_templates.move_to_end(cache_key)
+    if parsed is None and use_cache:
+        cached_value = get_template_cache().get(cache_key)
+        if cached_value is not None:
+            parsed = json.loads(cached_value)
     
+    if parsed is None:
+        # Read and analyze the document
+        doc = Document(template_path)
+        sections, paragraph_sections = analyze_paragraph_sections(doc)
+        parsed = {
+            "text_content": extract_text_content(doc),
+            "sections": sections,
+            "paragraph_sections": paragraph_sections,
+        }
+        if use_cache:
+            get_template_cache().set(
+                cache_key, json.dumps(parsed, ensure_ascii=False, separators=(",", ":"))
+            )
+    
+    if use_cache:
+        with _template_cache_lock:
+            _parsed_templates[cache_key] = parsed
+            _parsed_templates.move_to_end(cache_key)
+            while len(_parsed_templates) > TEMPLATE_MEMORY_CACHE_SIZE:
+                _parsed_templates.popitem(last=False)
+    
+    # Return copies, so that callers changing the result don't alter the cached analysis
     return {
-        "document": doc,
-        "text_content": text_content,
-        "sections": sections,
-    }
\ No newline at end of file
+        "path": template_path,
+        "sha256": sha256,
+        "text_content": parsed["text_content"],
+        "sections": {name: list(lines) for name, lines in parsed["sections"].items()},
+        "paragraph_sections": list(parsed["paragraph_sections"]),
+    }
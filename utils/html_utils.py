@@ -0,0 +1,270 @@
+"""
+AIRG-LangGraph - In-process conversion of DOCX documents to HTML
+"""
+
+import io
+import html
+from typing import Dict, List, Optional, Union, BinaryIO
+from docx import Document
+from docx.document import Document as DocumentObject
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+
+# Base stylesheet applied to every converted document
+BASE_CSS = """
+body { font-family: Arial, sans-serif; font-size: 11pt; line-height: 1.25; }
+p { margin: 0 0 6pt 0; }
+h1, h2, h3, h4, h5, h6 { margin: 12pt 0 6pt 0; }
+ul, ol { margin: 0 0 6pt 0; padding-left: 18pt; }
+table { border-collapse: collapse; width: 100%; margin: 0 0 6pt 0; }
+td { vertical-align: top; padding: 2pt 4pt; }
+"""
+
+ALIGNMENT_CSS = {
+    WD_ALIGN_PARAGRAPH.LEFT: "left",
+    WD_ALIGN_PARAGRAPH.CENTER: "center",
+    WD_ALIGN_PARAGRAPH.RIGHT: "right",
+    WD_ALIGN_PARAGRAPH.JUSTIFY: "justify",
+}
+
+
+def docx_to_html_string(source: Union[str, BinaryIO, DocumentObject], include_base_css: bool = True) -> str:
+    """
+    Convert a DOCX document to an HTML string without leaving the process
+
+    Paragraph styles are mapped to CSS classes, direct paragraph and run
+    formatting to inline styles, and the page size and margins of the first
+    section to an @page rule.
+
+    Args:
+        source: Path to the DOCX file, file-like object with its bytes, or Document object
+        include_base_css: Whether to embed BASE_CSS (disable when the renderer
+            provides it as a separate stylesheet)
+
+    Returns:
+        HTML document
+    """
+    doc = source if isinstance(source, DocumentObject) else Document(source)
+    return DocxHtmlConverter(doc).convert(include_base_css)
+
+
+class DocxHtmlConverter:
+    """
+    Converts one python-docx Document to HTML, writing into an in-memory buffer
+    """
+
+    def __init__(self, doc: DocumentObject):
+        """
+        Args:
+            doc: Document object to convert
+        """
+        self.doc = doc
+        self._body = io.StringIO()
+        self._style_classes: Dict[str, str] = {}
+        self._open_list: Optional[str] = None
+        # Style names by style id: resolving a paragraph style through python-docx
+        # scans the whole style sheet, so each id is only resolved once
+        self._style_names: Dict[Optional[str], str] = {}
+
+    def convert(self, include_base_css: bool = True) -> str:
+        """
+        Convert the document
+
+        Args:
+            include_base_css: Whether to embed BASE_CSS
+
+        Returns:
+            HTML document
+        """
+        self._write_block_items(self.doc.element.body)
+        self._close_list()
+
+        out = io.StringIO()
+        out.write('<!DOCTYPE html><html><head><meta charset="utf-8"><style>')
+        if include_base_css:
+            out.write(BASE_CSS)
+        out.write(self._page_css())
+        for style_name, class_name in self._style_classes.items():
+            css = self._style_css(self.doc.styles[style_name])
+            if css:
+                out.write(f".{class_name} {{ {css} }}\n")
+        out.write("</style></head><body>")
+        out.write(self._body.getvalue())
+        out.write("</body></html>")
+        return out.getvalue()
+
+    def _write_block_items(self, parent) -> None:
+        # Walk paragraphs and tables in document order
+        for child in parent.iterchildren():
+            if child.tag == qn("w:p"):
+                self._write_paragraph(Paragraph(child, self.doc))
+            elif child.tag == qn("w:tbl"):
+                self._close_list()
+                self._write_table(Table(child, self.doc))
+
+    def _write_paragraph(self, paragraph: Paragraph) -> None:
+        if not paragraph.text.strip():
+            self._close_list()
+            return
+
+        style_name = self._paragraph_style_name(paragraph)
+        tag = "p"
+        list_tag = None
+        if style_name.startswith("Heading "):
+            level = style_name.split(" ", 1)[1]
+            tag = f"h{min(int(level), 6)}" if level.isdigit() else "h2"
+        elif style_name == "Title":
+            tag = "h1"
+        elif style_name.startswith("List Bullet"):
+            tag, list_tag = "li", "ul"
+        elif style_name.startswith("List Number"):
+            tag, list_tag = "li", "ol"
+
+        # Group consecutive list items into one list
+        if list_tag != self._open_list:
+            self._close_list()
+            if list_tag:
+                self._body.write(f"<{list_tag}>")
+                self._open_list = list_tag
+
+        attributes = f' class="{self._style_class(style_name)}"'
+        inline_css = self._paragraph_css(paragraph)
+        if inline_css:
+            attributes += f' style="{inline_css}"'
+
+        self._body.write(f"<{tag}{attributes}>")
+        if hasattr(paragraph, "iter_inner_content"):
+            # python-docx >= 1.0 also exposes the runs inside hyperlinks
+            for item in paragraph.iter_inner_content():
+                if hasattr(item, "address"):
+                    self._body.write(f'<a href="{html.escape(item.url or "", quote=True)}">')
+                    for run in item.runs:
+                        self._write_run(run)
+                    self._body.write("</a>")
+                else:
+                    self._write_run(item)
+        else:
+            for run in paragraph.runs:
+                self._write_run(run)
+        self._body.write(f"</{tag}>")
+
+    def _write_run(self, run) -> None:
+        if not run.text:
+            return
+
+        text = html.escape(run.text).replace("\n", "<br/>").replace("\t", "&emsp;")
+        font = run.font
+
+        css = []
+        if font.size is not None:
+            css.append(f"font-size: {font.size.pt:g}pt")
+        if font.name:
+            css.append(f"font-family: '{font.name}'")
+        if font.color is not None and font.color.type is not None and font.color.rgb is not None:
+            css.append(f"color: #{font.color.rgb}")
+        if css:
+            text = f'<span style="{"; ".join(css)}">{text}</span>'
+        if font.underline:
+            text = f"<u>{text}</u>"
+        if font.italic:
+            text = f"<em>{text}</em>"
+        if font.bold:
+            text = f"<strong>{text}</strong>"
+
+        self._body.write(text)
+
+    def _write_table(self, table: Table) -> None:
+        self._body.write("<table>")
+        for row in table.rows:
+            self._body.write("<tr>")
+
+            # Merged cells are returned once per grid column; emit them once with a colspan
+            cells = row.cells
+            i = 0
+            while i < len(cells):
+                span = 1
+                while i + span < len(cells) and cells[i + span]._tc is cells[i]._tc:
+                    span += 1
+                self._body.write(f'<td colspan="{span}">' if span > 1 else "<td>")
+                self._write_block_items(cells[i]._tc)
+                self._close_list()
+                self._body.write("</td>")
+                i += span
+
+            self._body.write("</tr>")
+        self._body.write("</table>")
+
+    def _close_list(self) -> None:
+        if self._open_list:
+            self._body.write(f"</{self._open_list}>")
+            self._open_list = None
+
+    def _paragraph_style_name(self, paragraph: Paragraph) -> str:
+        style_id = paragraph._p.style
+        if style_id not in self._style_names:
+            style = paragraph.style
+            self._style_names[style_id] = style.name if style is not None else "Normal"
+        return self._style_names[style_id]
+
+    def _style_class(self, style_name: str) -> str:
+        if style_name not in self._style_classes:
+            self._style_classes[style_name] = f"s{len(self._style_classes)}"
+        return self._style_classes[style_name]
+
+    @staticmethod
+    def _style_css(style) -> str:
+        # Resolve the style inheritance chain, base styles first
+        chain = []
+        while style is not None:
+            chain.insert(0, style)
+            style = style.base_style
+
+        properties: Dict[str, str] = {}
+        for item in chain:
+            font = item.font
+            if font.name:
+                properties["font-family"] = f"'{font.name}'"
+            if font.size is not None:
+                properties["font-size"] = f"{font.size.pt:g}pt"
+            if font.bold is not None:
+                properties["font-weight"] = "bold" if font.bold else "normal"
+            if font.italic is not None:
+                properties["font-style"] = "italic" if font.italic else "normal"
+            if font.color is not None and font.color.type is not None and font.color.rgb is not None:
+                properties["color"] = f"#{font.color.rgb}"
+            if font.all_caps:
+                properties["text-transform"] = "uppercase"
+
+        return "; ".join(f"{name}: {value}" for name, value in properties.items())
+
+    @staticmethod
+    def _paragraph_css(paragraph: Paragraph) -> str:
+        paragraph_format = paragraph.paragraph_format
+        css: List[str] = []
+        if paragraph_format.alignment in ALIGNMENT_CSS:
+            css.append(f"text-align: {ALIGNMENT_CSS[paragraph_format.alignment]}")
+        if paragraph_format.left_indent:
+            css.append(f"margin-left: {paragraph_format.left_indent.pt:g}pt")
+        if paragraph_format.first_line_indent:
+            css.append(f"text-indent: {paragraph_format.first_line_indent.pt:g}pt")
+        if paragraph_format.space_before is not None:
+            css.append(f"margin-top: {paragraph_format.space_before.pt:g}pt")
+        if paragraph_format.space_after is not None:
+            css.append(f"margin-bottom: {paragraph_format.space_after.pt:g}pt")
+        return "; ".join(css)
+
+    def _page_css(self) -> str:
+        if not self.doc.sections:
+            return ""
+        section = self.doc.sections[0]
+        if section.page_width is None or section.page_height is None:
+            return ""
+
+        margins = [
+            section.top_margin, section.right_margin, section.bottom_margin, section.left_margin,
+        ]
+        margin_css = " ".join(f"{margin.pt:g}pt" if margin is not None else "0" for margin in margins)
+        return f"@page {{ size: {section.page_width.pt:g}pt {section.page_height.pt:g}pt; margin: {margin_css}; }}\n"
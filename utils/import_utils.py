@@ -0,0 +1,123 @@
+"""
+AIRG-LangGraph - Import time profiling utilities
+"""
+
+import os
+import sys
+import time
+import subprocess
+from typing import Dict, List, Any
+
+
+def parse_import_times(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse the report written by `python -X importtime`
+
+    Args:
+        stderr: Standard error of the profiled process
+
+    Returns:
+        One entry per imported module, in import order, with its self and
+        cumulative time in milliseconds and its nesting depth
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({
+            "module": stripped,
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return entries
+
+
+def run_with_import_times(args: List[str], cwd: str = None) -> Dict[str, Any]:
+    """
+    Run a Python command line with import time profiling enabled
+
+    Args:
+        args: Arguments passed to the interpreter (e.g. ["main.py", "--help"])
+        cwd: Working directory of the process
+
+    Returns:
+        Dictionary with the exit code, the wall time in seconds, the output, the
+        standard error without the profiling lines and the parsed import times
+    """
+    start_time = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime"] + list(args),
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    seconds = time.perf_counter() - start_time
+
+    return {
+        "returncode": process.returncode,
+        "seconds": seconds,
+        "stdout": process.stdout,
+        "stderr": "".join(
+            line for line in process.stderr.splitlines(keepends=True) if not line.startswith("import time:")
+        ),
+        "imports": parse_import_times(process.stderr),
+    }
+
+
+def format_import_profile(imports: List[Dict[str, Any]], seconds: float, top: int = 15) -> str:
+    """
+    Summarize import times as a report of the most expensive imports
+
+    Args:
+        imports: Parsed import times
+        seconds: Wall time of the profiled process
+        top: Number of modules listed in each table
+
+    Returns:
+        Report text
+    """
+    lines = [
+        f"Startup: {seconds * 1000:.0f} ms wall time, {sum(entry['self_ms'] for entry in imports):.0f} ms "
+        f"importing {len(imports)} modules",
+        "",
+        "Slowest top-level imports (including their dependencies):",
+    ]
+    top_level = sorted(
+        (entry for entry in imports if entry["depth"] == 0), key=lambda entry: entry["cumulative_ms"], reverse=True
+    )
+    for entry in top_level[:top]:
+        lines.append(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    lines += ["", "Slowest modules (own time only):"]
+    for entry in sorted(imports, key=lambda entry: entry["self_ms"], reverse=True)[:top]:
+        lines.append(f"  {entry['self_ms']:9.1f} ms  {entry['module']}")
+
+    return "\n".join(lines)
+
+
+def profile_command(args: List[str]) -> int:
+    """
+    Run the CLI again with import time profiling and print where its startup time goes
+
+    Args:
+        args: Command line arguments of the CLI (without the profiling option)
+
+    Returns:
+        Exit code of the profiled command
+    """
+    result = run_with_import_times([os.path.abspath(sys.argv[0])] + list(args))
+
+    # Pass the output of the profiled command through
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+
+    print("\n" + format_import_profile(result["imports"], result["seconds"]), file=sys.stderr)
+    return result["returncode"]
@@ -0,0 +1,298 @@
+"""
+AIRG-LangGraph - Utilities for parsing JSON produced by the LLM
+"""
+
+import re
+import json
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+
+
+# Schema of the generated content: section names mapped to lists of lines
+SECTIONS_SCHEMA = TypeAdapter(Dict[str, List[str]])
+
+# Complete Markdown code fence around the JSON object
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*\n(.*?)\n\s*```", re.DOTALL)
+
+
+# Marks a member whose value could not be decoded
+UNDECODABLE = object()
+
+
+def _decode(text: str) -> Any:
+    # Decode one JSON value, accepting raw control characters in strings as
+    # parse_sections() does, and returning UNDECODABLE instead of raising
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        return UNDECODABLE
+
+
+class IncrementalSectionParser:
+    """
+    Incremental parser for a streamed JSON object mapping section names to values
+
+    Text is fed chunk by chunk as it arrives from the model, and each top-level
+    member is returned as soon as its value is complete, without waiting for the
+    rest of the object. Anything before the opening brace (e.g. a ```json fence)
+    is ignored, and so are members whose value is not valid JSON (e.g. an array
+    with a missing comma).
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # What is expected next at the top level of the object:
+        # "key", "colon", "value", "primitive" (inside a bare value) or "comma"
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Feed the next chunk of text
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            List of (section name, value) pairs completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+
+        while self._pos < len(self._buffer) and not self.done:
+            i = self._pos
+            c = self._buffer[i]
+            self._pos += 1
+
+            if self._depth == 0:
+                # Skip everything up to the opening brace of the object
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        text = _decode(self._buffer[self._string_start:i + 1])
+                        if self._expect == "key":
+                            self._key = text
+                            self._expect = "colon"
+                        elif self._expect == "value":
+                            self._complete(completed, text)
+                            self._expect = "comma"
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                continue
+
+            if self._depth > 1:
+                if c in "[{":
+                    self._depth += 1
+                elif c in "]}":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._complete(completed, _decode(self._buffer[self._value_start:i + 1]))
+                        self._expect = "comma"
+                continue
+
+            # Top level of the object
+            if self._expect == "primitive" and c in ",}":
+                self._complete(completed, _decode(self._buffer[self._value_start:i].strip()))
+                self._expect = "comma"
+
+            if c.isspace():
+                continue
+            if c == ":" and self._expect == "colon":
+                self._expect = "value"
+            elif c == "," and self._expect == "comma":
+                self._expect = "key"
+            elif c == "}":
+                self._depth = 0
+                self.done = True
+            elif self._expect == "value":
+                self._value_start = i
+                if c in "[{":
+                    self._depth += 1
+                else:
+                    self._expect = "primitive"
+
+        return completed
+
+    def _complete(self, completed: List[Tuple[str, Any]], value: Any) -> None:
+        # Return a completed member, unless its key or value could not be decoded
+        if self._key is not UNDECODABLE and value is not UNDECODABLE:
+            completed.append((self._key, value))
+
+
+def sections_json_schema(section_names: List[str]) -> Dict[str, Any]:
+    """
+    Build the JSON schema of a response containing the given sections, for
+    structured output
+
+    Args:
+        section_names: Names of the expected sections
+
+    Returns:
+        JSON schema of an object mapping each section name to a list of strings
+    """
+    return {
+        "type": "object",
+        "properties": {name: {"type": "array", "items": {"type": "string"}} for name in section_names},
+        "required": list(section_names),
+    }
+
+
+def validate_sections(value: Any) -> Dict[str, List[str]]:
+    """
+    Validate parsed JSON against the sections schema, coercing near misses
+
+    A string value becomes a one-line section, numbers in a list become strings,
+    and values that can't be coerced (e.g. nested objects or null) are dropped, so
+    that the section counts as missing.
+
+    Args:
+        value: Parsed JSON value
+
+    Returns:
+        Dictionary mapping section names to their lines
+    """
+    if not isinstance(value, dict):
+        return {}
+
+    normalized = {}
+    for name, lines in value.items():
+        if isinstance(lines, str):
+            lines = [lines]
+        if not isinstance(lines, list):
+            continue
+        normalized[str(name)] = [
+            line if isinstance(line, str) else json.dumps(line)
+            for line in lines
+            if isinstance(line, (str, int, float)) and not isinstance(line, bool)
+        ]
+
+    try:
+        return SECTIONS_SCHEMA.validate_python(normalized)
+    except ValidationError:
+        return {}
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair the common defects of JSON objects written by a model: prose or an
+    unclosed code fence around the object, trailing commas and mismatched closing
+    brackets; a truncated object is closed after its last complete member
+
+    Args:
+        text: Raw text of the response
+
+    Returns:
+        Text of the repaired JSON object (or the text itself if it contains no object)
+    """
+    start = text.find("{")
+    if start < 0:
+        return text
+
+    out: List[str] = []
+    closers: List[str] = []
+    in_string = False
+    escape = False
+    # Length of the output after the last complete top-level member
+    last_complete = 1
+
+    def strip_trailing_comma() -> None:
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+
+    for c in text[start:]:
+        if in_string:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c == '"':
+            in_string = True
+        elif c in "{[":
+            closers.append("}" if c == "{" else "]")
+        elif c in "}]":
+            strip_trailing_comma()
+            # Close inner structures the model left open
+            while closers and closers[-1] != c:
+                out.append(closers.pop())
+                strip_trailing_comma()
+            if closers:
+                closers.pop()
+                out.append(c)
+            if not closers:
+                # The object is complete; ignore anything after it (prose, fence)
+                break
+            if len(closers) == 1:
+                last_complete = len(out)
+            continue
+        elif c == "," and len(closers) == 1:
+            strip_trailing_comma()
+            last_complete = len(out)
+        out.append(c)
+
+    if closers:
+        # Truncated response: keep only the complete members, as the last one
+        # may have lost some of its lines
+        out = out[:last_complete]
+        strip_trailing_comma()
+        out.append("}")
+
+    return "".join(out)
+
+
+def parse_sections(response: str) -> Tuple[Dict[str, List[str]], bool]:
+    """
+    Parse the sections of a response, repairing the JSON when needed
+
+    Args:
+        response: Raw text returned by the LLM
+
+    Returns:
+        Tuple containing the dictionary mapping section names to their lines (empty
+        if nothing could be recovered), and whether the response had to be repaired
+    """
+    # Well-formed JSON, possibly in a complete code fence
+    fence_match = FENCE_PATTERN.search(response)
+    for candidate in [response.strip(), fence_match.group(1) if fence_match else None]:
+        if candidate is None:
+            continue
+        try:
+            return validate_sections(json.loads(candidate, strict=False)), False
+        except json.JSONDecodeError:
+            pass
+
+    # Repaired JSON
+    repaired = repair_json(response)
+    try:
+        return validate_sections(json.loads(repaired, strict=False)), True
+    except json.JSONDecodeError:
+        pass
+
+    # Otherwise keep the members that are complete and decode on their own
+    parser = IncrementalSectionParser()
+    return validate_sections(dict(parser.feed(repaired))), True
@@ -3,72 +3,1514 @@ AIRG-LangGraph - Utilities for working with the Gemini LLM
 """
 
 import os
-import json
 import re
-from typing import Dict, List, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+import time
+import asyncio
+import contextvars
+import random
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from utils.cache_utils import get_llm_cache, make_cache_key
+from utils.metrics_utils import annotate, traced
+from utils.json_utils import IncrementalSectionParser, parse_sections, sections_json_schema
+from utils.docx_utils import SECTION_NAMES
+from utils.prompt_utils import PROMPT_TOKEN_BUDGET, compact_prompt, compact_sections, compact_text, count_tokens, render_prompt
+from utils.ranking_utils import RANKING_TOP_K, merge_selected_lines, prune_sections
+
+
+# Gemini model settings (also part of the LLM response cache key)
+GEMINI_MODEL = "gemini-2.0-pro-exp-02-05"
+GEMINI_TEMPERATURE = 0.2
+
+# Gemini quotas (the experimental model is limited to 2 RPM and 50 requests/day);
+# a value of 0 disables the corresponding limit
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("AIRG_LLM_RPM", "2"))
+LLM_DAILY_QUOTA = int(os.environ.get("AIRG_LLM_DAILY_QUOTA", "50"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("AIRG_LLM_MAX_CONCURRENCY", "2"))
+LLM_MAX_RETRIES = int(os.environ.get("AIRG_LLM_MAX_RETRIES", "5"))
+LLM_QUOTA_LEDGER_PATH = os.path.join("output", "llm_quota.db")
+
+# Whether the RPM limit is shared, through the quota ledger, by every process
+# using the same output directory (e.g. a fleet of queue workers)
+LLM_SHARED_RATE_LIMIT = os.environ.get("AIRG_LLM_SHARED_RATE_LIMIT", "1") != "0"
+
+# How content is generated: "document" sends the whole document in one prompt and
+# asks for every section back, "compact" sends only the editable sections in one
+# prompt and "sections" sends one concurrent prompt per editable section
+GENERATION_MODES = ["document", "compact", "sections"]
+GENERATION_MODE = os.environ.get("AIRG_GENERATION_MODE", "document")
+
+# Whether the model is asked for JSON matching the schema of the expected sections
+# (Gemini structured output); responses are validated and repaired either way
+LLM_STRUCTURED_OUTPUT = os.environ.get("AIRG_LLM_STRUCTURED_OUTPUT", "1") != "0"
+
+# Sections that are never sent to the model in the compact and sections modes
+PROTECTED_SECTIONS = {
+    "resume": ["personal_info", "education", "other"],
+    "cover_letter": ["personal_info"],
+}
+
+# Exponential backoff settings for throttled or failed requests
+LLM_BACKOFF_BASE_SECONDS = 2.0
+LLM_BACKOFF_MAX_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Callback receiving a section name and its content as soon as it is generated
+SectionCallback = Callable[[str, List[str]], None]
+
+
+class QuotaExceededError(RuntimeError):
+    """
+    Raised when the daily LLM request quota has been used up
+    """
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the number of requests per minute
+    """
+
+    def __init__(self, requests_per_minute: float, capacity: float = 1.0):
+        """
+        Args:
+            requests_per_minute: Refill rate of the bucket (0 for no limit)
+            capacity: Maximum number of requests that can be sent in a burst
+        """
+        self.requests_per_minute = requests_per_minute
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Reserve a token for one request
+
+        Returns:
+            Number of seconds to wait before sending the request
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+
+        rate = self.requests_per_minute / 60.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * rate)
+            self._updated_at = now
+
+            # Tokens may go negative: later callers queue up behind earlier reservations
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / rate)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket persisted in SQLite, so that every process using the same
+    database shares one requests-per-minute limit
+    """
+
+    def __init__(self, path: str, requests_per_minute: float, capacity: float = 1.0):
+        """
+        Args:
+            path: Path to the SQLite database file
+            requests_per_minute: Refill rate of the bucket (0 for no limit)
+            capacity: Maximum number of requests that can be sent in a burst
+        """
+        super().__init__(requests_per_minute, capacity)
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def reserve(self) -> float:
+        """
+        Reserve a token for one request
+
+        Returns:
+            Number of seconds to wait before sending the request
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+
+        rate = self.requests_per_minute / 60.0
+        conn = self._connect()
+        try:
+            # Lock the database for writing so concurrent processes queue up in turn;
+            # wall-clock time is used as it is shared by the processes
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limit WHERE name = 'llm'").fetchone()
+            tokens = self.capacity if row is None else min(self.capacity, row[0] + max(0.0, now - row[1]) * rate)
+            tokens -= 1.0
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit (name, tokens, updated_at) VALUES ('llm', ?, ?)",
+                (tokens, now),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return max(0.0, -tokens / rate)
+
+
+class DailyQuotaLedger:
+    """
+    Daily request counter persisted in SQLite, so the quota survives restarts
+    and is shared by every process using the same output directory
+    """
+
+    def __init__(self, path: str, daily_quota: int):
+        """
+        Args:
+            path: Path to the SQLite database file
+            daily_quota: Maximum number of requests per (UTC) day (0 for no limit)
+        """
+        self.path = path
+        self.daily_quota = daily_quota
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS usage (day TEXT PRIMARY KEY, requests INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _today() -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime())
+
+    def used_today(self) -> int:
+        """
+        Get the number of requests recorded today
+
+        Returns:
+            Number of requests
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT requests FROM usage WHERE day = ?", (self._today(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining_today(self) -> Optional[int]:
+        """
+        Get the number of requests still available today
+
+        Returns:
+            Number of requests, or None if there is no daily quota
+        """
+        if self.daily_quota <= 0:
+            return None
+        return max(0, self.daily_quota - self.used_today())
+
+    def reserve(self) -> None:
+        """
+        Record one request against today's quota
+
+        Raises:
+            QuotaExceededError: If today's quota has been used up
+        """
+        day = self._today()
+        conn = self._connect()
+        try:
+            # Lock the database for writing so concurrent processes can't overspend
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT requests FROM usage WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            if self.daily_quota > 0 and used >= self.daily_quota:
+                conn.execute("ROLLBACK")
+                raise QuotaExceededError(
+                    f"Daily LLM quota of {self.daily_quota} requests used up for {day} (UTC)"
+                )
+            conn.execute(
+                "INSERT INTO usage (day, requests) VALUES (?, 1) "
+                "ON CONFLICT(day) DO UPDATE SET requests = requests + 1",
+                (day,),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Check whether an error is a 429 / resource exhausted response
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        True if the request was throttled
+    """
+    return _error_status_code(error) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Check whether an error is worth retrying (429 or 5xx)
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        True if the request can be retried
+    """
+    if is_throttling_error(error):
+        return True
+    status_code = _error_status_code(error)
+    if status_code is not None:
+        return status_code >= 500
+    return any(marker in str(error) for marker in ["UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED"])
+
+
+def _error_status_code(error: Exception) -> Optional[int]:
+    # google-genai errors expose `code`, HTTP client errors expose `status_code`
+    # directly or on their response
+    for candidate in [
+        getattr(error, "code", None),
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ]:
+        if isinstance(candidate, int):
+            return candidate
+    match = re.match(r"\s*(\d{3})\b", str(error))
+    return int(match.group(1)) if match else None
+
+
+class LLMScheduler:
+    """
+    Scheduler that every LLM request goes through
+
+    It enforces the requests-per-minute limit with a token bucket and the daily
+    quota with a persisted ledger, retries throttled (429) and server (5xx) errors
+    with jittered exponential backoff, and adapts the number of concurrent
+    requests with AIMD: the limit is halved when throttling is observed and grows
+    back by one request per successful round.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        daily_quota: int = LLM_DAILY_QUOTA,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        ledger_path: str = LLM_QUOTA_LEDGER_PATH,
+        shared_rate_limit: bool = LLM_SHARED_RATE_LIMIT,
+    ):
+        """
+        Args:
+            requests_per_minute: Maximum number of requests per minute (0 for no limit)
+            daily_quota: Maximum number of requests per day (0 for no limit)
+            max_concurrency: Maximum number of requests in flight
+            max_retries: Number of retries for throttled or failed requests
+            ledger_path: Path to the SQLite daily quota ledger
+            shared_rate_limit: Whether the RPM limit is shared with the other processes
+                using the ledger
+        """
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.bucket = (
+            SharedTokenBucket(ledger_path, requests_per_minute)
+            if shared_rate_limit
+            else TokenBucket(requests_per_minute)
+        )
+        self.ledger = DailyQuotaLedger(ledger_path, daily_quota)
+
+        self._condition = threading.Condition()
+        self._concurrency_limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._queue_depth = 0
+
+        self._requests = 0
+        self._throttled = 0
+        self._retries = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def call(self, request: Callable[[], T]) -> T:
+        """
+        Run an LLM request under the rate limits, retrying throttled and failed attempts
+
+        Args:
+            request: Function sending the request
+
+        Returns:
+            Result of the request
+
+        Raises:
+            QuotaExceededError: If the daily quota has been used up
+        """
+        # Count the logical request against the daily quota once, however many retries it takes
+        self.ledger.reserve()
+
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                wait_seconds = self.bucket.reserve()
+                if wait_seconds:
+                    time.sleep(wait_seconds)
+                result = request()
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt))
+                attempt += 1
+                continue
+
+            self._release(throttled=False)
+            return result
+
+    async def acall(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async version of call(), waiting on the event loop instead of blocking a thread
+
+        Args:
+            request: Function returning an awaitable that sends the request
+
+        Returns:
+            Result of the request
+
+        Raises:
+            QuotaExceededError: If the daily quota has been used up
+        """
+        # Count the logical request against the daily quota once, however many retries it takes
+        await asyncio.to_thread(self.ledger.reserve)
+
+        attempt = 0
+        while True:
+            await self._aacquire()
+            try:
+                # The shared bucket reserves in SQLite, which may wait on its lock
+                wait_seconds = await asyncio.to_thread(self.bucket.reserve)
+                if wait_seconds:
+                    await asyncio.sleep(wait_seconds)
+                result = await request()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                attempt += 1
+                continue
+
+            self._release(throttled=False)
+            return result
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        # Release the slot of a failed attempt, and either re-raise the error
+        # or return how long to back off before the next attempt
+        self._release(throttled=is_throttling_error(error))
+        if not is_retryable_error(error) or attempt >= self.max_retries:
+            raise error
+        delay = self._backoff_delay(attempt)
+        logger.warning(
+            "LLM request failed (%s), retrying in %.1fs (attempt %d/%d)",
+            error, delay, attempt + 1, self.max_retries,
+        )
+        with self._condition:
+            self._retries += 1
+        annotate(retries=1)
+        return delay
+
+    def _acquire(self) -> None:
+        start_time = time.monotonic()
+        with self._condition:
+            self._queue_depth += 1
+            while self._in_flight >= int(self._concurrency_limit):
+                self._condition.wait()
+            self._queue_depth -= 1
+            self._in_flight += 1
+            self._record_wait(time.monotonic() - start_time)
+
+    async def _aacquire(self) -> None:
+        start_time = time.monotonic()
+        with self._condition:
+            self._queue_depth += 1
+        while True:
+            with self._condition:
+                if self._in_flight < int(self._concurrency_limit):
+                    self._queue_depth -= 1
+                    self._in_flight += 1
+                    self._record_wait(time.monotonic() - start_time)
+                    return
+            # Poll rather than block, as the slot may be released by another thread
+            await asyncio.sleep(0.05)
+
+    def _release(self, throttled: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._requests += 1
+            if throttled:
+                # Multiplicative decrease
+                self._throttled += 1
+                self._concurrency_limit = max(1.0, self._concurrency_limit / 2)
+            else:
+                # Additive increase of about one request per round of successes
+                self._concurrency_limit = min(
+                    float(self.max_concurrency),
+                    self._concurrency_limit + 1.0 / self._concurrency_limit,
+                )
+            self._condition.notify_all()
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        self._total_wait_seconds += wait_seconds
+        self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        # Exponential backoff with jitter, so retries from concurrent runs spread out
+        delay = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current state of the scheduler, e.g. to plan batch jobs
+
+        Returns:
+            Dictionary with queue depth, requests in flight, concurrency limit,
+            request/throttle/retry counters, wait times and remaining daily quota
+        """
+        with self._condition:
+            requests = self._requests
+            stats = {
+                "queue_depth": self._queue_depth,
+                "in_flight": self._in_flight,
+                "concurrency_limit": int(self._concurrency_limit),
+                "requests": requests,
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "average_wait_seconds": self._total_wait_seconds / requests if requests else 0.0,
+                "max_wait_seconds": self._max_wait_seconds,
+            }
+        stats["quota_used_today"] = self.ledger.used_today()
+        stats["quota_remaining_today"] = self.ledger.remaining_today()
+        return stats
+
+    def estimate_seconds(self, request_count: int) -> float:
+        """
+        Estimate the minimum time needed to send a number of requests under the RPM limit
+
+        Args:
+            request_count: Number of requests to send
+
+        Returns:
+            Estimated number of seconds
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+        return max(0, request_count - 1) * 60.0 / self.requests_per_minute
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Get the process-wide LLM request scheduler
+
+    Returns:
+        LLMScheduler instance configured from the AIRG_LLM_* environment variables
+    """
+    global _llm_scheduler
+    with _llm_scheduler_lock:
+        if _llm_scheduler is None:
+            _llm_scheduler = LLMScheduler()
+        return _llm_scheduler
+
+
+class StructuredOutputStats:
+    """
+    Thread-safe counters of the quality of the model's JSON responses: how many
+    had to be repaired, missed expected sections or could not be parsed at all,
+    and how many targeted follow-up requests recovered the missing sections
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = 0
+        self._repaired = 0
+        self._incomplete = 0
+        self._unparseable = 0
+        self._followups = 0
+        self._followup_sections = 0
+        self._recovered_sections = 0
+
+    def record_response(self, repaired: bool, parsed: bool, missing: int) -> None:
+        """
+        Count a response of the model
+
+        Args:
+            repaired: Whether the JSON had to be repaired
+            parsed: Whether any section could be recovered
+            missing: Number of expected sections missing from the response
+        """
+        with self._lock:
+            self._responses += 1
+            self._repaired += int(repaired and parsed)
+            self._unparseable += int(not parsed)
+            self._incomplete += int(parsed and missing > 0)
+
+    def record_followup(self, requested: int, recovered: int) -> None:
+        """
+        Count a follow-up request for missing sections
+
+        Args:
+            requested: Number of sections requested
+            recovered: Number of sections the follow-up returned
+        """
+        with self._lock:
+            self._followups += 1
+            self._followup_sections += requested
+            self._recovered_sections += recovered
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters and the repair and follow-up rates
+
+        Returns:
+            Dictionary with the response, repair and follow-up counters and rates
+        """
+        with self._lock:
+            responses = self._responses
+            return {
+                "responses": responses,
+                "repaired": self._repaired,
+                "incomplete": self._incomplete,
+                "unparseable": self._unparseable,
+                "followups": self._followups,
+                "followup_sections": self._followup_sections,
+                "recovered_sections": self._recovered_sections,
+                "repair_rate": round(self._repaired / responses, 4) if responses else 0.0,
+                "followup_rate": round(self._followups / responses, 4) if responses else 0.0,
+            }
+
+
+_output_stats = StructuredOutputStats()
+
+
+def get_output_stats() -> StructuredOutputStats:
+    """
+    Get the process-wide counters of the model's JSON responses
+
+    Returns:
+        StructuredOutputStats instance
+    """
+    return _output_stats
+
+
+_llm = None
+_llm_chain = None
+# Identity of the model installed with set_llm() (None for the Gemini client)
+_llm_identity: Optional[str] = None
+_llm_lock = threading.Lock()
 
 
 def get_gemini_llm():
     """
-    Get a LangChain ChatGoogleGenerativeAI instance
+    Get the process-wide LangChain chat model, creating the ChatGoogleGenerativeAI
+    client on first use so that its HTTP connections are reused across requests
+
+    Returns:
+        ChatGoogleGenerativeAI instance (or the model installed with set_llm())
+    """
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = create_gemini_llm()
+        return _llm
+
+
+def create_gemini_llm():
+    """
+    Create a LangChain ChatGoogleGenerativeAI instance
 
     Returns:
         ChatGoogleGenerativeAI instance
     """
     # Get the API key from environment variables
-    import os
     api_key = os.environ.get("GEMINI_API_KEY")
     
     if not api_key:
         raise ValueError("GEMINI_API_KEY environment variable is not set")
     
+    # Import the Gemini client (and the google-genai SDK) only when a client is created
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     # Create a LangChain ChatGoogleGenerativeAI instance
     llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-pro-exp-02-05",  # Using the full model name
-        temperature=0.2,
+        model=GEMINI_MODEL,  # Using the full model name
+        temperature=GEMINI_TEMPERATURE,
         # Removed deprecated parameter: convert_system_message_to_human
         google_api_key=api_key,  # Explicitly pass the API key
+        max_retries=0,  # Retries are handled by the LLMScheduler
     )
 
     return llm
 
 
-def generate_resume_content(
-    resume_template_content: Dict[str, Any],
-    job_title: str,
-    company_name: str,
-    job_description: str,
-    company_overview: str,
-    relevant_experience: str = "",
+def set_llm(llm) -> None:
+    """
+    Replace the process-wide chat model (e.g. with a fake model in benchmarks)
+
+    Args:
+        llm: LangChain chat model, or None to create the Gemini client again on next use
+    """
+    global _llm, _llm_chain, _llm_identity
+    with _llm_lock:
+        _llm = llm
+        _llm_chain = None
+        _llm_identity = None if llm is None else (
+            f"{type(llm).__name__}:{getattr(llm, 'model', None) or getattr(llm, 'model_name', None)}"
+        )
+
+
+def generation_settings() -> List[Any]:
+    """
+    Settings besides the prompts and the job that determine the generated content,
+    read when they are used so that outputs generated with other settings (e.g.
+    before set_llm()) are not reused
+
+    Returns:
+        List of the active model, the prompt token budget, whether structured
+        output is requested and the default number of ranked lines
+    """
+    with _llm_lock:
+        model = _llm_identity or GEMINI_MODEL
+    return [model, GEMINI_TEMPERATURE, PROMPT_TOKEN_BUDGET, LLM_STRUCTURED_OUTPUT, RANKING_TOP_K]
+
+
+def get_llm_chain(section_names: Optional[List[str]] = None):
+    """
+    Get the process-wide chain sending rendered prompt messages to the chat model
+    and returning the response text
+
+    Args:
+        section_names: Sections expected in the response; when given (and
+            LLM_STRUCTURED_OUTPUT is enabled), the model is asked for JSON matching
+            the schema of these sections
+
+    Returns:
+        Runnable composed of the chat model and a string output parser
+    """
+    global _llm_chain
+    llm = get_gemini_llm()
+    if section_names and LLM_STRUCTURED_OUTPUT:
+        # Binding the generation settings is cheap, so structured chains are not kept
+        return llm.bind(
+            response_mime_type="application/json",
+            response_schema=sections_json_schema(section_names),
+        ) | StrOutputParser()
+    with _llm_lock:
+        if _llm_chain is None:
+            _llm_chain = llm | StrOutputParser()
+        return _llm_chain
+
+
+def parse_json_response(response: str) -> Dict[str, List[str]]:
+    """
+    Parse the JSON object returned by the LLM, repairing it when needed
+
+    Args:
+        response: Raw text returned by the LLM
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    content, _ = parse_sections(response)
+    if not content:
+        raise ValueError(f"Failed to parse LLM response as JSON: {response}")
+    return content
+
+
+def check_response(response: str, expected_sections: Optional[List[str]] = None) -> Tuple[Dict[str, List[str]], bool]:
+    """
+    Parse and validate a response of the model, and count its repairs
+
+    Args:
+        response: Raw text returned by the LLM
+        expected_sections: Names of the sections the response should contain
+
+    Returns:
+        Tuple containing the recovered sections (possibly empty) and whether the
+        response is complete, i.e. worth caching
+    """
+    content, repaired = parse_sections(response)
+    missing = [name for name in expected_sections or [] if name not in content]
+    _output_stats.record_response(repaired, bool(content), len(missing))
+
+    if not content:
+        logger.warning("Could not recover any section from the LLM response: %.200r", response)
+    elif repaired:
+        logger.warning("Repaired malformed JSON in the LLM response")
+    if content and missing:
+        logger.warning("LLM response is missing sections: %s", ", ".join(missing))
+
+    return content, bool(content) and not missing
+
+
+class SectionStream:
+    """
+    Forwards the sections of a streamed LLM response to a callback as soon as each
+    one is complete, and measures the time to the first section
+    """
+
+    def __init__(self, on_section: SectionCallback):
+        """
+        Args:
+            on_section: Callback receiving each section name and content
+        """
+        self.on_section = on_section
+        self.start_time = time.perf_counter()
+        self.first_section_seconds: Optional[float] = None
+        self._emitted = set()
+
+    def emit(self, sections: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Forward completed sections, skipping those already forwarded (e.g. by a failed attempt)
+
+        Args:
+            sections: Completed (section name, content) pairs
+        """
+        for name, value in sections:
+            if name in self._emitted:
+                continue
+            self._emitted.add(name)
+            if self.first_section_seconds is None:
+                self.first_section_seconds = time.perf_counter() - self.start_time
+            self.on_section(name, value)
+
+    def consume(self, chunks: Iterator[str]) -> str:
+        """
+        Consume a stream of text chunks, forwarding sections as they complete
+
+        Args:
+            chunks: Text chunks streamed by the model
+
+        Returns:
+            Full response text
+        """
+        parser = IncrementalSectionParser()
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            self.emit(parser.feed(chunk))
+        return "".join(parts)
+
+    async def aconsume(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Async version of consume()
+
+        Args:
+            chunks: Text chunks streamed by the model
+
+        Returns:
+            Full response text
+        """
+        parser = IncrementalSectionParser()
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            self.emit(parser.feed(chunk))
+        return "".join(parts)
+
+    def log_timings(self) -> None:
+        """
+        Log the time to the first section and the total time of the stream
+        """
+        first_section = self.first_section_seconds
+        logger.info(
+            "LLM stream: first section after %s, complete after %.2fs",
+            f"{first_section:.2f}s" if first_section is not None else "n/a",
+            time.perf_counter() - self.start_time,
+        )
+
+
+@traced("llm")
+def generate_json_content(
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    expected_sections: Optional[List[str]] = None,
 ) -> Dict[str, List[str]]:
     """
-    Generate updated content for a resume based on the existing content and job details
-    
+    Render a prompt, send it to Gemini and parse the JSON response
+
+    Responses are cached on disk, keyed by the model name, the temperature and the
+    rendered prompt messages, so a byte-identical prompt never calls the model twice.
+
     Args:
-        resume_template_content: Dictionary containing the resume document content and sections
-        job_title: Job title
-        company_name: Company name
-        job_description: Job description
-        company_overview: Company overview
-        relevant_experience: Additional relevant experience
-        
+        prompt: Prompt template to render
+        variables: Values for the prompt template variables
+        use_cache: Whether to read from and write to the LLM response cache
+        on_section: Optional callback; when given, the response is streamed and each
+            section is passed to it as soon as the model has completed it
+        expected_sections: Names of the sections the response should contain (used
+            for structured output and to detect incomplete responses)
+
+    Returns:
+        Dictionary mapping section names to their updated content; malformed JSON
+        is repaired, and sections that could not be recovered are left out
+    """
+    # Render the prompt messages within the token budget and derive the cache key from them
+    messages, prompt_tokens = render_prompt(prompt, variables)
+    cache_key = _response_cache_key(messages)
+    section_stream = SectionStream(on_section) if on_section is not None else None
+
+    cache = get_llm_cache() if use_cache else None
+    if cache is not None:
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            content, _ = parse_sections(cached_response)
+            log_token_counts(prompt_tokens, cached_response, cached=True)
+            if section_stream is not None:
+                section_stream.emit(content.items())
+            return content
+
+    # Generate the content with the shared LLM chain
+    start_time = time.perf_counter()
+    chain = get_llm_chain(expected_sections)
+    if section_stream is None:
+        response = get_llm_scheduler().call(lambda: chain.invoke(messages))
+    else:
+        response = get_llm_scheduler().call(lambda: section_stream.consume(chain.stream(messages)))
+        section_stream.log_timings()
+    log_token_counts(prompt_tokens, response, seconds=time.perf_counter() - start_time)
+
+    # Validate before caching so that incomplete or unrepairable responses are never cached
+    content, complete = check_response(response, expected_sections)
+    if section_stream is not None:
+        # Forward anything the incremental parser could not see (e.g. fenced prose)
+        section_stream.emit(content.items())
+    if cache is not None and complete:
+        cache.set(cache_key, response)
+
+    return content
+
+
+@traced("llm")
+async def agenerate_json_content(
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    expected_sections: Optional[List[str]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of generate_json_content(), using ainvoke/astream so that many
+    requests can be in flight on a single event loop
+
+    Args:
+        prompt: Prompt template to render
+        variables: Values for the prompt template variables
+        use_cache: Whether to read from and write to the LLM response cache
+        on_section: Optional callback; when given, the response is streamed and each
+            section is passed to it as soon as the model has completed it
+        expected_sections: Names of the sections the response should contain (used
+            for structured output and to detect incomplete responses)
+
+    Returns:
+        Dictionary mapping section names to their updated content; malformed JSON
+        is repaired, and sections that could not be recovered are left out
+    """
+    # Render the prompt messages within the token budget and derive the cache key from them
+    messages, prompt_tokens = render_prompt(prompt, variables)
+    cache_key = _response_cache_key(messages)
+    section_stream = SectionStream(on_section) if on_section is not None else None
+
+    cache = get_llm_cache() if use_cache else None
+    if cache is not None:
+        cached_response = await asyncio.to_thread(cache.get, cache_key)
+        if cached_response is not None:
+            content, _ = parse_sections(cached_response)
+            log_token_counts(prompt_tokens, cached_response, cached=True)
+            if section_stream is not None:
+                section_stream.emit(content.items())
+            return content
+
+    # Generate the content with the shared LLM chain
+    start_time = time.perf_counter()
+    chain = get_llm_chain(expected_sections)
+    if section_stream is None:
+        response = await get_llm_scheduler().acall(lambda: chain.ainvoke(messages))
+    else:
+        response = await get_llm_scheduler().acall(lambda: section_stream.aconsume(chain.astream(messages)))
+        section_stream.log_timings()
+    log_token_counts(prompt_tokens, response, seconds=time.perf_counter() - start_time)
+
+    # Validate before caching so that incomplete or unrepairable responses are never cached
+    content, complete = check_response(response, expected_sections)
+    if section_stream is not None:
+        # Forward anything the incremental parser could not see (e.g. fenced prose)
+        section_stream.emit(content.items())
+    if cache is not None and complete:
+        await asyncio.to_thread(cache.set, cache_key, response)
+
+    return content
+
+
+def log_token_counts(prompt_tokens: int, response: str, seconds: float = 0.0, cached: bool = False) -> None:
+    """
+    Log the estimated prompt and response tokens of an LLM call with its duration
+
+    Args:
+        prompt_tokens: Estimated number of prompt tokens
+        response: Text of the response
+        seconds: Duration of the call, including the time spent waiting for the scheduler
+        cached: Whether the response came from the LLM response cache
+    """
+    annotate(prompt_tokens=prompt_tokens, response_tokens=count_tokens(response), cache_hits=int(cached))
+    if cached:
+        logger.info("LLM cache hit: %d prompt tokens, %d response tokens", prompt_tokens, count_tokens(response))
+    else:
+        logger.info(
+            "LLM call: %d prompt tokens, %d response tokens in %.2fs",
+            prompt_tokens, count_tokens(response), seconds,
+        )
+
+
+def split_sections(sections: Dict[str, List[str]], protected: List[str]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Split document sections into those sent to the model and those kept as they are
+
+    Args:
+        sections: Dictionary mapping section names to their original content
+        protected: Names of the sections the model must not change
+
+    Returns:
+        Tuple containing the non-empty editable sections and the other sections
+    """
+    editable = {}
+    kept = {}
+    for name, lines in sections.items():
+        if name in protected or not lines:
+            kept[name] = lines
+        else:
+            editable[name] = lines
+    return editable, kept
+
+
+def max_requests_per_job(mode: Optional[str] = None) -> int:
+    """
+    Upper bound of the LLM requests needed for one resume and cover letter
+
+    Args:
+        mode: Generation mode (GENERATION_MODE by default)
+
+    Returns:
+        Maximum number of requests
+    """
+    # One request per document, unless each editable section has its own
+    if (mode or GENERATION_MODE) != "sections":
+        return len(PROTECTED_SECTIONS)
+    return sum(
+        len([name for name in SECTION_NAMES if name not in protected]) for protected in PROTECTED_SECTIONS.values()
+    )
+
+
+def _section_groups(editable: Dict[str, List[str]], mode: str) -> List[Dict[str, List[str]]]:
+    # One prompt for all editable sections, or one prompt per section
+    if not editable:
+        return []
+    if mode == "compact":
+        return [editable]
+    if mode == "sections":
+        return [{name: lines} for name, lines in editable.items()]
+    raise ValueError(f"Unknown generation mode: {mode} (expected one of {', '.join(GENERATION_MODES)})")
+
+
+def _ranking_query(variables: Dict[str, Any]) -> str:
+    # Lines are ranked against what describes the job and the candidate's focus
+    return " ".join(str(variables.get(name) or "") for name in ["job_title", "job_description", "relevant_experience"])
+
+
+def _merge_sections(
+    sections: Dict[str, List[str]],
+    editable: Dict[str, List[str]],
+    results: List[Dict[str, List[str]]],
+    selections: Dict[str, List[int]],
+) -> Dict[str, List[str]]:
+    # Keep the document's section order; editable sections the model left out keep
+    # their original content, and sections it was not asked for are ignored
+    generated = {}
+    for result in results:
+        generated.update(result)
+
+    merged = {}
+    for name, lines in sections.items():
+        if name in editable and name in generated:
+            merged[name] = _merge_section(name, lines, generated[name], selections)
+        else:
+            merged[name] = lines
+    return merged
+
+
+def _merge_section(name: str, lines: List[str], updated: Any, selections: Dict[str, List[int]]) -> Any:
+    # Put the lines of a pruned section back among the lines that were not sent
+    if name in selections and isinstance(updated, list):
+        return merge_selected_lines(lines, selections[name], updated)
+    return updated
+
+
+def _missing_sections(content: Dict[str, List[str]], sections: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    # Non-empty sections that a response left out
+    return {name: lines for name, lines in sections.items() if lines and name not in content}
+
+
+def _followup_callback(on_section: Optional[SectionCallback], names: Iterable[str]) -> Optional[SectionCallback]:
+    # Forward only the requested sections of a follow-up response
+    if on_section is None:
+        return None
+    names = set(names)
+    return lambda name, updated: on_section(name, updated) if name in names else None
+
+
+# Sections of the running generation that kept their original content because
+# the model didn't return them (see track_incomplete_sections())
+_incomplete_sections: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "airg_incomplete_sections", default=None
+)
+
+
+@contextmanager
+def track_incomplete_sections() -> Iterator[List[str]]:
+    """
+    Collect the sections that the generation calls made in the block could not
+    get from the model, including those of concurrent section requests
+
+    Returns:
+        List receiving the names of the sections that kept their original content
+    """
+    names: List[str] = []
+    token = _incomplete_sections.set(names)
+    try:
+        yield names
+    finally:
+        _incomplete_sections.reset(token)
+
+
+def _merge_followup(
+    content: Dict[str, List[str]],
+    missing: Dict[str, List[str]],
+    followup: Dict[str, List[str]],
+) -> Dict[str, List[str]]:
+    # Add the recovered sections; the others keep their original content when the
+    # document is updated
+    recovered = {name: followup[name] for name in missing if name in followup}
+    _output_stats.record_followup(len(missing), len(recovered))
+    if len(recovered) < len(missing):
+        unrecovered = [name for name in missing if name not in recovered]
+        logger.warning(
+            "Sections missing after a follow-up request keep their original content: %s", ", ".join(unrecovered)
+        )
+        incomplete = _incomplete_sections.get()
+        if incomplete is not None:
+            incomplete.extend(unrecovered)
+    return {**content, **recovered}
+
+
+def complete_sections(
+    content: Dict[str, List[str]],
+    sections: Dict[str, List[str]],
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+) -> Dict[str, List[str]]:
+    """
+    Request the sections that a response left out (or that could not be recovered
+    from it) in one targeted follow-up, instead of regenerating the whole document
+
+    Args:
+        content: Sections recovered from the response
+        sections: Sections that were sent to the model, with their original content
+        prompt: Prompt template with a {sections} variable for the sections to tailor
+        variables: Values for the other prompt template variables
+        use_cache: Whether to read from and write to the LLM response cache
+        on_section: Optional callback receiving each recovered section
+
     Returns:
         Dictionary mapping section names to their updated content
     """
-    # Get the sections from the template
-    sections = resume_template_content["sections"]
-    
-    # Create a system prompt
-    system_prompt = """
+    missing = _missing_sections(content, sections)
+    if not missing:
+        return content
+
+    followup = generate_json_content(
+        prompt, {**variables, "sections": compact_sections(missing)}, use_cache=use_cache,
+        on_section=_followup_callback(on_section, missing), expected_sections=list(missing),
+    )
+    return _merge_followup(content, missing, followup)
+
+
+async def acomplete_sections(
+    content: Dict[str, List[str]],
+    sections: Dict[str, List[str]],
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of complete_sections()
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    missing = _missing_sections(content, sections)
+    if not missing:
+        return content
+
+    followup = await agenerate_json_content(
+        prompt, {**variables, "sections": compact_sections(missing)}, use_cache=use_cache,
+        on_section=_followup_callback(on_section, missing), expected_sections=list(missing),
+    )
+    return _merge_followup(content, missing, followup)
+
+
+def _keep_protected_sections(
+    content: Dict[str, List[str]],
+    kept: Dict[str, List[str]],
+    on_section: Optional[SectionCallback],
+) -> Dict[str, List[str]]:
+    # Protected sections the model left out keep their original content
+    content = dict(content)
+    for name, lines in _missing_sections(content, kept).items():
+        content[name] = lines
+        if on_section is not None:
+            on_section(name, lines)
+    return content
+
+
+def generate_document_content(
+    prompt: ChatPromptTemplate,
+    followup_prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Generate every section of a document in one prompt; editable sections missing
+    from the response are requested with a follow-up, and protected ones keep
+    their original content
+
+    Lines of the ranked sections (experience, skills) are ranked against the job,
+    and only the top_k most relevant ones are sent to the model; the others are
+    kept unchanged.
+
+    Args:
+        prompt: Prompt template asking for every section of the document
+        followup_prompt: Prompt template with a {sections} variable for the sections to tailor
+        variables: Values for the prompt template variables
+        sections: Dictionary mapping section names to their original content
+        protected: Names of the sections the model must not change
+        use_cache: Whether to read from and write to the LLM response cache
+        on_section: Optional callback receiving each section as soon as it is ready
+        top_k: Number of lines of each ranked section sent to the model
+            (RANKING_TOP_K by default, 0 to send every line)
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    variables, pruned, kept, selections, on_generated_section = _prepare_document(
+        sections, protected, variables, top_k, on_section
+    )
+    content = generate_json_content(
+        prompt, variables, use_cache=use_cache, on_section=on_generated_section,
+        expected_sections=[name for name, lines in {**sections, **pruned}.items() if lines],
+    )
+    content = complete_sections(content, pruned, followup_prompt, variables, use_cache, on_generated_section)
+    return _keep_protected_sections(_merge_document(content, sections, selections), kept, on_section)
+
+
+async def agenerate_document_content(
+    prompt: ChatPromptTemplate,
+    followup_prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of generate_document_content()
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    variables, pruned, kept, selections, on_generated_section = _prepare_document(
+        sections, protected, variables, top_k, on_section
+    )
+    content = await agenerate_json_content(
+        prompt, variables, use_cache=use_cache, on_section=on_generated_section,
+        expected_sections=[name for name, lines in {**sections, **pruned}.items() if lines],
+    )
+    content = await acomplete_sections(content, pruned, followup_prompt, variables, use_cache, on_generated_section)
+    return _keep_protected_sections(_merge_document(content, sections, selections), kept, on_section)
+
+
+def _prepare_document(
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    variables: Dict[str, Any],
+    top_k: Optional[int],
+    on_section: Optional[SectionCallback],
+) -> Tuple[Dict[str, Any], Dict[str, List[str]], Dict[str, List[str]], Dict[str, List[int]], Optional[SectionCallback]]:
+    # Prune the ranked editable sections to their most relevant lines, and send
+    # the document with the pruned sections in place of the full ones
+    editable, kept = split_sections(sections, protected)
+    top_k = RANKING_TOP_K if top_k is None else top_k
+    pruned, selections = prune_sections(editable, _ranking_query(variables), top_k)
+    if selections:
+        variables = {**variables, "sections": compact_sections({**sections, **pruned})}
+    return variables, pruned, kept, selections, _merging_callback(sections, selections, on_section)
+
+
+def _merge_document(
+    content: Dict[str, List[str]],
+    sections: Dict[str, List[str]],
+    selections: Dict[str, List[int]],
+) -> Dict[str, List[str]]:
+    # Put the lines that were not sent back into the pruned sections
+    return {name: _merge_section(name, sections.get(name, []), updated, selections) for name, updated in content.items()}
+
+
+def _merging_callback(
+    sections: Dict[str, List[str]],
+    selections: Dict[str, List[int]],
+    on_section: Optional[SectionCallback],
+) -> Optional[SectionCallback]:
+    # Forward each section with the lines that were not sent put back
+    if on_section is None:
+        return None
+
+    def on_generated_section(name: str, updated: Any) -> None:
+        on_section(name, _merge_section(name, sections.get(name, []), updated, selections))
+
+    return on_generated_section
+
+
+def _prepare_sections(
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    mode: str,
+    variables: Dict[str, Any],
+    top_k: Optional[int],
+    on_section: Optional[SectionCallback],
+) -> Tuple[Dict[str, List[str]], Dict[str, List[int]], List[Dict[str, List[str]]], Optional[SectionCallback]]:
+    # Split the sections, prune the ranked ones to their most relevant lines and
+    # group them into prompts
+    editable, kept = split_sections(sections, protected)
+    top_k = RANKING_TOP_K if top_k is None else top_k
+    pruned, selections = prune_sections(editable, _ranking_query(variables), top_k)
+    groups = _section_groups(pruned, mode)
+
+    if on_section is None:
+        return editable, selections, groups, None
+
+    # Protected sections are ready without any request
+    for name, lines in kept.items():
+        if lines:
+            on_section(name, lines)
+
+    return editable, selections, groups, _merging_callback(sections, selections, on_section)
+
+
+def generate_sections_content(
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    mode: str,
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Generate only the editable sections of a document, in one compact prompt or in
+    one concurrent prompt per section; protected sections are passed through
+
+    Lines of the ranked sections (experience, skills) are ranked against the job,
+    and only the top_k most relevant ones are sent to the model; the others are
+    kept unchanged.
+
+    Args:
+        prompt: Prompt template with a {sections} variable for the sections to tailor
+        variables: Values for the other prompt template variables
+        sections: Dictionary mapping section names to their original content
+        protected: Names of the sections the model must not change
+        mode: "compact" or "sections"
+        use_cache: Whether to read from and write to the LLM response cache
+        on_section: Optional callback receiving each section as soon as it is ready
+        top_k: Number of lines of each ranked section sent to the model
+            (RANKING_TOP_K by default, 0 to send every line)
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    editable, selections, groups, on_generated_section = _prepare_sections(
+        sections, protected, mode, variables, top_k, on_section
+    )
+
+    def generate_group(group: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        group_variables = {**variables, "sections": compact_sections(group)}
+        result = generate_json_content(
+            prompt, group_variables, use_cache=use_cache, on_section=on_generated_section,
+            expected_sections=list(group),
+        )
+        return complete_sections(result, group, prompt, variables, use_cache, on_generated_section)
+
+    # Send the prompts concurrently (the scheduler still applies the rate limits),
+    # each in a copy of the caller's context so that graph stream writers keep working
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, generate_group, group) for group in groups]
+            results = [future.result() for future in futures]
+    else:
+        results = [generate_group(group) for group in groups]
+
+    return _merge_sections(sections, editable, results, selections)
+
+
+async def agenerate_sections_content(
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    sections: Dict[str, List[str]],
+    protected: List[str],
+    mode: str,
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of generate_sections_content()
+
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    editable, selections, groups, on_generated_section = _prepare_sections(
+        sections, protected, mode, variables, top_k, on_section
+    )
+
+    async def generate_group(group: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        result = await agenerate_json_content(
+            prompt, {**variables, "sections": compact_sections(group)}, use_cache=use_cache,
+            on_section=on_generated_section, expected_sections=list(group),
+        )
+        return await acomplete_sections(result, group, prompt, variables, use_cache, on_generated_section)
+
+    # Send the prompts concurrently (the scheduler still applies the rate limits)
+    results = await asyncio.gather(*[generate_group(group) for group in groups])
+
+    return _merge_sections(sections, editable, list(results), selections)
+
+
+def prompt_fingerprint(prompt: ChatPromptTemplate) -> str:
+    """
+    Fingerprint of everything besides the variables that determines a prompt's answer
+
+    Args:
+        prompt: Prompt template
+
+    Returns:
+        Hex digest of the model settings and the template text
+    """
+    return make_cache_key(
+        GEMINI_MODEL,
+        GEMINI_TEMPERATURE,
+        [(type(message).__name__, getattr(getattr(message, "prompt", None), "template", str(message))) for message in prompt.messages],
+    )
+
+
+def _response_cache_key(messages: List[Any]) -> str:
+    # The cache key covers everything that determines the model's answer
+    return make_cache_key(
+        GEMINI_MODEL,
+        GEMINI_TEMPERATURE,
+        [(message.type, message.content) for message in messages],
+    )
+
+
+# Prompts used to generate resume content, built once at import time
+RESUME_SYSTEM_PROMPT = """
     You are an expert resume writer. Your task is to customize a resume for a specific job application.
     You will be given the existing content of a resume, organized by sections, along with a job description
     and company information.
     
-    Your goal is to make subtle, targeted improvements to the resume to better match the job requirements.
-    Focus on the following sections:
+    Your goal is to make subtle, targeted improvements to the resume to better match the job requirements.
+    Focus on the following sections:
+    1. Summary/Profile - Update to highlight skills and experiences relevant to this specific job
+    2. Experience - Emphasize achievements and responsibilities that align with the job requirements
+    3. Skills - Prioritize and enhance skills mentioned in the job description
+    
+    IMPORTANT INSTRUCTIONS:
+    1. Analyze the job description, company overview, and any additional relevant experience carefully
+    2. Make subtle and professional modifications to the content
+    3. DO NOT completely rewrite sections - maintain the original structure and most of the content
+    4. DO NOT modify personal information, contact details, or education sections
+    5. If additional relevant experience was provided, incorporate it naturally into the appropriate sections
+    6. Add relevant keywords from the job description naturally within the existing text
+    7. Keep the tone professional and consistent with the original resume
+    
+    Format your response as a JSON object where each key is a section name and each value is an array of strings
+    representing the updated content for that section. Include ALL sections from the original resume.
+    """
+
+RESUME_HUMAN_PROMPT = """
+    Job Title: {job_title}
+    Company: {company_name}
+    
+    Job Description:
+    {job_description}
+    
+    Company Overview:
+    {company_overview}
+    
+    Additional Relevant Experience:
+    {relevant_experience}
+    
+    Original Resume Content by Section:
+    {sections}
+    
+    Please provide updated content for each section that is subtly tailored to this specific job application.
+    Return your response as a JSON object where each key is a section name and each value is an array of strings
+    representing the updated content for that section.
+    """
+
+RESUME_PROMPT = compact_prompt([
+    ("system", RESUME_SYSTEM_PROMPT),
+    ("human", RESUME_HUMAN_PROMPT),
+])
+
+
+# Prompts used to tailor only the editable resume sections (compact and sections
+# modes), built once at import time
+RESUME_SECTIONS_SYSTEM_PROMPT = """
+    You are an expert resume writer. Your task is to customize sections of a resume for a specific job application.
+    You will be given only the sections of the resume that should be tailored, organized by section name, along with
+    a job description and company information. The other sections of the resume are kept as they are.
+    
+    Your goal is to make subtle, targeted improvements to these sections to better match the job requirements:
     1. Summary/Profile - Update to highlight skills and experiences relevant to this specific job
     2. Experience - Emphasize achievements and responsibilities that align with the job requirements
     3. Skills - Prioritize and enhance skills mentioned in the job description
@@ -77,17 +1519,15 @@ def generate_resume_content(
     1. Analyze the job description, company overview, and any additional relevant experience carefully
     2. Make subtle and professional modifications to the content
     3. DO NOT completely rewrite sections - maintain the original structure and most of the content
-    4. DO NOT modify personal information, contact details, or education sections
-    5. If additional relevant experience was provided, incorporate it naturally into the appropriate sections
-    6. Add relevant keywords from the job description naturally within the existing text
-    7. Keep the tone professional and consistent with the original resume
+    4. If additional relevant experience was provided, incorporate it naturally into the appropriate sections
+    5. Add relevant keywords from the job description naturally within the existing text
+    6. Keep the tone professional and consistent with the original resume
     
-    Format your response as a JSON object where each key is a section name and each value is an array of strings
-    representing the updated content for that section. Include ALL sections from the original resume.
+    Format your response as a JSON object where each key is one of the section names you were given and each value
+    is an array of strings representing the updated content for that section. Do not add any other section.
     """
-    
-    # Create a human prompt
-    human_prompt = """
+
+RESUME_SECTIONS_HUMAN_PROMPT = """
     Job Title: {job_title}
     Company: {company_name}
     
@@ -100,84 +1540,22 @@ def generate_resume_content(
     Additional Relevant Experience:
     {relevant_experience}
     
-    Original Resume Content by Section:
+    Resume Sections to Tailor:
     {sections}
     
-    Please provide updated content for each section that is subtly tailored to this specific job application.
+    Please provide updated content for each of these sections that is subtly tailored to this specific job application.
     Return your response as a JSON object where each key is a section name and each value is an array of strings
     representing the updated content for that section.
     """
-    
-    # Create a ChatPromptTemplate
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", human_prompt),
-    ])
-    
-    # Get the LLM
-    llm = get_gemini_llm()
-    
-    # Create a chain
-    chain = prompt | llm | StrOutputParser()
-    
-    # Generate the content
-    response = chain.invoke({
-        "job_title": job_title,
-        "company_name": company_name,
-        "job_description": job_description,
-        "company_overview": company_overview,
-        "relevant_experience": relevant_experience,
-        "sections": json.dumps(sections, indent=2),
-    })
-    
-    # Parse the response as JSON
-    try:
-        content = json.loads(response)
-    except json.JSONDecodeError:
-        # If the response is not valid JSON, extract it from the text
-        json_match = re.search(r'```json\n(.*?)\n```', response, re.DOTALL)
-        if json_match:
-            try:
-                content = json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                raise ValueError(f"Failed to parse LLM response as JSON: {response}")
-        else:
-            raise ValueError(f"Failed to parse LLM response as JSON: {response}")
-    
-    return content
 
+RESUME_SECTIONS_PROMPT = compact_prompt([
+    ("system", RESUME_SECTIONS_SYSTEM_PROMPT),
+    ("human", RESUME_SECTIONS_HUMAN_PROMPT),
+])
 
-def generate_cover_letter_content(
-    cover_letter_template_content: Dict[str, Any],
-    job_title: str,
-    company_name: str,
-    job_description: str,
-    company_overview: str,
-    hirer_name: str = "",
-    hirer_gender: str = "unknown",
-    relevant_experience: str = "",
-) -> Dict[str, List[str]]:
-    """
-    Generate updated content for a cover letter based on the existing content and job details
-    
-    Args:
-        cover_letter_template_content: Dictionary containing the cover letter document content and sections
-        job_title: Job title
-        company_name: Company name
-        job_description: Job description
-        company_overview: Company overview
-        hirer_name: Name of the hiring manager
-        hirer_gender: Gender of the hiring manager (male, female, or unknown)
-        relevant_experience: Additional relevant experience
-        
-    Returns:
-        Dictionary mapping section names to their updated content
-    """
-    # Get the sections from the template
-    sections = cover_letter_template_content["sections"]
-    
-    # Create a system prompt
-    system_prompt = """
+
+# Prompts used to generate cover letter content, built once at import time
+COVER_LETTER_SYSTEM_PROMPT = """
     You are an expert cover letter writer. Your task is to customize a cover letter for a specific job application.
     You will be given the existing content of a cover letter, organized by sections, along with a job description
     and company information.
@@ -205,9 +1583,8 @@ def generate_cover_letter_content(
     Format your response as a JSON object where each key is a section name and each value is an array of strings
     representing the updated content for that section. Include ALL sections from the original cover letter.
     """
-    
-    # Create a human prompt
-    human_prompt = """
+
+COVER_LETTER_HUMAN_PROMPT = """
     Job Title: {job_title}
     Company: {company_name}
     Hiring Manager: {hirer_name}
@@ -232,43 +1609,336 @@ def generate_cover_letter_content(
     Return your response as a JSON object where each key is a section name and each value is an array of strings
     representing the updated content for that section.
     """
+
+COVER_LETTER_PROMPT = compact_prompt([
+    ("system", COVER_LETTER_SYSTEM_PROMPT),
+    ("human", COVER_LETTER_HUMAN_PROMPT),
+])
+
+
+# Prompts used to tailor only the editable cover letter sections (compact and
+# sections modes), built once at import time
+COVER_LETTER_SECTIONS_SYSTEM_PROMPT = """
+    You are an expert cover letter writer. Your task is to customize sections of a cover letter for a specific job application.
+    You will be given only the sections of the cover letter that should be tailored, organized by section name, along
+    with a job description and company information. Personal information and contact details are kept as they are.
+    
+    Your goal is to make targeted improvements to these sections to better match the job requirements and company culture.
+    
+    IMPORTANT INSTRUCTIONS:
+    1. Analyze the company overview and job description to determine if the company is:
+       a) The actual employer (direct hiring)
+       b) A recruitment agency/headhunter
+    2. If it's a recruitment agency:
+       - Address the letter to the recruiter
+       - Mention your interest in their CLIENT company (from job description)
+       - Don't focus on joining the recruitment agency itself
+    3. If it's direct hiring:
+       - Address the letter to the hiring manager
+       - Focus on joining their company
+    4. Make professional modifications to the content to highlight relevant skills and experiences
+    5. DO NOT completely rewrite sections - maintain the original structure and tone
+    6. If additional relevant experience was provided, incorporate it naturally into the appropriate sections
+    7. Add relevant keywords from the job description naturally within the existing text
+    8. Keep the tone professional, enthusiastic, and tailored to the specific job and company
+    
+    Format your response as a JSON object where each key is one of the section names you were given and each value
+    is an array of strings representing the updated content for that section. Do not add any other section.
+    """
+
+COVER_LETTER_SECTIONS_HUMAN_PROMPT = """
+    Job Title: {job_title}
+    Company: {company_name}
+    Hiring Manager: {hirer_name}
+    Hiring Manager Gender: {hirer_gender}
+    
+    Job Description:
+    {job_description}
+    
+    Company Overview:
+    {company_overview}
+    
+    Additional Relevant Experience:
+    {relevant_experience}
+    
+    Cover Letter Sections to Tailor:
+    {sections}
+    
+    Please provide updated content for each of these sections that is tailored to this specific job application.
+    If the hiring manager's name is provided, address the cover letter to them appropriately based on their gender.
+    If no hiring manager is specified, use an appropriate general greeting.
+    
+    Return your response as a JSON object where each key is a section name and each value is an array of strings
+    representing the updated content for that section.
+    """
+
+COVER_LETTER_SECTIONS_PROMPT = compact_prompt([
+    ("system", COVER_LETTER_SECTIONS_SYSTEM_PROMPT),
+    ("human", COVER_LETTER_SECTIONS_HUMAN_PROMPT),
+])
+
+
+def build_resume_prompt(
+    resume_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    relevant_experience: str = "",
+    mode: str = "document",
+) -> Tuple[ChatPromptTemplate, Dict[str, Any]]:
+    """
+    Build the prompt used to generate updated resume content
     
-    # Create a ChatPromptTemplate
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", human_prompt),
-    ])
+    Args:
+        resume_template_content: Dictionary containing the resume document content and sections
+        job_title: Job title
+        company_name: Company name
+        job_description: Job description
+        company_overview: Company overview
+        relevant_experience: Additional relevant experience
+        mode: Generation mode; in the compact and sections modes, the sections
+            variable is replaced by the sections sent in each prompt
+        
+    Returns:
+        Tuple containing the prompt template and its variables
+    """
+    # Get the sections from the template
+    sections = resume_template_content["sections"]
     
-    # Get the LLM
-    llm = get_gemini_llm()
+    # Collect the prompt variables
+    variables = {
+        "job_title": job_title,
+        "company_name": company_name,
+        "job_description": compact_text(job_description),
+        "company_overview": compact_text(company_overview),
+        "relevant_experience": compact_text(relevant_experience),
+        "sections": compact_sections(sections),
+    }
+    
+    return (RESUME_PROMPT if mode == "document" else RESUME_SECTIONS_PROMPT), variables
+
+
+def generate_resume_content(
+    resume_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    relevant_experience: str = "",
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    mode: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Generate updated content for a resume based on the existing content and job details
+    
+    Args:
+        resume_template_content: Dictionary containing the resume document content and sections
+        job_title: Job title
+        company_name: Company name
+        job_description: Job description
+        company_overview: Company overview
+        relevant_experience: Additional relevant experience
+        use_cache: Whether to reuse a cached response for an identical prompt
+        on_section: Optional callback receiving each section as soon as it is generated
+        mode: Generation mode (one of GENERATION_MODES, GENERATION_MODE by default)
+        top_k: Number of experience/skills lines sent to the model (RANKING_TOP_K
+            by default, 0 to send every line)
+        
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    mode = mode or GENERATION_MODE
+    prompt, variables = build_resume_prompt(
+        resume_template_content, job_title, company_name, job_description, company_overview, relevant_experience, mode
+    )
+    
+    if mode == "document":
+        return generate_document_content(
+            prompt, RESUME_SECTIONS_PROMPT, variables, resume_template_content["sections"], PROTECTED_SECTIONS["resume"],
+            use_cache=use_cache, on_section=on_section, top_k=top_k,
+        )
+    
+    # Only the editable sections are sent to the model
+    return generate_sections_content(
+        prompt, variables, resume_template_content["sections"], PROTECTED_SECTIONS["resume"], mode,
+        use_cache=use_cache, on_section=on_section, top_k=top_k,
+    )
+
+
+async def agenerate_resume_content(
+    resume_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    relevant_experience: str = "",
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    mode: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of generate_resume_content()
+    
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    mode = mode or GENERATION_MODE
+    prompt, variables = build_resume_prompt(
+        resume_template_content, job_title, company_name, job_description, company_overview, relevant_experience, mode
+    )
+    
+    if mode == "document":
+        return await agenerate_document_content(
+            prompt, RESUME_SECTIONS_PROMPT, variables, resume_template_content["sections"], PROTECTED_SECTIONS["resume"],
+            use_cache=use_cache, on_section=on_section, top_k=top_k,
+        )
+    
+    # Only the editable sections are sent to the model
+    return await agenerate_sections_content(
+        prompt, variables, resume_template_content["sections"], PROTECTED_SECTIONS["resume"], mode,
+        use_cache=use_cache, on_section=on_section, top_k=top_k,
+    )
+
+
+def build_cover_letter_prompt(
+    cover_letter_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    hirer_name: str = "",
+    hirer_gender: str = "unknown",
+    relevant_experience: str = "",
+    mode: str = "document",
+) -> Tuple[ChatPromptTemplate, Dict[str, Any]]:
+    """
+    Build the prompt used to generate updated cover letter content
     
-    # Create a chain
-    chain = prompt | llm | StrOutputParser()
+    Args:
+        cover_letter_template_content: Dictionary containing the cover letter document content and sections
+        job_title: Job title
+        company_name: Company name
+        job_description: Job description
+        company_overview: Company overview
+        hirer_name: Name of the hiring manager
+        hirer_gender: Gender of the hiring manager (male, female, or unknown)
+        relevant_experience: Additional relevant experience
+        mode: Generation mode; in the compact and sections modes, the sections
+            variable is replaced by the sections sent in each prompt
+        
+    Returns:
+        Tuple containing the prompt template and its variables
+    """
+    # Get the sections from the template
+    sections = cover_letter_template_content["sections"]
     
-    # Generate the content
-    response = chain.invoke({
+    # Collect the prompt variables
+    variables = {
         "job_title": job_title,
         "company_name": company_name,
-        "job_description": job_description,
-        "company_overview": company_overview,
+        "job_description": compact_text(job_description),
+        "company_overview": compact_text(company_overview),
         "hirer_name": hirer_name,
         "hirer_gender": hirer_gender,
-        "relevant_experience": relevant_experience,
-        "sections": json.dumps(sections, indent=2),
-    })
+        "relevant_experience": compact_text(relevant_experience),
+        "sections": compact_sections(sections),
+    }
     
-    # Parse the response as JSON
-    try:
-        content = json.loads(response)
-    except json.JSONDecodeError:
-        # If the response is not valid JSON, extract it from the text
-        json_match = re.search(r'```json\n(.*?)\n```', response, re.DOTALL)
-        if json_match:
-            try:
-                content = json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                raise ValueError(f"Failed to parse LLM response as JSON: {response}")
-        else:
-            raise ValueError(f"Failed to parse LLM response as JSON: {response}")
+    return (COVER_LETTER_PROMPT if mode == "document" else COVER_LETTER_SECTIONS_PROMPT), variables
+
+
+def generate_cover_letter_content(
+    cover_letter_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    hirer_name: str = "",
+    hirer_gender: str = "unknown",
+    relevant_experience: str = "",
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    mode: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Generate updated content for a cover letter based on the existing content and job details
+    
+    Args:
+        cover_letter_template_content: Dictionary containing the cover letter document content and sections
+        job_title: Job title
+        company_name: Company name
+        job_description: Job description
+        company_overview: Company overview
+        hirer_name: Name of the hiring manager
+        hirer_gender: Gender of the hiring manager (male, female, or unknown)
+        relevant_experience: Additional relevant experience
+        use_cache: Whether to reuse a cached response for an identical prompt
+        on_section: Optional callback receiving each section as soon as it is generated
+        mode: Generation mode (one of GENERATION_MODES, GENERATION_MODE by default)
+        top_k: Number of experience/skills lines sent to the model (RANKING_TOP_K
+            by default, 0 to send every line)
+        
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    mode = mode or GENERATION_MODE
+    prompt, variables = build_cover_letter_prompt(
+        cover_letter_template_content, job_title, company_name, job_description, company_overview,
+        hirer_name, hirer_gender, relevant_experience, mode,
+    )
+    
+    if mode == "document":
+        return generate_document_content(
+            prompt, COVER_LETTER_SECTIONS_PROMPT, variables, cover_letter_template_content["sections"], PROTECTED_SECTIONS["cover_letter"],
+            use_cache=use_cache, on_section=on_section, top_k=top_k,
+        )
+    
+    # Only the editable sections are sent to the model
+    return generate_sections_content(
+        prompt, variables, cover_letter_template_content["sections"], PROTECTED_SECTIONS["cover_letter"], mode,
+        use_cache=use_cache, on_section=on_section, top_k=top_k,
+    )
+
+
+async def agenerate_cover_letter_content(
+    cover_letter_template_content: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    company_overview: str,
+    hirer_name: str = "",
+    hirer_gender: str = "unknown",
+    relevant_experience: str = "",
+    use_cache: bool = True,
+    on_section: Optional[SectionCallback] = None,
+    mode: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Async version of generate_cover_letter_content()
+    
+    Returns:
+        Dictionary mapping section names to their updated content
+    """
+    mode = mode or GENERATION_MODE
+    prompt, variables = build_cover_letter_prompt(
+        cover_letter_template_content, job_title, company_name, job_description, company_overview,
+        hirer_name, hirer_gender, relevant_experience, mode,
+    )
     
-    return content
\ No newline at end of file
+    if mode == "document":
+        return await agenerate_document_content(
+            prompt, COVER_LETTER_SECTIONS_PROMPT, variables, cover_letter_template_content["sections"], PROTECTED_SECTIONS["cover_letter"],
+            use_cache=use_cache, on_section=on_section, top_k=top_k,
+        )
+    
+    # Only the editable sections are sent to the model
+    return await agenerate_sections_content(
+        prompt, variables, cover_letter_template_content["sections"], PROTECTED_SECTIONS["cover_letter"], mode,
+        use_cache=use_cache, on_section=on_section, top_k=top_k,
+    )
@@ -0,0 +1,182 @@
+"""
+AIRG-LangGraph - Utilities for memoizing graph nodes across runs
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Dict, List, Any, Awaitable, Callable, Optional
+
+from utils.cache_utils import DiskCache, make_cache_key
+from utils.docx_utils import process_template
+
+
+# Default location and limits of the node output cache
+NODE_CACHE_PATH = os.path.join("output", "node_cache.db")
+NODE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+NODE_CACHE_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+# Bump when the layout of the cached node outputs changes
+NODE_CACHE_VERSION = 1
+
+
+_node_cache: Optional[DiskCache] = None
+_node_cache_lock = threading.Lock()
+
+
+def get_node_cache() -> DiskCache:
+    """
+    Get the process-wide node output cache
+
+    Returns:
+        DiskCache instance backed by output/node_cache.db
+    """
+    global _node_cache
+    with _node_cache_lock:
+        if _node_cache is None:
+            _node_cache = DiskCache(NODE_CACHE_PATH, NODE_CACHE_MAX_BYTES, NODE_CACHE_MAX_AGE_SECONDS)
+        return _node_cache
+
+
+class MemoizedNode:
+    """
+    Graph node that reuses its previous outputs when its inputs are unchanged
+
+    The fingerprint of a run covers the hash of the node's template and only the
+    state fields the node reads, so that changing a field one branch ignores
+    (e.g. the hirer for the resume) doesn't run that branch again. Outputs the
+    node reports as incomplete (listed in its "incomplete_nodes" output) are not
+    stored, as only complete LLM responses are cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Dict[str, Any]],
+        afunc: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        source_field: str,
+        template_field: str,
+        input_fields: List[str],
+        output_fields: List[str],
+        version: Any = None,
+        settings: Optional[Callable[[], Any]] = None,
+        on_hit: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            name: Name of the node in the graph
+            func: Node function
+            afunc: Async node function
+            source_field: State field holding the path of the node's template
+            template_field: State field holding the processed template content
+            input_fields: State fields the node reads
+            output_fields: State fields the node produces and that are cached
+            version: Anything else that determines the outputs (e.g. the prompts)
+            settings: Optional function returning the settings that determine the
+                outputs, read on every run (e.g. the active model)
+            on_hit: Optional callback receiving the state and the reused outputs
+        """
+        self.name = name
+        self.func = func
+        self.afunc = afunc
+        self.source_field = source_field
+        self.template_field = template_field
+        self.input_fields = input_fields
+        self.output_fields = output_fields
+        self.version = version
+        self.settings = settings
+        self.on_hit = on_hit
+
+    @staticmethod
+    def enabled(state: Dict[str, Any]) -> bool:
+        """
+        Whether previous outputs may be reused for this run (never when the LLM
+        cache is bypassed, as the model must then be called)
+        """
+        return bool(state.get("use_node_cache", True) and state.get("use_llm_cache", True))
+
+    def fingerprint(self, state: Dict[str, Any], template_content: Dict[str, Any]) -> str:
+        """
+        Build the fingerprint of the node's inputs
+
+        Args:
+            state: Current state of the graph
+            template_content: Processed template content of the node
+
+        Returns:
+            Cache key of the node outputs
+        """
+        return make_cache_key(
+            "node",
+            NODE_CACHE_VERSION,
+            self.name,
+            self.version,
+            self.settings() if self.settings is not None else None,
+            template_content["sha256"],
+            {field: state.get(field) for field in self.input_fields},
+        )
+
+    def _reuse(self, state: Dict[str, Any], template_content: Dict[str, Any], cached_value: str, start_time: float) -> Dict[str, Any]:
+        outputs = json.loads(cached_value)
+        if self.on_hit is not None:
+            self.on_hit(state, outputs)
+
+        return {
+            self.template_field: template_content,
+            **outputs,
+            "skipped_nodes": [self.name],
+            "node_timings": {self.name: time.perf_counter() - start_time},
+        }
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        # Degraded outputs (e.g. sections that kept their original text) are run again next time
+        if self.name in result.get("incomplete_nodes", []):
+            return
+        get_node_cache().set(key, json.dumps({field: result[field] for field in self.output_fields}))
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.enabled(state):
+            return self.func(state)
+
+        start_time = time.perf_counter()
+
+        # Process the template (cached by content hash) to fingerprint it
+        template_content = state.get(self.template_field) or process_template(state[self.source_field])
+        key = self.fingerprint(state, template_content)
+
+        # Reuse the outputs of a previous run with the same inputs
+        cached_value = get_node_cache().get(key)
+        if cached_value is not None:
+            return self._reuse(state, template_content, cached_value, start_time)
+
+        # Otherwise run the node, sharing the processed template with it
+        result = self.func({**state, self.template_field: template_content})
+        self._store(key, result)
+        return result
+
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of calling the node, offloading the cache and template I/O to threads
+        """
+        if not self.enabled(state):
+            return await self.afunc(state)
+
+        start_time = time.perf_counter()
+
+        # Process the template (cached by content hash) to fingerprint it
+        template_content = state.get(self.template_field) or await asyncio.to_thread(
+            process_template, state[self.source_field]
+        )
+        key = self.fingerprint(state, template_content)
+
+        # Reuse the outputs of a previous run with the same inputs
+        cached_value = await asyncio.to_thread(get_node_cache().get, key)
+        if cached_value is not None:
+            return self._reuse(state, template_content, cached_value, start_time)
+
+        # Otherwise run the node, sharing the processed template with it
+        result = await self.afunc({**state, self.template_field: template_content})
+        await asyncio.to_thread(self._store, key, result)
+        return result
@@ -0,0 +1,439 @@
+"""
+AIRG-LangGraph - Utilities for tracing runs and exporting metrics
+"""
+
+import os
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+
+
+# Whether spans are recorded (enabled by --trace or AIRG_TRACE=1)
+TRACING_ENABLED = os.environ.get("AIRG_TRACE", "0") != "0"
+
+# Where the spans of every traced run and the aggregated metrics are written
+TRACE_PATH = os.path.join("output", "trace.jsonl")
+METRICS_PATH = os.path.join("output", "metrics.prom")
+
+# Numeric span attributes summed in the metrics
+METRIC_FIELDS = ["prompt_tokens", "response_tokens", "bytes_written", "retries"]
+
+# Kinds of work timed inside the nodes, in the order of the per-node breakdown
+CHILD_KINDS = ["llm", "docx", "pdf", "checkpoint"]
+
+# Trace of the current run, node being executed and innermost open span
+_current_trace: contextvars.ContextVar[Optional["RunTrace"]] = contextvars.ContextVar("airg_trace", default=None)
+_current_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("airg_node", default=None)
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("airg_span", default=None)
+
+# Aggregated metrics, keyed by (kind, name, node)
+MetricKey = Tuple[str, str, str]
+
+
+def enable_tracing(enabled: bool = True) -> None:
+    """
+    Turn the recording of spans on or off for the whole process
+
+    Args:
+        enabled: Whether spans are recorded
+    """
+    global TRACING_ENABLED
+    TRACING_ENABLED = enabled
+
+
+def tracing_enabled() -> bool:
+    """
+    Check whether spans are recorded
+
+    Returns:
+        True if tracing is enabled
+    """
+    return TRACING_ENABLED
+
+
+def _accumulate(totals: Dict[MetricKey, Dict[str, float]], record: Dict[str, Any]) -> None:
+    # Add a finished span to the totals of its (kind, name, node)
+    key = (record["kind"], record["name"], record.get("node") or "")
+    entry = totals.setdefault(key, {"count": 0, "errors": 0, "seconds": 0.0, **{field: 0 for field in METRIC_FIELDS}})
+    entry["count"] += 1
+    entry["errors"] += int("error" in record)
+    entry["seconds"] += record["seconds"]
+    for field in METRIC_FIELDS:
+        entry[field] += record.get(field, 0)
+
+
+def node_breakdown(totals: Dict[MetricKey, Dict[str, float]]) -> List[Dict[str, Any]]:
+    """
+    Summarize metric totals per graph node, with the LLM, DOCX, PDF and checkpoint
+    work done inside each node
+
+    Args:
+        totals: Metric totals keyed by (kind, name, node)
+
+    Returns:
+        One dictionary per node, in order of decreasing time
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for (kind, name, node), entry in totals.items():
+        node_name = name if kind == "node" else node or "(outside nodes)"
+        row = rows.setdefault(node_name, {
+            "node": node_name, "runs": 0, "seconds": 0.0,
+            **{f"{child}_seconds": 0.0 for child in CHILD_KINDS},
+            "llm_calls": 0, **{field: 0 for field in METRIC_FIELDS},
+        })
+        if kind == "node":
+            row["runs"] += entry["count"]
+            row["seconds"] += entry["seconds"]
+            continue
+        if kind in CHILD_KINDS:
+            row[f"{kind}_seconds"] += entry["seconds"]
+        if kind == "llm":
+            row["llm_calls"] += entry["count"]
+        for field in METRIC_FIELDS:
+            row[field] += entry[field]
+    return sorted(rows.values(), key=lambda row: row["seconds"], reverse=True)
+
+
+def format_breakdown(rows: List[Dict[str, Any]]) -> str:
+    """
+    Format a per-node breakdown as a table
+
+    Args:
+        rows: Rows returned by node_breakdown()
+
+    Returns:
+        Text of the table
+    """
+    lines = [
+        f"  {'node':<26}{'total':>9}{'llm':>9}{'docx':>9}{'pdf':>9}{'ckpt':>9}"
+        f"{'calls':>7}{'prompt tok':>12}{'resp tok':>10}{'retries':>9}{'written':>11}"
+    ]
+    for row in rows:
+        lines.append(
+            f"  {row['node']:<26}{row['seconds']:>8.2f}s{row['llm_seconds']:>8.2f}s{row['docx_seconds']:>8.2f}s"
+            f"{row['pdf_seconds']:>8.2f}s{row['checkpoint_seconds']:>8.2f}s{row['llm_calls']:>7}"
+            f"{row['prompt_tokens']:>12}{row['response_tokens']:>10}{row['retries']:>9}"
+            f"{row['bytes_written'] / 1024:>8.0f} KiB"
+        )
+    return "\n".join(lines)
+
+
+class RunTrace:
+    """
+    Spans recorded during one run, from any thread or task of the run
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        """
+        Args:
+            run_id: Identifier of the run (a new one by default)
+        """
+        self.run_id = run_id or uuid.uuid4().hex
+        self.start_time = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Add a finished span
+
+        Args:
+            record: Span record
+        """
+        with self._lock:
+            self.spans.append(record)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """
+        Summarize the spans of the run per graph node
+
+        Returns:
+            Rows as returned by node_breakdown()
+        """
+        totals: Dict[MetricKey, Dict[str, float]] = {}
+        with self._lock:
+            for record in self.spans:
+                _accumulate(totals, record)
+        return node_breakdown(totals)
+
+    def write_jsonl(self, path: str = TRACE_PATH) -> None:
+        """
+        Append the spans of the run to a JSONL trace file, one span per line
+
+        Args:
+            path: Path to the trace file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            lines = [json.dumps({"run_id": self.run_id, **record}, default=str) for record in self.spans]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+
+class MetricsRegistry:
+    """
+    Process-wide totals of every span, exported in the Prometheus text format
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[MetricKey, Dict[str, float]] = {}
+
+    def observe(self, record: Dict[str, Any]) -> None:
+        """
+        Add a finished span to the totals
+
+        Args:
+            record: Span record
+        """
+        with self._lock:
+            _accumulate(self._totals, record)
+
+    def totals(self) -> Dict[MetricKey, Dict[str, float]]:
+        """
+        Get a copy of the totals
+
+        Returns:
+            Metric totals keyed by (kind, name, node)
+        """
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._totals.items()}
+
+    def prometheus_text(self) -> str:
+        """
+        Render the totals in the Prometheus text exposition format
+
+        Returns:
+            Text of the metrics
+        """
+        metrics = [
+            ("airg_span_total", "count", "counter", "Number of completed spans"),
+            ("airg_span_errors_total", "errors", "counter", "Number of spans that raised an exception"),
+            ("airg_span_seconds_total", "seconds", "counter", "Wall time spent in spans"),
+            ("airg_llm_prompt_tokens_total", "prompt_tokens", "counter", "Estimated prompt tokens sent to the LLM"),
+            ("airg_llm_response_tokens_total", "response_tokens", "counter", "Estimated response tokens received from the LLM"),
+            ("airg_llm_retries_total", "retries", "counter", "Retried LLM requests"),
+            ("airg_bytes_written_total", "bytes_written", "counter", "Bytes of the DOCX and PDF files written"),
+        ]
+        totals = self.totals()
+        lines = []
+        for metric, field, metric_type, description in metrics:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for (kind, name, node), entry in sorted(totals.items()):
+                if field in METRIC_FIELDS and not entry[field]:
+                    continue
+                labels = f'kind="{kind}",name="{name}",node="{node}"'
+                lines.append(f"{metric}{{{labels}}} {entry[field]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str = METRICS_PATH) -> None:
+        """
+        Write the metrics to a Prometheus text file (e.g. for the node exporter's
+        textfile collector), replacing it atomically
+
+        Args:
+            path: Path to the metrics file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temporary_path, path)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry
+
+    Returns:
+        MetricsRegistry instance
+    """
+    return _metrics
+
+
+def finish_span(record: Dict[str, Any], start_time: float) -> None:
+    """
+    Record a span that started at start_time (time.perf_counter()), in the trace
+    of the current context and in the metrics
+
+    Args:
+        record: Span record with at least its kind and name
+        start_time: Start of the span
+    """
+    record.setdefault("node", _current_node.get())
+    record["seconds"] = round(time.perf_counter() - start_time, 6)
+    _metrics.observe(record)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(record)
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block of work; the yielded record can be updated with attributes such
+    as token counts, and annotate() adds to the innermost open span
+
+    Args:
+        kind: Kind of work (node, llm, docx, pdf or checkpoint)
+        name: Name of the work
+        **attributes: Initial attributes of the span
+
+    Yields:
+        Span record (a throwaway dictionary when tracing is disabled)
+    """
+    record = {"kind": kind, "name": name, **attributes}
+    if not TRACING_ENABLED:
+        yield record
+        return
+
+    record["start"] = time.time()
+    start_time = time.perf_counter()
+    token = _current_span.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        finish_span(record, start_time)
+
+
+def annotate(**values: Any) -> None:
+    """
+    Add numeric values (e.g. retries) to the innermost open span, if any
+
+    Args:
+        **values: Values to add
+    """
+    record = _current_span.get()
+    if record is not None:
+        for field, value in values.items():
+            record[field] = record.get(field, 0) + value
+
+
+def traced(kind: str, name: Optional[str] = None, output: bool = False) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function (sync or async) as a span
+
+    Args:
+        kind: Kind of work (llm, docx, pdf or checkpoint)
+        name: Name of the span (the function name by default)
+        output: Whether the function returns the path of a file it wrote, whose
+            size is recorded as bytes_written
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        def record_output(record: Dict[str, Any], result: Any) -> None:
+            if output and isinstance(result, str) and os.path.exists(result):
+                record["bytes_written"] = os.path.getsize(result)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not TRACING_ENABLED:
+                    return await func(*args, **kwargs)
+                with span(kind, span_name) as record:
+                    result = await func(*args, **kwargs)
+                    record_output(record, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            with span(kind, span_name) as record:
+                result = func(*args, **kwargs)
+                record_output(record, result)
+                return result
+        return wrapper
+
+    return decorator
+
+
+class TracedNode:
+    """
+    Graph node wrapper timing each execution of the node, and attributing the
+    spans recorded while it runs (LLM calls, DOCX and PDF work) to it
+    """
+
+    def __init__(self, name: str, func: Callable, afunc: Optional[Callable] = None):
+        """
+        Args:
+            name: Name of the node in the graph
+            func: Node function
+            afunc: Optional async node function
+        """
+        self.name = name
+        self.func = func
+        self.afunc = afunc
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        token = _current_node.set(self.name)
+        try:
+            with span("node", self.name, node=self.name):
+                return self.func(state)
+        finally:
+            _current_node.reset(token)
+
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        token = _current_node.set(self.name)
+        try:
+            with span("node", self.name, node=self.name):
+                if self.afunc is None:
+                    return self.func(state)
+                return await self.afunc(state)
+        finally:
+            _current_node.reset(token)
+
+
+@contextmanager
+def trace_run(run_id: Optional[str] = None) -> Iterator[Optional[RunTrace]]:
+    """
+    Collect the spans of a run; the run that opens the trace writes it to the
+    JSONL trace and refreshes the Prometheus file when it ends (nested calls, e.g.
+    the engine inside a CLI command, reuse the open trace)
+
+    Args:
+        run_id: Identifier of the run (a new one by default)
+
+    Yields:
+        The trace of the run, or None when tracing is disabled
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    trace = _current_trace.get()
+    if trace is not None:
+        yield trace
+        return
+
+    trace = RunTrace(run_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.write_jsonl()
+        _metrics.write_prometheus()
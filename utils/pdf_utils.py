@@ -2,13 +2,182 @@
 AIRG-LangGraph - Utilities for generating PDF files
 """
 
+import io
 import os
+import time
+import atexit
 import tempfile
+import threading
+import contextvars
 import subprocess
-from typing import Optional
-from weasyprint import HTML
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, List, Optional
+from utils.html_utils import BASE_CSS, docx_to_html_string
+from utils.metrics_utils import finish_span, traced, tracing_enabled
 
 
+# Number of long-lived PDF render worker processes (0 renders in the calling process),
+# and number of documents a worker renders before it is replaced to bound its memory
+PDF_RENDER_WORKERS = int(os.environ.get("AIRG_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_RENDER_MAX_JOBS_PER_WORKER = int(os.environ.get("AIRG_PDF_WORKER_MAX_JOBS", "50"))
+
+# DOCX to HTML converter: "native" converts in-process with python-docx,
+# "pandoc" runs a pandoc subprocess through temporary files
+DOCX_HTML_CONVERTER = os.environ.get("AIRG_DOCX_HTML_CONVERTER", "native")
+
+# Number of fetched images a renderer keeps between documents
+PDF_RESOURCE_CACHE_SIZE = int(os.environ.get("AIRG_PDF_RESOURCE_CACHE_SIZE", "256"))
+
+
+class ResourceCache(OrderedDict):
+    """
+    Images fetched by the documents of a renderer, ordered from the least to the
+    most recently used
+    
+    WeasyPrint reads back the entries it stored while it renders a document, so
+    the cache is only trimmed between documents.
+    """
+    
+    def __getitem__(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+    
+    def trim(self, size: int) -> None:
+        """
+        Evict the least recently used entries
+        
+        Args:
+            size: Number of entries to keep
+        """
+        while len(self) > size:
+            self.popitem(last=False)
+
+
+class PDFRenderer:
+    """
+    Renders many HTML documents to PDF with one WeasyPrint setup
+    
+    The font configuration (fontconfig discovery and the fonts loaded through
+    it), the parsed base stylesheet and the images fetched by the documents are
+    created once and shared by every document the renderer converts, instead of
+    being set up again for each PDF. Renders are serialized, as these WeasyPrint
+    objects are not safe to use from several threads at once.
+    """
+    
+    def __init__(self, base_css: str = BASE_CSS, resource_cache_size: int = PDF_RESOURCE_CACHE_SIZE):
+        """
+        Args:
+            base_css: Stylesheet applied to the documents converted from DOCX
+            resource_cache_size: Number of fetched images kept between documents
+        """
+        # Import WeasyPrint (and its Pango/cairo stack) only when a renderer is created
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+        
+        self.font_config = FontConfiguration()
+        self.base_stylesheets = [CSS(string=base_css, font_config=self.font_config)]
+        self.resource_cache_size = resource_cache_size
+        self.resource_cache = ResourceCache()
+        self._lock = threading.Lock()
+    
+    def _render_document(self, html: str, base_url: Optional[str], base_css: bool) -> Any:
+        # Lay out a document with the shared fonts, stylesheets and resources
+        from weasyprint import HTML
+        
+        return HTML(string=html, base_url=base_url).render(
+            font_config=self.font_config,
+            stylesheets=self.base_stylesheets if base_css else None,
+            cache=self.resource_cache,
+        )
+    
+    def render(
+        self,
+        html: str,
+        target: Optional[str] = None,
+        base_url: Optional[str] = None,
+        base_css: bool = True,
+    ) -> Optional[bytes]:
+        """
+        Render an HTML document to PDF
+        
+        Args:
+            html: HTML document
+            target: Path to save the PDF file (None returns its content)
+            base_url: URL relative links of the document are resolved against
+            base_css: Whether to apply the base stylesheet (disable for HTML that
+                brings its own, e.g. the pandoc output)
+            
+        Returns:
+            Content of the PDF file, or None if it was written to target
+        """
+        with self._lock:
+            try:
+                return self._render_document(html, base_url, base_css).write_pdf(target, cache=self.resource_cache)
+            finally:
+                self.resource_cache.trim(self.resource_cache_size)
+    
+    def render_many(self, documents: List[str], base_css: bool = True) -> List[bytes]:
+        """
+        Render several HTML documents to separate PDFs
+        
+        Args:
+            documents: HTML documents
+            base_css: Whether to apply the base stylesheet
+            
+        Returns:
+            Content of each PDF file, in the order of the documents
+        """
+        return [self.render(html, base_css=base_css) for html in documents]
+    
+    def render_together(
+        self,
+        documents: List[str],
+        target: Optional[str] = None,
+        base_css: bool = True,
+    ) -> Optional[bytes]:
+        """
+        Render several HTML documents to one PDF, the pages of each document
+        following the previous one (e.g. a resume and its cover letter)
+        
+        Args:
+            documents: HTML documents
+            target: Path to save the PDF file (None returns its content)
+            base_css: Whether to apply the base stylesheet
+            
+        Returns:
+            Content of the PDF file, or None if it was written to target
+        """
+        with self._lock:
+            try:
+                rendered = [self._render_document(html, None, base_css) for html in documents]
+                pages = [page for document in rendered for page in document.pages]
+                return rendered[0].copy(pages).write_pdf(target, cache=self.resource_cache)
+            finally:
+                self.resource_cache.trim(self.resource_cache_size)
+
+
+_pdf_renderer: Optional[PDFRenderer] = None
+_pdf_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PDFRenderer:
+    """
+    Get the renderer of this process, created on first use
+    
+    Returns:
+        PDFRenderer instance shared by every PDF rendered in the process
+    """
+    global _pdf_renderer
+    with _pdf_renderer_lock:
+        if _pdf_renderer is None:
+            _pdf_renderer = PDFRenderer()
+        return _pdf_renderer
+
+
+@traced("pdf")
 def docx_to_html(docx_path: str) -> str:
     """
     Convert a DOCX file to HTML using pandoc
@@ -40,7 +209,7 @@ def docx_to_html(docx_path: str) -> str:
 
 def _fallback_docx_to_html(docx_path: str) -> str:
     """
-    Fallback method to convert DOCX to HTML using python-docx
+    Fallback method to convert DOCX to HTML using the in-process converter
     
     Args:
         docx_path: Path to the DOCX file
@@ -48,42 +217,15 @@ def _fallback_docx_to_html(docx_path: str) -> str:
     Returns:
         Path to the generated HTML file
     """
-    from docx import Document
-    
-    # Load the document
-    doc = Document(docx_path)
-    
-    # Create a simple HTML representation
-    html_content = "<html><head><style>body { font-family: Arial, sans-serif; }</style></head><body>"
-    
-    # Add paragraphs
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():
-            html_content += f"<p>{paragraph.text}</p>"
-    
-    # Add tables
-    for table in doc.tables:
-        html_content += "<table border='1' cellpadding='3'>"
-        for row in table.rows:
-            html_content += "<tr>"
-            for cell in row.cells:
-                cell_text = ""
-                for paragraph in cell.paragraphs:
-                    cell_text += paragraph.text + "<br/>"
-                html_content += f"<td>{cell_text}</td>"
-            html_content += "</tr>"
-        html_content += "</table>"
-    
-    html_content += "</body></html>"
-    
     # Write to a temporary file
     fd, html_path = tempfile.mkstemp(suffix=".html")
-    with os.fdopen(fd, 'w') as f:
-        f.write(html_content)
+    with os.fdopen(fd, 'w', encoding="utf-8") as f:
+        f.write(docx_to_html_string(docx_path))
     
     return html_path
 
 
+@traced("pdf", output=True)
 def html_to_pdf(html_path: str, pdf_path: str) -> str:
     """
     Convert an HTML file to PDF using WeasyPrint
@@ -98,12 +240,16 @@ def html_to_pdf(html_path: str, pdf_path: str) -> str:
     # Create the directory if it doesn't exist
     os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
     
-    # Convert HTML to PDF
-    HTML(html_path).write_pdf(pdf_path)
+    with open(html_path, encoding="utf-8") as f:
+        html = f.read()
+    
+    # Convert HTML to PDF (the HTML brings its own styles)
+    get_pdf_renderer().render(html, pdf_path, base_url=html_path, base_css=False)
     
     return pdf_path
 
 
+@traced("pdf", output=True)
 def docx_to_pdf(docx_path: str, pdf_path: str) -> str:
     """
     Convert a DOCX file to PDF
@@ -115,6 +261,13 @@ def docx_to_pdf(docx_path: str, pdf_path: str) -> str:
     Returns:
         Path to the generated PDF file
     """
+    if DOCX_HTML_CONVERTER == "native":
+        # Convert in memory and hand the HTML string straight to the renderer,
+        # which applies the base stylesheet
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        get_pdf_renderer().render(docx_to_html_string(docx_path, include_base_css=False), pdf_path)
+        return pdf_path
+    
     # Convert DOCX to HTML
     html_path = docx_to_html(docx_path)
     
@@ -126,4 +279,215 @@ def docx_to_pdf(docx_path: str, pdf_path: str) -> str:
         if os.path.exists(html_path):
             os.remove(html_path)
     
-    return pdf_path
\ No newline at end of file
+    return pdf_path
+
+
+def render_docx_bytes(docx_bytes: bytes) -> bytes:
+    """
+    Convert DOCX bytes to PDF bytes (the job run by the render workers)
+    
+    Args:
+        docx_bytes: Content of the DOCX file
+        
+    Returns:
+        Content of the PDF file
+    """
+    renderer = get_pdf_renderer()
+    
+    if DOCX_HTML_CONVERTER == "native":
+        return renderer.render(docx_to_html_string(io.BytesIO(docx_bytes), include_base_css=False))
+    
+    fd, docx_path = tempfile.mkstemp(suffix=".docx")
+    with os.fdopen(fd, "wb") as f:
+        f.write(docx_bytes)
+    
+    html_path = None
+    try:
+        html_path = docx_to_html(docx_path)
+        with open(html_path, encoding="utf-8") as f:
+            return renderer.render(f.read(), base_url=html_path, base_css=False)
+    finally:
+        # Clean up the temporary files
+        for path in [docx_path, html_path]:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+def docx_files_to_pdf(docx_paths: List[str], pdf_path: str) -> str:
+    """
+    Convert several DOCX files to one PDF, in the calling process with the
+    in-process DOCX converter (e.g. the resume followed by the cover letter)
+    
+    Args:
+        docx_paths: Paths to the DOCX files, in page order
+        pdf_path: Path to save the PDF file
+        
+    Returns:
+        Path to the generated PDF file
+    """
+    os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+    documents = [docx_to_html_string(docx_path, include_base_css=False) for docx_path in docx_paths]
+    get_pdf_renderer().render_together(documents, pdf_path)
+    return pdf_path
+
+
+def _start_render_worker() -> None:
+    """
+    Create the renderer when a render worker starts, so that its first document
+    doesn't pay for loading WeasyPrint and discovering the fonts
+    """
+    try:
+        get_pdf_renderer()
+    except Exception:
+        # A failing initializer would make the pool start workers forever; the
+        # error is raised by the first render instead
+        pass
+
+
+class PDFRenderPool:
+    """
+    Pool of long-lived worker processes converting DOCX bytes to PDF bytes
+    
+    Workers keep WeasyPrint and their renderer (fonts, base stylesheet, fetched
+    images) loaded between documents, and are recycled after a fixed number of jobs to bound their memory usage.
+    """
+    
+    def __init__(
+        self,
+        workers: int = PDF_RENDER_WORKERS,
+        max_jobs_per_worker: int = PDF_RENDER_MAX_JOBS_PER_WORKER,
+    ):
+        """
+        Args:
+            workers: Number of worker processes
+            max_jobs_per_worker: Number of documents a worker renders before it is replaced
+        """
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        # Spawn rather than fork, as the parent process runs threads (graph
+        # executor, SQLite connections) that must not be duplicated
+        self._pool = multiprocessing.get_context("spawn").Pool(
+            processes=workers,
+            initializer=_start_render_worker,
+            maxtasksperchild=max_jobs_per_worker or None,
+        )
+    
+    def submit(self, docx_bytes: bytes) -> "Future[bytes]":
+        """
+        Submit a DOCX document for rendering
+        
+        Args:
+            docx_bytes: Content of the DOCX file
+            
+        Returns:
+            Future resolving to the content of the PDF file
+        """
+        future: "Future[bytes]" = Future()
+        self._pool.apply_async(
+            render_docx_bytes,
+            (docx_bytes,),
+            callback=future.set_result,
+            error_callback=future.set_exception,
+        )
+        return future
+    
+    def close(self) -> None:
+        """
+        Stop the worker processes
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+
+_render_pool: Optional[PDFRenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def configure_render_pool(workers: int, max_jobs_per_worker: int = PDF_RENDER_MAX_JOBS_PER_WORKER) -> None:
+    """
+    Set the size of the process-wide render pool (before it is first used)
+    
+    Args:
+        workers: Number of worker processes (0 renders in the calling process)
+        max_jobs_per_worker: Number of documents a worker renders before it is replaced
+    """
+    global PDF_RENDER_WORKERS, PDF_RENDER_MAX_JOBS_PER_WORKER, _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.close()
+            _render_pool = None
+        PDF_RENDER_WORKERS = workers
+        PDF_RENDER_MAX_JOBS_PER_WORKER = max_jobs_per_worker
+
+
+def get_render_pool() -> Optional[PDFRenderPool]:
+    """
+    Get the process-wide render pool, starting it on first use
+    
+    Returns:
+        PDFRenderPool instance, or None if rendering happens in the calling process
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None and PDF_RENDER_WORKERS > 0:
+            _render_pool = PDFRenderPool(PDF_RENDER_WORKERS, PDF_RENDER_MAX_JOBS_PER_WORKER)
+            atexit.register(_render_pool.close)
+        return _render_pool
+
+
+def submit_docx_to_pdf(docx_path: str, pdf_path: str) -> "Future[str]":
+    """
+    Convert a DOCX file to PDF in the render pool
+    
+    Several conversions can be submitted before waiting for any of them, so that
+    they are rendered concurrently.
+    
+    Args:
+        docx_path: Path to the DOCX file
+        pdf_path: Path to save the PDF file
+        
+    Returns:
+        Future resolving to the path of the generated PDF file
+    """
+    future: "Future[str]" = Future()
+    
+    pool = get_render_pool()
+    if pool is None:
+        # Render in the calling process
+        try:
+            future.set_result(docx_to_pdf(docx_path, pdf_path))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    with open(docx_path, "rb") as f:
+        docx_bytes = f.read()
+    
+    # The render is traced from submission to completion, in the caller's context
+    context = contextvars.copy_context()
+    start_time = time.perf_counter()
+    
+    def write_pdf(render_future: "Future[bytes]") -> None:
+        span = {"kind": "pdf", "name": "render_docx_bytes"}
+        error = None
+        try:
+            # Create the directory if it doesn't exist
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            pdf_bytes = render_future.result()
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_bytes)
+            span["bytes_written"] = len(pdf_bytes)
+        except Exception as e:
+            span["error"] = type(e).__name__
+            error = e
+        
+        # Record the span before the caller is woken up and its run ends
+        if tracing_enabled():
+            context.run(finish_span, span, start_time)
+        if error is None:
+            future.set_result(pdf_path)
+        else:
+            future.set_exception(error)
+    
+    pool.submit(docx_bytes).add_done_callback(write_pdf)
+    return future
@@ -0,0 +1,51 @@
+"""
+AIRG-LangGraph - Utilities for reporting generation progress from graph nodes
+"""
+
+import time
+from typing import Dict, List, Optional
+from langgraph.config import get_stream_writer
+
+
+class SectionProgress:
+    """
+    Section callback that reports each generated section as a custom LangGraph
+    stream event, and records the time to the first section
+    """
+
+    def __init__(self, document: str):
+        """
+        Must be created inside a graph node, so that the node's stream writer is available
+
+        Args:
+            document: Name of the document being generated (e.g. "resume")
+        """
+        self.document = document
+        self.start_time = time.perf_counter()
+        self.first_section_seconds: Optional[float] = None
+        self._writer = get_stream_writer()
+
+    def __call__(self, section: str, lines: List[str]) -> None:
+        elapsed = time.perf_counter() - self.start_time
+        if self.first_section_seconds is None:
+            self.first_section_seconds = elapsed
+        self._writer({
+            "document": self.document,
+            "section": section,
+            "lines": lines,
+            "elapsed": elapsed,
+        })
+
+
+def replay_sections(document: str, content: Dict[str, List[str]]) -> None:
+    """
+    Report previously generated sections as stream events (e.g. when a node reuses
+    the outputs of an earlier run); must be called inside a graph node
+
+    Args:
+        document: Name of the document the sections belong to
+        content: Dictionary mapping section names to their content
+    """
+    progress = SectionProgress(document)
+    for section, lines in content.items():
+        progress(section, lines)
@@ -0,0 +1,179 @@
+"""
+AIRG-LangGraph - Utilities for building compact prompts within a token budget
+"""
+
+import os
+import re
+import json
+import logging
+import textwrap
+from typing import Dict, List, Any, Tuple
+from langchain_core.prompts import ChatPromptTemplate
+
+
+# Maximum number of prompt tokens per LLM call (0 = no limit)
+PROMPT_TOKEN_BUDGET = int(os.environ.get("AIRG_PROMPT_TOKEN_BUDGET", "8000"))
+
+# Prompt variables trimmed when a prompt exceeds the budget, lowest priority
+# first; the sections to tailor are never trimmed
+TRIM_ORDER = ["company_overview", "relevant_experience", "job_description"]
+
+# Marker appended to trimmed text
+TRIM_MARKER = " [...]"
+
+# Tokens as counted locally: words (split into chunks of up to 4 characters,
+# close to what subword tokenizers produce for English), single punctuation marks,
+# line breaks and runs of indentation or repeated spaces
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]|\n|[ \t]{2,}")
+
+logger = logging.getLogger(__name__)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text locally, without calling the API
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(messages: List[Any]) -> int:
+    """
+    Estimate the number of tokens of rendered prompt messages
+
+    Args:
+        messages: LangChain messages
+
+    Returns:
+        Estimated number of tokens
+    """
+    return sum(count_tokens(str(message.content)) for message in messages)
+
+
+def compact_text(text: str) -> str:
+    """
+    Remove the indentation of a text and deduplicate its whitespace, keeping line breaks
+
+    Args:
+        text: Text to compact
+
+    Returns:
+        Compacted text
+    """
+    lines = [" ".join(line.split()) for line in textwrap.dedent(text).strip().splitlines()]
+
+    # Keep at most one blank line between paragraphs
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted)
+
+
+def compact_sections(sections: Dict[str, List[str]]) -> str:
+    """
+    Serialize document sections as JSON without indentation or repeated whitespace
+
+    Args:
+        sections: Dictionary mapping section names to their content
+
+    Returns:
+        Compact JSON text
+    """
+    return json.dumps(
+        {name: [" ".join(str(line).split()) for line in lines] for name, lines in sections.items()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def compact_prompt(messages: List[Tuple[str, str]]) -> ChatPromptTemplate:
+    """
+    Build a prompt template from (role, template) pairs with compacted template text
+
+    Args:
+        messages: Role and template text of each message
+
+    Returns:
+        ChatPromptTemplate instance
+    """
+    return ChatPromptTemplate.from_messages([(role, compact_text(template)) for role, template in messages])
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text after a number of tokens
+
+    Args:
+        text: Text to cut
+        max_tokens: Number of tokens to keep
+
+    Returns:
+        The text itself if it is short enough, otherwise its beginning followed by the trim marker
+    """
+    if max_tokens <= 0:
+        return ""
+
+    for index, match in enumerate(TOKEN_PATTERN.finditer(text)):
+        if index == max_tokens:
+            return text[:match.start()].rstrip() + TRIM_MARKER
+    return text
+
+
+def render_prompt(
+    prompt: ChatPromptTemplate,
+    variables: Dict[str, Any],
+    budget: int = PROMPT_TOKEN_BUDGET,
+) -> Tuple[List[Any], int]:
+    """
+    Render a prompt, trimming lower-priority variables (in TRIM_ORDER) until it
+    fits in the token budget
+
+    Args:
+        prompt: Prompt template to render
+        variables: Values for the prompt template variables
+        budget: Maximum number of prompt tokens (0 = no limit)
+
+    Returns:
+        Tuple containing the rendered messages and their estimated number of tokens
+    """
+    messages = prompt.format_messages(**variables)
+    tokens = count_message_tokens(messages)
+    if not budget or tokens <= budget:
+        return messages, tokens
+
+    # Trim the variables in order, each as much as needed (or entirely)
+    variables = dict(variables)
+    original_tokens = tokens
+    trimmed = []
+    for name in TRIM_ORDER:
+        value = variables.get(name)
+        if not value:
+            continue
+        excess = tokens - budget
+        value_tokens = count_tokens(value)
+        variables[name] = truncate_to_tokens(value, value_tokens - excess - count_tokens(TRIM_MARKER))
+        trimmed.append(name)
+
+        messages = prompt.format_messages(**variables)
+        tokens = count_message_tokens(messages)
+        if tokens <= budget:
+            break
+
+    if tokens > budget:
+        logger.warning(
+            "Prompt of %d tokens exceeds the budget of %d tokens even after trimming %s",
+            tokens, budget, ", ".join(trimmed) or "nothing",
+        )
+    else:
+        logger.info(
+            "Prompt trimmed from %d to %d tokens to fit the budget of %d tokens (%s)",
+            original_tokens, tokens, budget, ", ".join(trimmed),
+        )
+
+    return messages, tokens
@@ -0,0 +1,336 @@
+"""
+AIRG-LangGraph - Durable job queue shared by worker processes
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+
+# Default location of the queue and lease settings
+QUEUE_PATH = os.environ.get("AIRG_QUEUE_PATH", os.path.join("output", "job_queue.db"))
+QUEUE_VISIBILITY_TIMEOUT = float(os.environ.get("AIRG_QUEUE_VISIBILITY_TIMEOUT", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.environ.get("AIRG_QUEUE_MAX_ATTEMPTS", "3"))
+
+JOB_STATUSES = ["queued", "leased", "succeeded", "failed"]
+
+
+class SQLiteJobQueue:
+    """
+    Job queue stored in a SQLite database, shared by every process that opens it
+
+    A worker leases a job for a visibility timeout and extends the lease with
+    heartbeats while it runs. A job whose lease expires (e.g. because its worker
+    died) becomes visible again and is leased by another worker, up to a maximum
+    number of attempts. Every state change runs in an immediate transaction, so
+    two workers never lease the same job at the same time.
+
+    The default rollback journal is used rather than WAL, which needs shared
+    memory and therefore doesn't work across machines on a network filesystem.
+    """
+
+    def __init__(
+        self,
+        path: str = QUEUE_PATH,
+        visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+    ):
+        """
+        Args:
+            path: Path to the SQLite database file
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            max_attempts: Number of leases a job may get before it is failed
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, payload TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+                "lease_owner TEXT, lease_expires_at REAL, "
+                "enqueued_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "result TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps the queue safe to share
+        # between threads and processes
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def _transaction(self, conn: sqlite3.Connection, statements: Callable[[sqlite3.Connection], Any]) -> Any:
+        # Run the statements holding the write lock, so that concurrent workers
+        # see each other's leases
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(conn)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, payloads: Iterable[Dict[str, Any]], max_attempts: Optional[int] = None) -> List[str]:
+        """
+        Add jobs to the queue
+
+        Args:
+            payloads: JSON-serializable job payloads
+            max_attempts: Number of leases each job may get (the queue's default if None)
+
+        Returns:
+            IDs of the new jobs, in order
+        """
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, json.dumps(payload), max_attempts or self.max_attempts, now + index * 1e-6)
+            for index, payload in enumerate(payloads)
+        ]
+
+        conn = self._connect()
+        try:
+            self._transaction(
+                conn,
+                lambda conn: conn.executemany(
+                    "INSERT INTO jobs (id, payload, status, max_attempts, enqueued_at) VALUES (?, ?, 'queued', ?, ?)",
+                    rows,
+                ),
+            )
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest visible job: a queued job, or a leased job whose lease expired
+
+        Jobs whose lease expired after their last attempt are failed instead.
+
+        Args:
+            worker_id: Unique ID of the worker taking the lease
+
+        Returns:
+            Dictionary with the job ID, its payload, its attempt number and the
+            number of attempts it may get, or None if no job is visible
+        """
+        def take(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            now = time.time()
+
+            # Give up on jobs that keep losing their worker
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, "
+                "error = 'Lease expired after the last attempt (the worker stopped responding)' "
+                "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+
+            row = conn.execute(
+                "SELECT id, payload, attempts, max_attempts FROM jobs "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_expires_at < ?) "
+                "ORDER BY enqueued_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (worker_id, now + self.visibility_timeout, now, row[0]),
+            )
+            return {"id": row[0], "payload": json.loads(row[1]), "attempt": row[2] + 1, "max_attempts": row[3]}
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, take)
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_ids: Iterable[str], worker_id: str) -> List[str]:
+        """
+        Extend the leases a worker holds
+
+        Args:
+            job_ids: IDs of the jobs the worker is running
+            worker_id: ID of the worker
+
+        Returns:
+            IDs of the jobs whose lease the worker no longer holds (the job was
+            leased by another worker after the lease expired)
+        """
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+
+        def extend(conn: sqlite3.Connection) -> List[str]:
+            expires_at = time.time() + self.visibility_timeout
+            lost = []
+            for job_id in job_ids:
+                cursor = conn.execute(
+                    "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                    (expires_at, job_id, worker_id),
+                )
+                if cursor.rowcount != 1:
+                    lost.append(job_id)
+            return lost
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, extend)
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Mark a leased job as succeeded
+
+        Args:
+            job_id: ID of the job
+            worker_id: ID of the worker holding the lease
+            result: JSON-serializable result of the job
+
+        Returns:
+            Whether the worker still held the lease (otherwise the result is discarded)
+        """
+        return self._finish(job_id, worker_id, "succeeded", result=json.dumps(result))
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False) -> bool:
+        """
+        Mark a leased job as failed, or make it visible again for another attempt
+
+        Args:
+            job_id: ID of the job
+            worker_id: ID of the worker holding the lease
+            error: Description of the error
+            retry: Whether the job should be queued again if it has attempts left
+
+        Returns:
+            Whether the worker still held the lease
+        """
+        if retry:
+            def requeue(conn: sqlite3.Connection) -> bool:
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL, error = ? "
+                    "WHERE id = ? AND lease_owner = ? AND status = 'leased' AND attempts < max_attempts",
+                    (error, job_id, worker_id),
+                )
+                return cursor.rowcount == 1
+
+            conn = self._connect()
+            try:
+                if self._transaction(conn, requeue):
+                    return True
+            finally:
+                conn.close()
+
+        return self._finish(job_id, worker_id, "failed", error=error)
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """
+        Give a leased job back without counting the attempt, e.g. when the worker stops
+
+        Args:
+            job_id: ID of the job
+            worker_id: ID of the worker holding the lease
+
+        Returns:
+            Whether the worker still held the lease
+        """
+        def give_back(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL, "
+                "attempts = attempts - 1 WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, give_back)
+        finally:
+            conn.close()
+
+    def _finish(
+        self, job_id: str, worker_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None
+    ) -> bool:
+        def finish(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (status, result, error, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, finish)
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job and its current state
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Dictionary describing the job, or None if it doesn't exist
+        """
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count the jobs in each state
+
+        Returns:
+            Dictionary with the number of queued, leased, succeeded and failed jobs,
+            and the number of leased jobs whose lease has expired
+        """
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            expired = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'leased' AND lease_expires_at < ?", (time.time(),)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+        stats = {status: counts.get(status, 0) for status in JOB_STATUSES}
+        stats["expired_leases"] = expired
+        return stats
+
+    def pending(self) -> int:
+        """
+        Count the jobs that are not finished yet
+
+        Returns:
+            Number of queued and leased jobs
+        """
+        stats = self.stats()
+        return stats["queued"] + stats["leased"]
@@ -0,0 +1,175 @@
+"""
+AIRG-LangGraph - Utilities for ranking template content by relevance to a job
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+# Number of lines of each ranked section sent to the model (0 = send every line);
+# shorter sections are sent in full
+RANKING_TOP_K = int(os.environ.get("AIRG_RANKING_TOP_K", "20"))
+
+# Sections whose lines are ranked; the other editable sections are always sent in full
+RANKED_SECTIONS = ["experience", "skills"]
+
+# BM25 parameters (term frequency saturation and length normalization)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Frequent English words that carry no relevance signal
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to we will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into lowercase terms, without stop words
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of terms
+    """
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 index of a small collection of documents (the lines of a section),
+    stored as a dense term frequency matrix
+    """
+
+    def __init__(self, documents: List[str], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Args:
+            documents: Texts to index
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        tokenized = [tokenize(document) for document in documents]
+        self.vocabulary: Dict[str, int] = {}
+        for terms in tokenized:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        # Term frequencies, one row per document
+        frequencies = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(tokenized):
+            for term in terms:
+                frequencies[row, self.vocabulary[term]] += 1
+
+        # Inverse document frequencies (the non-negative variant)
+        document_count = len(documents)
+        document_frequencies = np.count_nonzero(frequencies, axis=0)
+        self.idf = np.log1p((document_count - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+        # Saturated, length-normalized term frequencies, computed once for all queries
+        lengths = frequencies.sum(axis=1)
+        average_length = lengths.mean() if document_count and lengths.mean() > 0 else 1.0
+        normalization = k1 * (1 - b + b * lengths / average_length)
+        self.weights = frequencies * (k1 + 1) / (frequencies + normalization[:, None])
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        Score every document against a query
+
+        Args:
+            query: Query text
+
+        Returns:
+            Array with the BM25 score of each document
+        """
+        columns = [self.vocabulary[term] for term in set(tokenize(query)) if term in self.vocabulary]
+        if not columns:
+            return np.zeros(self.weights.shape[0], dtype=np.float32)
+        return self.weights[:, columns] @ self.idf[columns]
+
+
+def select_relevant_lines(lines: List[str], query: str, top_k: int) -> List[int]:
+    """
+    Select the lines most relevant to a query
+
+    Args:
+        lines: Lines of a section
+        query: Text describing the job
+        top_k: Number of lines to select
+
+    Returns:
+        Indexes of the selected lines, in document order (every line if there are
+        no more than top_k lines or the query has no terms)
+    """
+    if top_k <= 0 or len(lines) <= top_k or not tokenize(query):
+        return list(range(len(lines)))
+
+    scores = BM25Index(lines).score(query)
+
+    # Stable ordering keeps the earlier line on equal scores
+    ranked = np.argsort(-scores, kind="stable")[:top_k]
+    return sorted(int(index) for index in ranked)
+
+
+def prune_sections(
+    sections: Dict[str, List[str]],
+    query: str,
+    top_k: int,
+) -> Tuple[Dict[str, List[str]], Dict[str, List[int]]]:
+    """
+    Keep only the most relevant lines of the ranked sections
+
+    Args:
+        sections: Dictionary mapping section names to their content
+        query: Text describing the job
+        top_k: Number of lines kept per ranked section (0 = keep every line)
+
+    Returns:
+        Tuple containing the pruned sections and, for each pruned section, the
+        indexes of the lines that were kept
+    """
+    pruned = dict(sections)
+    selections = {}
+    for name in RANKED_SECTIONS:
+        lines = sections.get(name)
+        if not lines:
+            continue
+        selected = select_relevant_lines(lines, query, top_k)
+        if len(selected) < len(lines):
+            pruned[name] = [lines[index] for index in selected]
+            selections[name] = selected
+    return pruned, selections
+
+
+def merge_selected_lines(lines: List[str], selected: List[int], updated: List[str]) -> List[str]:
+    """
+    Put the updated versions of the selected lines back among the other lines
+
+    Args:
+        lines: Original lines of the section
+        selected: Indexes of the lines that were sent to the model
+        updated: Lines returned by the model
+
+    Returns:
+        Lines of the section, where the lines that were not selected are unchanged
+    """
+    if len(updated) == len(selected):
+        # One updated line per selected line: replace them in place
+        merged = list(lines)
+        for index, line in zip(selected, updated):
+            merged[index] = line
+        return merged
+
+    # Otherwise insert the updated lines where the first selected line was
+    selected_set = set(selected)
+    merged = []
+    for index, line in enumerate(lines):
+        if index == selected[0]:
+            merged.extend(updated)
+        if index not in selected_set:
+            merged.append(line)
+    return merged
@@ -0,0 +1,192 @@
+"""
+AIRG-LangGraph - Utilities for rewriting ZIP packages (DOCX files)
+"""
+
+import zlib
+import struct
+import zipfile
+from typing import BinaryIO, Dict, List, Tuple
+
+
+# ZIP record signatures and fixed sizes
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+CENTRAL_HEADER_SIGNATURE = 0x02014B50
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054B50
+LOCAL_HEADER_SIZE = 30
+
+# Largest size and count representable without ZIP64 records
+ZIP32_LIMIT = 0xFFFFFFFF
+ZIP32_MAX_ENTRIES = 0xFFFF
+
+# General purpose flag bits
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+
+
+def _dos_date_time(date_time: Tuple[int, ...]) -> Tuple[int, int]:
+    # Pack a ZipInfo date_time tuple into the MS-DOS date and time fields
+    year, month, day, hour, minute, second = date_time
+    dos_date = (max(year, 1980) - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+    return dos_date, dos_time
+
+
+def _encode_file_name(info: zipfile.ZipInfo) -> Tuple[bytes, int]:
+    # Encode the member name, flagging UTF-8 names as the ZIP specification requires
+    try:
+        return info.filename.encode("ascii"), info.flag_bits & ~FLAG_UTF8
+    except UnicodeEncodeError:
+        return info.filename.encode("utf-8"), info.flag_bits | FLAG_UTF8
+
+
+def needs_zip64(infos: List[zipfile.ZipInfo]) -> bool:
+    """
+    Check whether a package is too large to be rewritten without ZIP64 records
+
+    Args:
+        infos: Members of the package
+
+    Returns:
+        True if any size, offset or the number of members exceeds the ZIP32 limits
+    """
+    return len(infos) >= ZIP32_MAX_ENTRIES or any(
+        info.file_size >= ZIP32_LIMIT or info.compress_size >= ZIP32_LIMIT or info.header_offset >= ZIP32_LIMIT
+        for info in infos
+    )
+
+
+class RawZipWriter:
+    """
+    Streaming ZIP writer that can copy members of another archive without
+    decompressing them
+
+    Members are written to the output one after the other and the central
+    directory is appended by close(), so the output is produced in a single pass.
+    """
+
+    def __init__(self, output: BinaryIO):
+        """
+        Args:
+            output: Binary file object to write the archive to
+        """
+        self.output = output
+        self._offset = 0
+        self._central_directory: List[bytes] = []
+
+    def _write(self, data: bytes) -> None:
+        self.output.write(data)
+        self._offset += len(data)
+
+    def _write_member(self, info: zipfile.ZipInfo, compress_type: int, crc: int, compress_size: int, file_size: int) -> None:
+        # Write the local header of a member and record its central directory entry
+        name, flag_bits = _encode_file_name(info)
+        # Sizes are known up front, so no data descriptor follows the data
+        flag_bits &= ~FLAG_DATA_DESCRIPTOR
+        dos_date, dos_time = _dos_date_time(info.date_time)
+        header_offset = self._offset
+
+        self._write(struct.pack(
+            "<IHHHHHIIIHH",
+            LOCAL_HEADER_SIGNATURE, info.extract_version, flag_bits, compress_type,
+            dos_time, dos_date, crc, compress_size, file_size, len(name), 0,
+        ) + name)
+
+        self._central_directory.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            CENTRAL_HEADER_SIGNATURE, info.create_version | info.create_system << 8, info.extract_version,
+            flag_bits, compress_type, dos_time, dos_date, crc, compress_size, file_size,
+            len(name), 0, 0, 0, info.internal_attr, info.external_attr, header_offset,
+        ) + name)
+
+    def copy_member(self, source: BinaryIO, info: zipfile.ZipInfo, chunk_size: int = 1024 * 1024) -> None:
+        """
+        Copy a member of another archive byte for byte, without decompressing it
+
+        Args:
+            source: Binary file object of the source archive
+            info: ZipInfo of the member in the source archive
+            chunk_size: Number of bytes copied at a time
+        """
+        # Find the start of the data after the source's local header
+        source.seek(info.header_offset)
+        header = source.read(LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        source.seek(info.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length)
+
+        self._write_member(info, info.compress_type, info.CRC, info.compress_size, info.file_size)
+
+        remaining = info.compress_size
+        while remaining > 0:
+            chunk = source.read(min(chunk_size, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated member {info.filename}")
+            self._write(chunk)
+            remaining -= len(chunk)
+
+    def write_member(self, info: zipfile.ZipInfo, data: bytes) -> None:
+        """
+        Write a member with new content, deflate-compressed
+
+        Args:
+            info: ZipInfo to take the name, dates and attributes from
+            data: Uncompressed content of the member
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        self._write_member(info, zipfile.ZIP_DEFLATED, zlib.crc32(data), len(compressed), len(data))
+        self._write(compressed)
+
+    def close(self) -> None:
+        """
+        Write the central directory and the end of central directory record
+        """
+        central_directory_offset = self._offset
+        for entry in self._central_directory:
+            self._write(entry)
+        central_directory_size = self._offset - central_directory_offset
+
+        self._write(struct.pack(
+            "<IHHHHIIH",
+            END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0, 0,
+            len(self._central_directory), len(self._central_directory),
+            central_directory_size, central_directory_offset, 0,
+        ))
+
+
+def rewrite_zip(source_path: str, output_path: str, replacements: Dict[str, bytes]) -> str:
+    """
+    Write a copy of a ZIP package with some members replaced
+
+    Replaced members are deflate-compressed; every other member is copied byte for
+    byte without being decompressed. Packages needing ZIP64 records are rewritten
+    with the zipfile module instead.
+
+    Args:
+        source_path: Path to the source package
+        output_path: Path to write the new package to
+        replacements: Dictionary mapping member names to their new uncompressed content
+
+    Returns:
+        Path to the new package
+    """
+    with zipfile.ZipFile(source_path) as source_zip:
+        infos = source_zip.infolist()
+
+        if needs_zip64(infos):
+            # Recompress through zipfile, which handles ZIP64
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as output_zip:
+                for info in infos:
+                    data = replacements.get(info.filename)
+                    output_zip.writestr(info, data if data is not None else source_zip.read(info))
+            return output_path
+
+        with open(source_path, "rb") as source, open(output_path, "wb") as output:
+            writer = RawZipWriter(output)
+            for info in infos:
+                if info.filename in replacements:
+                    writer.write_member(info, replacements[info.filename])
+                else:
+                    writer.copy_member(source, info)
+            writer.close()
+
+    return output_path
@@ -0,0 +1,348 @@
+"""
+AIRG-LangGraph - AI Resume Generator using LangChain and LangGraph
+Worker process pulling jobs from the durable job queue
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+import traceback
+from typing import Dict, Any, Callable, List, Optional
+
+from batch import build_input_data
+from utils.docx_utils import process_template
+from utils.queue_utils import QUEUE_PATH, QUEUE_VISIBILITY_TIMEOUT, SQLiteJobQueue
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two polls of an empty queue
+WORKER_POLL_INTERVAL = float(os.environ.get("AIRG_WORKER_POLL_INTERVAL", "2"))
+
+# Session checkpoints of the worker processes, one database per process
+WORKER_SESSIONS_DIR = os.path.join("output", "worker_sessions")
+
+OUTPUT_FIELDS = [
+    "resume_docx_path",
+    "resume_pdf_path",
+    "cover_letter_docx_path",
+    "cover_letter_pdf_path",
+]
+
+
+def enqueue_records(
+    records: List[Dict[str, Any]],
+    defaults: Optional[Dict[str, Any]] = None,
+    queue_path: str = QUEUE_PATH,
+    max_attempts: Optional[int] = None,
+) -> List[str]:
+    """
+    Add job records to the queue
+
+    Template paths are made absolute, so that workers started from another
+    directory (or on another machine mounting the same filesystem at the same
+    path) find them.
+
+    Args:
+        records: Job records using the CLI option names as keys
+        defaults: Values used for fields missing from the records (e.g. shared templates)
+        queue_path: Path of the queue database
+        max_attempts: Number of leases each job may get before it is failed
+
+    Returns:
+        IDs of the queued jobs
+    """
+    payloads = []
+    for record in records:
+        input_data = build_input_data(record, defaults)
+        for field in ["resume_source_path", "cover_letter_source_path"]:
+            if input_data.get(field):
+                input_data[field] = os.path.abspath(input_data[field])
+        payloads.append(input_data)
+
+    return SQLiteJobQueue(queue_path).enqueue(payloads, max_attempts=max_attempts)
+
+
+def worker_sessions_path() -> str:
+    """
+    Get the path of the session database of this worker process
+
+    Workers don't share a session database: its batched commits hold the write
+    lock of the file, which would make concurrent workers wait on each other.
+    Sessions are keyed by job ID and not resumed once the job is finished, so the
+    database is deleted when the worker exits (see configure_checkpointer()).
+
+    Returns:
+        Path of a database named after the host and the process ID
+    """
+    return os.path.join(WORKER_SESSIONS_DIR, f"{socket.gethostname()}-{os.getpid()}.db")
+
+
+def remove_stale_sessions() -> List[str]:
+    """
+    Delete the session databases left by workers of this host that were killed
+    before they could delete their own
+
+    Returns:
+        Paths of the deleted databases
+    """
+    from utils.checkpoint_utils import delete_database
+
+    removed = []
+    prefix = f"{socket.gethostname()}-"
+    if not os.path.isdir(WORKER_SESSIONS_DIR):
+        return removed
+    for file_name in os.listdir(WORKER_SESSIONS_DIR):
+        # Only this host's databases, whose process is gone
+        pid = file_name[len(prefix):-len(".db")]
+        if not file_name.startswith(prefix) or not file_name.endswith(".db") or not pid.isdigit():
+            continue
+        if int(pid) == os.getpid() or _process_exists(int(pid)):
+            continue
+        path = os.path.join(WORKER_SESSIONS_DIR, file_name)
+        delete_database(path)
+        removed.append(path)
+    return removed
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a job failed for a reason that may be gone on its next attempt
+
+    Args:
+        error: Exception raised while running the job
+
+    Returns:
+        True for LLM errors worth retrying (429 or 5xx) and connection or timeout
+        errors, False for the others (e.g. a ValueError on invalid input)
+    """
+    from utils.llm_utils import is_retryable_error
+
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return not isinstance(error, ValueError) and is_retryable_error(error)
+
+
+class Worker:
+    """
+    Runs queued jobs through the warm engine, a few at a time, holding a lease
+    on each job and renewing it with heartbeats until the job is finished
+
+    Several workers (processes, possibly on several machines sharing the
+    filesystem) can share one queue; the LLM quota and rate limit are shared by
+    every process through the quota ledger.
+    """
+
+    def __init__(
+        self,
+        queue_path: str = QUEUE_PATH,
+        concurrency: int = 2,
+        visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT,
+        heartbeat_interval: Optional[float] = None,
+        poll_interval: float = WORKER_POLL_INTERVAL,
+        exit_when_empty: bool = False,
+        max_jobs: Optional[int] = None,
+        on_job: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            queue_path: Path of the queue database
+            concurrency: Number of jobs run at the same time
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            heartbeat_interval: Seconds between heartbeats (a third of the visibility timeout by default)
+            poll_interval: Seconds between two polls of an empty queue
+            exit_when_empty: Whether to stop once no job is queued or leased
+            max_jobs: Number of jobs after which the worker stops leasing (no limit if None)
+            on_job: Optional callback receiving the summary of each finished job
+        """
+        self.queue = SQLiteJobQueue(queue_path, visibility_timeout=visibility_timeout)
+        self.concurrency = max(1, concurrency)
+        self.heartbeat_interval = heartbeat_interval or visibility_timeout / 3
+        self.poll_interval = poll_interval
+        self.exit_when_empty = exit_when_empty
+        self.max_jobs = max_jobs
+        self.on_job = on_job
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.counters = {"leased": 0, "succeeded": 0, "failed": 0, "retried": 0, "lost_leases": 0, "renders_avoided": 0}
+        self._active: Dict[str, float] = {}
+        # Leases being requested from the queue, counted against max_jobs
+        self._leasing = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._engine = None
+
+    def stop(self) -> None:
+        """
+        Stop leasing new jobs; the running jobs are finished
+        """
+        self._stop.set()
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Process jobs until stopped, until max_jobs jobs were leased or, with
+        exit_when_empty, until the queue is drained
+
+        Returns:
+            Summary with the job counters, the elapsed time and the throughput
+        """
+        from engine import get_engine
+
+        self._engine = get_engine().warm_up()
+
+        start_time = time.perf_counter()
+        heartbeat = threading.Thread(target=self._heartbeat, name="airg-heartbeat", daemon=True)
+        heartbeat.start()
+        runners = [
+            threading.Thread(target=self._run_jobs, name=f"airg-runner-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in runners:
+            thread.start()
+
+        try:
+            for thread in runners:
+                # Join with a timeout so that Ctrl+C reaches the main thread
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            # Finish the running jobs, but lease no new ones
+            self.stop()
+            for thread in runners:
+                thread.join()
+        finally:
+            self._stop.set()
+            self._done.set()
+            heartbeat.join()
+
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            finished = self.counters["succeeded"] + self.counters["failed"]
+            return {
+                "worker_id": self.worker_id,
+                **self.counters,
+                "elapsed_seconds": round(elapsed, 3),
+                "jobs_per_minute": round(finished / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            }
+
+    def _next_job(self) -> Optional[Dict[str, Any]]:
+        # Lease a job, waiting while the queue is empty. The queue is called
+        # without holding the lock, which the heartbeat thread needs in time
+        while not self._stop.is_set():
+            with self._lock:
+                if self.max_jobs is not None and self.counters["leased"] + self._leasing >= self.max_jobs:
+                    return None
+                self._leasing += 1
+
+            try:
+                job = self.queue.lease(self.worker_id)
+            finally:
+                with self._lock:
+                    self._leasing -= 1
+
+            with self._lock:
+                if job is not None:
+                    self.counters["leased"] += 1
+                    self._active[job["id"]] = time.perf_counter()
+                    return job
+                idle = not self._active
+            if self.exit_when_empty and idle and self.queue.pending() == 0:
+                return None
+            self._stop.wait(self.poll_interval)
+        return None
+
+    def _run_jobs(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._run_job(job)
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        from utils.llm_utils import QuotaExceededError
+
+        job_id = job["id"]
+        start_time = time.perf_counter()
+        summary = {
+            "job_id": job_id,
+            "attempt": job["attempt"],
+            "job_title": job["payload"].get("job_title"),
+            "company_name": job["payload"].get("company_name"),
+        }
+        try:
+            result = self._engine.run(self._input_data(job["payload"]), session_id=job_id)
+            summary["status"] = "succeeded"
+            summary["output_file_name"] = result.get("output_file_name")
+            summary["outputs"] = {field: result.get(field) for field in OUTPUT_FIELDS}
+            summary["skipped_nodes"] = result.get("skipped_nodes", [])
+            summary["renders_avoided"] = result.get("renders_avoided", 0)
+            kept = self.queue.complete(job_id, self.worker_id, summary)
+        except QuotaExceededError as e:
+            # Nothing can run before the quota resets: give the job back and stop
+            logger.error("%s; stopping the worker", e)
+            summary["status"] = "released"
+            summary["error"] = str(e)
+            self.queue.release(job_id, self.worker_id)
+            self.stop()
+            kept = True
+        except Exception as e:
+            # Transient errors give the job another attempt; the others (e.g. invalid input) fail it
+            retry = is_transient_error(e) and job["attempt"] < job["max_attempts"]
+            summary["status"] = "retried" if retry else "failed"
+            summary["error"] = f"{type(e).__name__}: {e}"
+            logger.debug(traceback.format_exc())
+            kept = self.queue.fail(job_id, self.worker_id, summary["error"], retry=retry)
+        summary["seconds"] = round(time.perf_counter() - start_time, 3)
+
+        with self._lock:
+            self._active.pop(job_id, None)
+            if not kept:
+                # The lease expired and another worker took the job over
+                self.counters["lost_leases"] += 1
+                summary["status"] = "lost_lease"
+            elif summary["status"] in self.counters:
+                self.counters[summary["status"]] += 1
+            self.counters["renders_avoided"] += summary.get("renders_avoided", 0)
+
+        if self.on_job is not None:
+            self.on_job(summary)
+
+    def _input_data(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Parse the templates, which process_template() caches by content, so
+        # that a replaced template file is picked up by the next job
+        input_data = dict(payload)
+        for path_field, content_field in [
+            ("resume_source_path", "resume_template_content"),
+            ("cover_letter_source_path", "cover_letter_template_content"),
+        ]:
+            path = input_data.get(path_field)
+            if path and os.path.exists(path):
+                input_data[content_field] = process_template(path)
+        return input_data
+
+    def _heartbeat(self) -> None:
+        # Renew the leases of the running jobs until every runner has finished
+        while not self._done.wait(self.heartbeat_interval):
+            with self._lock:
+                job_ids = list(self._active)
+            try:
+                for job_id in self.queue.heartbeat(job_ids, self.worker_id):
+                    logger.warning("Lost the lease of job %s; another worker may run it again", job_id)
+            except Exception as e:
+                # The next heartbeat may succeed before the leases expire
+                logger.warning("Heartbeat failed: %s", e)